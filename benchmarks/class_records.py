@@ -0,0 +1,60 @@
+import argparse
+import timeit
+import tracemalloc
+
+from puregym_bot.bot.booking_cycle import group_by_slot
+from puregym_bot.bot.class_records import build_class_records
+from puregym_bot.datetime_utils import combine_copenhagen
+from puregym_bot.slot_index import compile_slot_index
+from benchmarks.slot_matching import TIME_SLOTS, synthetic_classes
+
+
+def retained_bytes(build) -> int:
+    tracemalloc.start()
+    try:
+        kept = build()
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def run(count: int, repeat: int) -> None:
+    classes = synthetic_classes(count)
+    records = build_class_records(classes)
+    slot_index = compile_slot_index(TIME_SLOTS)
+
+    def reparse_pipeline() -> None:
+        # What each stage used to do on its own: parse for sorting, matching and formatting.
+        sorted(classes, key=lambda item: combine_copenhagen(item.date, item.start_time))
+        group_by_slot(classes, TIME_SLOTS)
+        for item in classes:
+            combine_copenhagen(item.date, item.start_time)
+
+    def record_pipeline() -> None:
+        parsed = build_class_records(classes)
+        parsed.sort(key=lambda record: record.starts_at)
+        group_by_slot(parsed, TIME_SLOTS)
+        for record in parsed:
+            slot_index.match_record(record)
+
+    print(f"{count} classes, best of {repeat}")
+    for name, func in (("re-parse", reparse_pipeline), ("records", record_pipeline)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"  {name:<9} {best * 1000:8.2f} ms")
+    print(
+        f"  records retain {retained_bytes(lambda: build_class_records(classes)) / len(records):.0f} B/class"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-parsed class record microbenchmark")
+    parser.add_argument("--classes", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.classes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import tempfile
+import time as clock
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import cast
+
+import time_machine
+from pydantic import SecretStr
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import booking_cycle
+from puregym_bot.config import Config, GymClassPreferences, TimeSlot, Weekday
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BotState
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+
+
+def benchmark_config(unit_of_work: bool, bookings: int) -> Config:
+    return Config.model_construct(
+        telegram_token=SecretStr("benchmark"),
+        name="Benchmark",
+        telegram_id=1,
+        puregym_username="benchmark",
+        puregym_password=SecretStr("benchmark"),
+        class_preferences=GymClassPreferences(
+            interested_classes=[1],
+            interested_centers=[1],
+            available_time_slots=[
+                TimeSlot(day_of_week=day, start_time=time(17, 0), end_time=time(22, 0)) for day in Weekday
+            ],
+        ),
+        logging_level="WARNING",
+        max_bookings=bookings,
+        max_days_in_advance=28,
+        booking_reminder_hours=24,
+        pending_auto_cancel_hours=3,
+        release_sniper_enabled=False,
+        cycle_unit_of_work=unit_of_work,
+    )
+
+
+def bookable_classes(count: int) -> list:
+    first_day = date(2026, 3, 21)
+    return [
+        make_gym_class(
+            booking_id=f"b-{index}",
+            activity_id=index,
+            day=first_day + timedelta(days=index),
+            start=time(18, 0),
+            end=time(19, 0),
+            participation_id=None,
+        )
+        for index in range(count)
+    ]
+
+
+def run_cycle(unit_of_work: bool, bookings: int) -> tuple[int, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'benchmark.db'}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(BotState(id=1, is_active=True))
+            session.commit()
+
+        commits: list[int] = []
+        event.listen(engine, "commit", lambda _conn: commits.append(1))
+
+        @contextmanager
+        def session_factory():
+            with Session(engine, expire_on_commit=False) as session:
+                yield session
+
+        config = benchmark_config(unit_of_work, bookings)
+        booking_cycle.get_db_session = session_factory
+        booking_cycle.get_config = lambda: config
+        context = FakeContext(FakePureGymClient(bookable_classes(bookings), bookings=[]))
+
+        started = clock.perf_counter()
+        with time_machine.travel(NOW, tick=False):
+            asyncio.run(booking_cycle.run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context)))
+        elapsed = clock.perf_counter() - started
+        engine.dispose()
+        return len(commits), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Commits (fsyncs) per booking cycle")
+    parser.add_argument("--bookings", type=int, nargs="+", default=[1, 5, 20])
+    args = parser.parse_args()
+
+    print(f"{'bookings':>8} {'mode':>14} {'commits':>8} {'cycle ms':>9}")
+    for bookings in args.bookings:
+        for unit_of_work in (False, True):
+            commits, elapsed = run_cycle(unit_of_work, bookings)
+            mode = "unit of work" if unit_of_work else "per step"
+            print(f"{bookings:>8} {mode:>14} {commits:>8} {elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
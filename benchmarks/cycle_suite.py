@@ -0,0 +1,345 @@
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time as clock
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Callable, cast
+
+import time_machine
+from pydantic import SecretStr
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+from telegram.ext import ContextTypes
+
+from benchmarks.slot_matching import TIME_SLOTS
+from puregym_bot.bot import booking_cycle
+from puregym_bot.bot.booking_state import BookingState
+from puregym_bot.bot.class_records import build_class_records
+from puregym_bot.config import Config, GymClassPreferences
+from puregym_bot.datetime_utils import APP_TIMEZONE, copenhagen_now
+from puregym_bot.storage.models import BotState
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+# Ratio of the baseline median above which a result is reported as a regression.
+REGRESSION_THRESHOLD = 1.2
+
+
+@dataclass
+class BenchmarkResult:
+    benchmark: str
+    classes: int
+    median_ms: float
+    min_ms: float
+    peak_kib: float
+    retained_blocks: int
+    queries: int
+    api_calls: dict[str, int] = field(default_factory=dict)
+
+
+class CountingPureGymClient(FakePureGymClient):
+    """Fake client that honours the fetch filters and counts every API call."""
+
+    def __init__(self, classes, bookings):
+        super().__init__(classes, bookings=bookings)
+        self.calls: Counter[str] = Counter()
+
+    async def get_available_classes(self, **kwargs):
+        self.calls["get_available_classes"] += 1
+        centers = {f"Center {center_id}" for center_id in kwargs.get("center_ids") or ()}
+        from_date, to_date = kwargs.get("from_date"), kwargs.get("to_date")
+        return [
+            gym_class
+            for gym_class in self.classes
+            if (not centers or gym_class.center_name in centers)
+            and (from_date is None or gym_class.date >= from_date)
+            and (to_date is None or gym_class.date <= to_date)
+        ]
+
+    async def get_my_bookings(self):
+        self.calls["get_my_bookings"] += 1
+        return await super().get_my_bookings()
+
+    async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str):
+        self.calls["book_by_ids"] += 1
+        return await super().book_by_ids(booking_id, activity_id, payment_type)
+
+    async def unbook_participation(self, participation_id: str):
+        self.calls["unbook_participation"] += 1
+        return await super().unbook_participation(participation_id)
+
+
+def centers_for(count: int) -> int:
+    return max(1, min(20, count // 500))
+
+
+def synthetic_calendar(count: int, seed: int = 0) -> list:
+    """Classes spread over the booking horizon, many centers, some booked and some waitlisted."""
+    rng = random.Random(seed)
+    centers = centers_for(count)
+    first_day = NOW.date()
+    booked_left = min(40, max(1, count // 100))
+    classes = []
+    for index in range(count):
+        start = datetime.combine(first_day + timedelta(days=rng.randrange(1, 29)), time(rng.randrange(6, 22)))
+        start += timedelta(minutes=rng.choice((0, 15, 30, 45)))
+        booked = booked_left > 0 and rng.random() < 0.02
+        booked_left -= booked
+        waitlisted = not booked and rng.random() < 0.1
+        classes.append(
+            make_gym_class(
+                booking_id=f"b-{index}",
+                activity_id=index,
+                day=start.date(),
+                start=start.time(),
+                end=(start + timedelta(minutes=rng.choice((30, 45, 60)))).time(),
+                participation_id=f"pid-{index}" if booked else None,
+                title=rng.choice(("Body Pump", "Spinning", "Yoga", "HIIT", "Pilates")),
+                center_name=f"Center {rng.randrange(centers) + 1}",
+                waitlist_position=rng.randrange(1, 10) if waitlisted else None,
+                waitlist_size=10 if waitlisted else None,
+            )
+        )
+    return classes
+
+
+def benchmark_config(classes: int) -> Config:
+    return Config.model_construct(
+        telegram_token=SecretStr("benchmark"),
+        name="Benchmark",
+        telegram_id=1,
+        puregym_username="benchmark",
+        puregym_password=SecretStr("benchmark"),
+        class_preferences=GymClassPreferences(
+            interested_classes=[1],
+            interested_centers=list(range(1, centers_for(classes) + 1)),
+            available_time_slots=TIME_SLOTS,
+        ),
+        logging_level="WARNING",
+        max_days_in_advance=28,
+        release_sniper_enabled=False,
+        telegram_outbox_enabled=False,
+    )
+
+
+class BenchmarkDatabase:
+    def __init__(self, directory: Path):
+        self.engine = create_engine(f"sqlite:///{directory / 'benchmark.db'}")
+        SQLModel.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add(BotState(id=1, is_active=True))
+            session.commit()
+        self.queries = 0
+        event.listen(self.engine, "before_cursor_execute", self.count_query)
+
+    def count_query(self, *_args) -> None:
+        self.queries += 1
+
+    @contextmanager
+    def session(self):
+        with Session(self.engine, expire_on_commit=False) as session:
+            yield session
+
+
+@contextmanager
+def benchmark_environment(classes: int):
+    with tempfile.TemporaryDirectory() as directory:
+        database = BenchmarkDatabase(Path(directory))
+        config = benchmark_config(classes)
+        patched = {"get_db_session": database.session, "get_config": lambda: config}
+        originals = {name: getattr(booking_cycle, name) for name in patched}
+        for name, value in patched.items():
+            setattr(booking_cycle, name, value)
+        try:
+            with time_machine.travel(NOW, tick=False):
+                yield database
+        finally:
+            for name, value in originals.items():
+                setattr(booking_cycle, name, value)
+            database.engine.dispose()
+
+
+def measure(
+    name: str,
+    classes: int,
+    repeat: int,
+    run: Callable[[BenchmarkDatabase], dict[str, int] | None],
+) -> BenchmarkResult:
+    """Run in a fresh environment each time; the last run is traced for memory."""
+    timings: list[float] = []
+    queries = 0
+    api_calls: dict[str, int] = {}
+    for _ in range(repeat):
+        with benchmark_environment(classes) as database:
+            started = clock.perf_counter()
+            api_calls = run(database) or {}
+            timings.append(clock.perf_counter() - started)
+            queries = database.queries
+
+    with benchmark_environment(classes) as database:
+        tracemalloc.start()
+        try:
+            run(database)
+            snapshot = tracemalloc.take_snapshot()
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult(
+        benchmark=name,
+        classes=classes,
+        median_ms=statistics.median(timings) * 1000,
+        min_ms=min(timings) * 1000,
+        peak_kib=peak / 1024,
+        retained_blocks=sum(stat.count for stat in snapshot.statistics("filename")),
+        queries=queries,
+        api_calls=dict(sorted(api_calls.items())),
+    )
+
+
+def cycle_runner(calendar: list, cycles: int) -> Callable[[BenchmarkDatabase], dict[str, int]]:
+    booked = [gym_class for gym_class in calendar if gym_class.participation_id is not None]
+
+    def run(_database: BenchmarkDatabase) -> dict[str, int]:
+        client = CountingPureGymClient(calendar, bookings=booked)
+        context = cast(ContextTypes.DEFAULT_TYPE, FakeContext(client))
+
+        async def cycles_in_one_loop() -> None:
+            for _ in range(cycles):
+                await booking_cycle.run_booking_cycle(context)
+
+        asyncio.run(cycles_in_one_loop())
+        return dict(client.calls)
+
+    return run
+
+
+def step_runner(calendar: list) -> dict[str, Callable[[BenchmarkDatabase], None]]:
+    config = benchmark_config(len(calendar))
+    time_slots = config.class_preferences.available_time_slots
+    records = build_class_records(calendar)
+    booked = {record.participation_id: record for record in records if record.participation_id}
+
+    def class_records(_database: BenchmarkDatabase) -> None:
+        build_class_records(calendar)
+
+    def group_by_slot(_database: BenchmarkDatabase) -> None:
+        booking_cycle.group_by_slot(records, time_slots)
+
+    def sync_bookings(database: BenchmarkDatabase) -> None:
+        with database.session() as session:
+            state = BookingState.load(session)
+            booking_cycle.reconcile_bookings_missing_in_puregym(session, booked, copenhagen_now(), state)
+            booking_cycle.import_untracked_bookings(session, booked, state)
+            booking_cycle.detect_booking_state_mismatch(session, booked, state)
+
+    def plan_slots(database: BenchmarkDatabase) -> None:
+        grouped = booking_cycle.group_by_slot(records, time_slots)
+        with database.session() as session:
+            booking_cycle.plan_slot_actions(session, grouped, set())
+
+    def reminders(database: BenchmarkDatabase) -> None:
+        with database.session() as session:
+            state = BookingState.load(session)
+            booking_cycle.import_untracked_bookings(session, booked, state)
+            booking_cycle.send_due_reminders(session, copenhagen_now(), config.booking_reminder_hours, state)
+
+    return {
+        "step.class_records": class_records,
+        "step.group_by_slot": group_by_slot,
+        "step.sync_bookings": sync_bookings,
+        "step.plan_slots": plan_slots,
+        "step.reminders": reminders,
+    }
+
+
+def run_suite(sizes: list[int], repeat: int) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    for classes in sizes:
+        calendar = synthetic_calendar(classes)
+        results.append(measure("cycle.first", classes, repeat, cycle_runner(calendar, cycles=1)))
+        results.append(measure("cycle.two_cycles", classes, repeat, cycle_runner(calendar, cycles=2)))
+        for name, run in step_runner(calendar).items():
+            results.append(measure(name, classes, repeat, run))
+    return results
+
+
+def current_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True, text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def print_results(results: list[BenchmarkResult], baseline: dict[tuple[str, int], dict] | None) -> int:
+    regressions = 0
+    print(
+        f"{'benchmark':<20} {'classes':>7} {'median ms':>10} {'peak KiB':>10} {'blocks':>8} "
+        f"{'queries':>8} {'api calls':>9} {'vs base':>8}"
+    )
+    for result in results:
+        comparison = ""
+        previous = (baseline or {}).get((result.benchmark, result.classes))
+        if previous is not None and previous["median_ms"] > 0:
+            ratio = result.median_ms / previous["median_ms"]
+            comparison = f"{ratio:.2f}x"
+            if ratio > REGRESSION_THRESHOLD:
+                comparison += " !"
+                regressions += 1
+        print(
+            f"{result.benchmark:<20} {result.classes:>7} {result.median_ms:>10.1f} {result.peak_kib:>10.0f} "
+            f"{result.retained_blocks:>8} {result.queries:>8} {sum(result.api_calls.values()):>9} "
+            f"{comparison:>8}"
+        )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict[tuple[str, int], dict]:
+    payload = json.loads(path.read_text())
+    return {(item["benchmark"], item["classes"]): item for item in payload["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Booking cycle benchmarks on synthetic calendars")
+    parser.add_argument("--classes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the results as JSON for later comparison")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    # Synthetic bookings trip the cycle's consistency warnings on purpose.
+    logging.basicConfig(level=logging.ERROR)
+
+    results = run_suite(args.classes, args.repeat)
+    baseline = load_baseline(args.compare) if args.compare else None
+    regressions = print_results(results, baseline)
+    if baseline is not None:
+        print(f"{regressions} benchmark(s) more than {REGRESSION_THRESHOLD:.1f}x slower than the baseline")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "commit": current_commit(),
+            "created_at": datetime.now(APP_TIMEZONE).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
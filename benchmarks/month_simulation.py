@@ -0,0 +1,388 @@
+"""Replays a month of booking cycles offline on a virtual clock.
+
+Each cycle runs the real booking code against SQLite at roughly 200 cycles per second. An adaptive
+month (about 3,000 cycles) takes around 15 seconds, while a fixed-interval month at the default 60s
+interval (43,200 cycles) takes 3 to 4 minutes; pass a smaller --days for a quick run.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time as clock
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+import time_machine
+from puregym_mcp.puregym.models import BookClassResult, CancelBookingResult
+from pydantic import SecretStr
+from sqlmodel import select
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from benchmarks.cycle_suite import BenchmarkDatabase
+from puregym_bot.bot import booking_cycle, cycle_scheduler, handlers
+from puregym_bot.bot.booking_deadlines import get_deadline_queue
+from puregym_bot.bot.callback_data import BookingCallback, BookingCallbackAction, parse_callback_data
+from puregym_bot.config import Config, GymClassPreferences, TimeSlot, Weekday
+from puregym_bot.datetime_utils import APP_TIMEZONE, copenhagen_now
+from puregym_bot.storage.models import ManagedBooking
+from tests.fakes import FakeBot, make_gym_class
+
+START = datetime(2026, 3, 2, 6, 0, tzinfo=APP_TIMEZONE)
+CLASS_HOURS = (7, 12, 17, 18, 19, 20)
+TITLES = {1: "Body Pump", 2: "Spinning", 3: "Yoga"}
+
+
+@dataclass
+class SimulationReport:
+    days: int
+    wall_seconds: float
+    cycles: int = 0
+    deadline_runs: int = 0
+    callbacks: int = 0
+    messages: int = 0
+    bookings_made: int = 0
+    queries: int = 0
+    api_calls: Counter[str] = field(default_factory=Counter)
+    final_statuses: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def cycles_per_second(self) -> float:
+        return self.cycles / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.days * 86400 / self.wall_seconds if self.wall_seconds else 0.0
+
+
+class ScriptedPureGym:
+    """Weekly timetable released max_days_in_advance before each class, with a seeded share of full classes.
+
+    Bookings are kept per class, so what the bot books, cancels and sees on the next fetch stays consistent.
+    """
+
+    def __init__(self, days: int, centers: int, max_days_in_advance: int, full_rate: float, seed: int):
+        rng = random.Random(seed)
+        self.max_days_in_advance = max_days_in_advance
+        self.calls: Counter[str] = Counter()
+        self.starts: dict[str, datetime] = {}
+        self.classes = {}
+        self.by_day: dict[date, list[str]] = {}
+        self.full: set[str] = set()
+        self.booked: dict[str, str] = {}
+        self.bookings_made = 0
+        # (day, class_ids, centers) -> matching booking ids, so a fetch only checks visibility at the edges
+        self.matching: dict[tuple[date, frozenset[int], frozenset[str]], list[str]] = {}
+        first_day = START.date()
+        for day_offset in range(days + max_days_in_advance + 1):
+            day = first_day + timedelta(days=day_offset)
+            for center in range(1, centers + 1):
+                for hour in CLASS_HOURS:
+                    activity_id = rng.choice(tuple(TITLES))
+                    booking_id = f"{day.isoformat()}-{center}-{hour}"
+                    self.starts[booking_id] = datetime.combine(day, time(hour))
+                    self.classes[booking_id] = make_gym_class(
+                        booking_id=booking_id,
+                        activity_id=activity_id,
+                        day=day,
+                        start=time(hour),
+                        end=time(hour, 55),
+                        participation_id=None,
+                        title=TITLES[activity_id],
+                        center_name=f"Center {center}",
+                    )
+                    self.by_day.setdefault(day, []).append(booking_id)
+                    if rng.random() < full_rate:
+                        self.full.add(booking_id)
+
+    def visible(self, booking_id: str, now: datetime) -> bool:
+        start = self.starts[booking_id]
+        return start - timedelta(days=self.max_days_in_advance) <= now < start
+
+    def matching_on(self, day: date, class_ids: frozenset[int], centers: frozenset[str]) -> list[str]:
+        key = (day, class_ids, centers)
+        matching = self.matching.get(key)
+        if matching is None:
+            matching = [
+                booking_id
+                for booking_id in self.by_day.get(day, ())
+                if (not class_ids or self.classes[booking_id].activity_id in class_ids)
+                and (not centers or self.classes[booking_id].center_name in centers)
+            ]
+            self.matching[key] = matching
+        return matching
+
+    def with_participation(self, booking_id: str):
+        participation_id = self.booked.get(booking_id)
+        gym_class = self.classes[booking_id]
+        if participation_id is None:
+            return gym_class
+        return gym_class.model_copy(update={"participation_id": participation_id})
+
+    async def get_available_classes(self, **kwargs):
+        self.calls["get_available_classes"] += 1
+        now = copenhagen_now()
+        class_ids = frozenset(kwargs.get("class_ids") or ())
+        centers = frozenset(f"Center {center_id}" for center_id in kwargs.get("center_ids") or ())
+        first_day = (
+            max(date.fromisoformat(kwargs["from_date"]), now.date())
+            if kwargs.get("from_date")
+            else now.date()
+        )
+        last_day = now.date() + timedelta(days=self.max_days_in_advance)
+        if kwargs.get("to_date"):
+            last_day = min(date.fromisoformat(kwargs["to_date"]), last_day)
+        classes = []
+        edges = {now.date(), now.date() + timedelta(days=self.max_days_in_advance)}
+        for offset in range((last_day - first_day).days + 1):
+            day = first_day + timedelta(days=offset)
+            for booking_id in self.matching_on(day, class_ids, centers):
+                # Days strictly inside the booking window are fully visible.
+                if day not in edges or self.visible(booking_id, now):
+                    classes.append(
+                        self.with_participation(booking_id)
+                        if booking_id in self.booked
+                        else self.classes[booking_id]
+                    )
+        return classes
+
+    async def get_my_bookings(self):
+        self.calls["get_my_bookings"] += 1
+        now = copenhagen_now()
+        return [
+            self.with_participation(booking_id) for booking_id in self.booked if self.starts[booking_id] > now
+        ]
+
+    async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str) -> BookClassResult:
+        self.calls["book_by_ids"] += 1
+        if (
+            booking_id not in self.classes
+            or booking_id in self.full
+            or booking_id in self.booked
+            or not self.visible(booking_id, copenhagen_now())
+        ):
+            return BookClassResult(status="error")
+        participation_id = f"p-{booking_id}"
+        self.booked[booking_id] = participation_id
+        self.bookings_made += 1
+        return BookClassResult(status="success", participation_id=participation_id)
+
+    async def unbook_participation(self, participation_id: str) -> CancelBookingResult:
+        self.calls["unbook_participation"] += 1
+        for booking_id, booked in list(self.booked.items()):
+            if booked == participation_id:
+                del self.booked[booking_id]
+                return CancelBookingResult(status="success")
+        return CancelBookingResult(status="error")
+
+
+class SimulatedCallbackQuery:
+    def __init__(self, data: str):
+        self.data = data
+
+    async def answer(self):
+        return None
+
+    async def edit_message_text(self, *, text: str):
+        return None
+
+
+class SimulatedUser:
+    """Answers each prompt after a fixed delay: keeps a booking with `accept_rate`, always picks option 1."""
+
+    def __init__(self, reply_after: timedelta, accept_rate: float, seed: int):
+        self.reply_after = reply_after
+        self.accept_rate = accept_rate
+        self.rng = random.Random(seed)
+        self.seen = 0
+        self.replies: list[tuple[datetime, str]] = []
+
+    def read(self, bot: FakeBot, now: datetime) -> None:
+        for call in bot.calls[self.seen :]:
+            callback_data = self.choose(call["reply_markup"])
+            if callback_data is not None:
+                self.replies.append((now + self.reply_after, callback_data))
+        self.seen = len(bot.calls)
+
+    def choose(self, reply_markup) -> str | None:
+        if reply_markup is None:
+            return None
+        for row in reply_markup.inline_keyboard:
+            for button in row:
+                parsed = parse_callback_data(button.callback_data)
+                if isinstance(parsed, BookingCallback):
+                    if parsed.action == BookingCallbackAction.ACCEPT and self.rng.random() < self.accept_rate:
+                        return button.callback_data
+                elif parsed is not None:
+                    return button.callback_data
+        return None
+
+    def next_reply(self) -> datetime | None:
+        return min((due for due, _data in self.replies), default=None)
+
+    def due(self, now: datetime) -> list[str]:
+        due = [data for at, data in self.replies if at <= now]
+        self.replies = [(at, data) for at, data in self.replies if at > now]
+        return due
+
+
+def simulation_config(centers: int, adaptive: bool) -> Config:
+    return Config.model_construct(
+        telegram_token=SecretStr("simulation"),
+        name="Simulation",
+        telegram_id=1,
+        puregym_username="simulation",
+        puregym_password=SecretStr("simulation"),
+        class_preferences=GymClassPreferences(
+            interested_classes=[1, 2],
+            interested_centers=list(range(1, centers + 1)),
+            available_time_slots=[
+                TimeSlot(day_of_week=day, start_time=time(17, 0), end_time=time(19, 0))
+                for day in (Weekday.MONDAY, Weekday.WEDNESDAY, Weekday.FRIDAY)
+            ],
+        ),
+        logging_level="WARNING",
+        max_bookings=4,
+        max_days_in_advance=28,
+        adaptive_booking_interval=adaptive,
+        release_sniper_enabled=False,
+        telegram_outbox_enabled=False,
+    )
+
+
+@contextmanager
+def simulation_environment(config: Config):
+    with tempfile.TemporaryDirectory() as directory:
+        database = BenchmarkDatabase(Path(directory))
+        patched = {"get_db_session": database.session, "get_config": lambda: config}
+        modules = (booking_cycle, cycle_scheduler, handlers)
+        originals = {(module, name): getattr(module, name) for module in modules for name in patched}
+        for module, name in originals:
+            setattr(module, name, patched[name])
+        try:
+            yield database
+        finally:
+            for (module, name), original in originals.items():
+                setattr(module, name, original)
+            database.engine.dispose()
+
+
+async def press(context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> None:
+    update = SimpleNamespace(
+        effective_user=SimpleNamespace(id=1), callback_query=SimulatedCallbackQuery(callback_data)
+    )
+    await handlers.button(cast(Update, update), context)
+
+
+def next_cycle_at(database: BenchmarkDatabase, now: datetime, report, config: Config) -> datetime:
+    if not config.adaptive_booking_interval:
+        return now + timedelta(seconds=config.booking_interval_seconds)
+    with database.session() as session:
+        deadlines = cycle_scheduler.collect_cycle_deadlines(session, now)
+    return now + timedelta(seconds=cycle_scheduler.next_cycle_delay(now, report, deadlines))
+
+
+async def simulate(
+    days: int,
+    centers: int,
+    adaptive: bool,
+    reply_minutes: int,
+    accept_rate: float,
+    full_rate: float,
+    seed: int,
+) -> SimulationReport:
+    """Replay `days` of cycles, deadline timer runs and user replies, in event order, on a virtual clock."""
+    config = simulation_config(centers, adaptive)
+    gym = ScriptedPureGym(days, centers, config.max_days_in_advance, full_rate, seed)
+    user = SimulatedUser(timedelta(minutes=reply_minutes), accept_rate, seed)
+    bot = FakeBot()
+    context = cast(ContextTypes.DEFAULT_TYPE, SimpleNamespace(bot=bot, bot_data={"puregym_client": gym}))
+    end = START.replace(tzinfo=None) + timedelta(days=days)
+
+    with simulation_environment(config) as database, time_machine.travel(START, tick=False) as traveller:
+        report = SimulationReport(days=days, wall_seconds=0.0)
+        started = clock.perf_counter()
+        cycle_at = copenhagen_now()
+        while True:
+            deadlines = get_deadline_queue(context.bot_data)
+            deadline_at = (
+                deadlines.next_due() if deadlines is not None and config.booking_deadline_timer else None
+            )
+            now = min(at for at in (cycle_at, deadline_at, user.next_reply()) if at is not None)
+            if now >= end:
+                break
+            traveller.move_to(now.replace(tzinfo=APP_TIMEZONE))
+
+            for callback_data in user.due(now):
+                await press(context, callback_data)
+                report.callbacks += 1
+            if deadline_at is not None and deadline_at <= now:
+                await booking_cycle.run_booking_deadlines(context)
+                report.deadline_runs += 1
+            if cycle_at <= now:
+                cycle_report = await booking_cycle.run_booking_cycle(context)
+                report.cycles += 1
+                cycle_at = next_cycle_at(database, now, cycle_report, config)
+            user.read(bot, now)
+
+        report.wall_seconds = clock.perf_counter() - started
+        report.messages = len(bot.calls)
+        report.bookings_made = gym.bookings_made
+        report.api_calls = gym.calls
+        report.queries = database.queries
+        with database.session() as session:
+            bookings = session.exec(select(ManagedBooking)).all()
+        report.final_statuses = Counter(str(booking.status) for booking in bookings)
+    return report
+
+
+def print_report(report: SimulationReport) -> None:
+    print(f"Simulated {report.days} days in {report.wall_seconds:.1f}s ({report.speedup:,.0f}x real time)")
+    print(f"cycles          {report.cycles:>8} ({report.cycles_per_second:,.0f}/s)")
+    print(f"deadline runs   {report.deadline_runs:>8}")
+    print(f"user replies    {report.callbacks:>8}")
+    print(f"messages sent   {report.messages:>8}")
+    print(f"bookings made   {report.bookings_made:>8}")
+    print(f"db queries      {report.queries:>8}")
+    for method, count in sorted(report.api_calls.items()):
+        print(f"api {method:<22} {count:>8}")
+    for status, count in sorted(report.final_statuses.items()):
+        print(f"bookings {status:<17} {count:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a month of booking cycles on a virtual clock")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--centers", type=int, default=3)
+    parser.add_argument("--adaptive", action="store_true", help="schedule cycles like the adaptive scheduler")
+    parser.add_argument("--reply-minutes", type=int, default=30)
+    parser.add_argument("--accept-rate", type=float, default=0.7)
+    parser.add_argument("--full-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    # Declined and auto-cancelled bookings log warnings on purpose.
+    logging.basicConfig(level=logging.ERROR)
+
+    report = asyncio.run(
+        simulate(
+            days=args.days,
+            centers=args.centers,
+            adaptive=args.adaptive,
+            reply_minutes=args.reply_minutes,
+            accept_rate=args.accept_rate,
+            full_rate=args.full_rate,
+            seed=args.seed,
+        )
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
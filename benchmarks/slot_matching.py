@@ -0,0 +1,70 @@
+import argparse
+import random
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from puregym_bot.bot.booking_cycle import group_by_slot
+from puregym_bot.bot.class_records import build_class_records
+from puregym_bot.config import TimeSlot, Weekday
+from puregym_bot.slot_index import compile_slot_index
+from tests.fakes import make_gym_class
+
+TIME_SLOTS = [
+    TimeSlot(day_of_week=day, start_time=start, end_time=end)
+    for day in Weekday
+    for start, end in ((time(6, 0), time(9, 0)), (time(12, 0), time(13, 0)), (time(17, 0), time(22, 0)))
+]
+
+
+def synthetic_classes(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    first_day = date(2026, 3, 23)
+    classes = []
+    for index in range(count):
+        start = datetime.combine(first_day + timedelta(days=rng.randrange(28)), time(rng.randrange(5, 22)))
+        start += timedelta(minutes=rng.choice((0, 15, 30, 45)))
+        classes.append(
+            make_gym_class(
+                booking_id=f"b-{index}",
+                activity_id=index,
+                day=start.date(),
+                start=start.time(),
+                end=(start + timedelta(minutes=rng.choice((30, 45, 60)))).time(),
+                participation_id=None,
+            )
+        )
+    return classes
+
+
+def run(count: int, repeat: int) -> None:
+    classes = synthetic_classes(count)
+    slot_index = compile_slot_index(TIME_SLOTS)
+    records = build_class_records(classes)
+
+    def linear() -> None:
+        for record in records:
+            slot_index.match_linear(record.weekday, record.start_clock, record.end_clock)
+
+    def indexed() -> None:
+        for record in records:
+            slot_index.match_record(record)
+
+    def grouped() -> None:
+        group_by_slot(classes, TIME_SLOTS)
+
+    print(f"{count} classes, {len(TIME_SLOTS)} time slots, best of {repeat}")
+    for name, func in (("linear match", linear), ("indexed match", indexed), ("group_by_slot", grouped)):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"  {name:<14} {best * 1000:8.2f} ms  ({best / count * 1e9:6.0f} ns/class)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-slot matching microbenchmark")
+    parser.add_argument("--classes", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.classes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
+from datetime import timedelta
+
 from telegram import BotCommand
 from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, filters
 
 from puregym_bot.bot import handlers
-from puregym_bot.bot.booking_cycle import run_booking_cycle
+from puregym_bot.bot.booking_cycle import start_booking_deadline_timer
+from puregym_bot.bot.catalog_cache import start_catalog_cache
+from puregym_bot.bot.cycle_executor import run_single_flight_cycle
+from puregym_bot.bot.cycle_scheduler import schedule_booking_cycle
 from puregym_bot.bot.dependencies import build_handler, on_shutdown, on_startup
+from puregym_bot.bot.outbox import start_outbox_sender
 from puregym_bot.bot.registry import COMMANDS
+from puregym_bot.bot.release_sniper import schedule_next_release
 from puregym_bot.config import get_config
+from puregym_bot.metrics import start_metrics_server
 
 
 def build_app():
@@ -15,9 +23,29 @@ def build_app():
     async def post_init(app):
         await on_startup(app)
         await app.bot.set_my_commands([BotCommand(command.name, command.description) for command in COMMANDS])
-        app.job_queue.run_repeating(
-            run_booking_cycle, interval=config.booking_interval_seconds, first=0, name="booking_cycle"
+        if config.adaptive_booking_interval:
+            schedule_booking_cycle(app.job_queue, 0)
+        else:
+            app.job_queue.run_repeating(
+                run_single_flight_cycle,
+                interval=config.booking_interval_seconds,
+                first=0,
+                name="booking_cycle",
+            )
+        if config.release_sniper_enabled:
+            schedule_next_release(app.job_queue)
+        if config.booking_deadline_timer:
+            start_booking_deadline_timer(app)
+        if config.telegram_outbox_enabled:
+            start_outbox_sender(app.bot_data, app.bot)
+        start_catalog_cache(
+            app.bot_data,
+            app.bot_data["puregym_client"],
+            config.catalog_cache_dir,
+            timedelta(hours=config.catalog_cache_ttl_hours),
         )
+        if config.metrics_enabled:
+            await start_metrics_server(app.bot_data, config.metrics_host, config.metrics_port)
 
     application = (
         ApplicationBuilder()
@@ -34,6 +62,7 @@ def build_app():
                 command.name,
                 build_handler(command.handler, allow_inactive=command.allow_inactive),
                 filters=auth_filter,
+                block=command.blocking,
             )
         )
 
@@ -1,15 +1,36 @@
+import asyncio
 import json
 import logging
+import time
 from dataclasses import dataclass, field
-from datetime import datetime, time, timedelta
-from typing import cast
+from datetime import date, datetime, timedelta
+from typing import Callable, cast
 
 from puregym_mcp.puregym.client import PureGymClient
-from puregym_mcp.puregym.filters import TimeSlotLike, filter_by_booked, filter_by_time_slots
-from puregym_mcp.puregym.models import GymClass
+from puregym_mcp.puregym.filters import filter_by_booked
+from puregym_mcp.puregym.models import BookClassResult, GymClass
 from pydantic import BaseModel
 from telegram.ext import ContextTypes
 
+from puregym_bot.bot.booking_deadlines import (
+    DeadlineKind,
+    DeadlineQueue,
+    auto_cancel_is_due,
+    load_deadline_queue,
+    reminder_is_due,
+    start_deadline_timer,
+    track_booking_deadlines,
+)
+from puregym_bot.bot.booking_state import BookingState, booking_state_version, mark_bookings_changed
+from puregym_bot.bot.bookings_snapshot import (
+    BookingsSnapshotCache,
+    get_bookings_snapshot_cache,
+    invalidate_bookings_snapshot,
+)
+from puregym_bot.bot.class_records import ClassRecord, as_class_record, build_class_records
+from puregym_bot.bot.class_snapshot import ClassDelta, ClassSnapshot, diff_class_snapshots
+from puregym_bot.bot.digest import PromptCategory, PromptDigest
+from puregym_bot.bot.outbox import enqueue_prompts, get_outbox_sender
 from puregym_bot.bot.prompts import (
     ButtonSpec,
     MessageSpec,
@@ -18,28 +39,41 @@ from puregym_bot.bot.prompts import (
     build_keep_booking_prompt,
     message_markup,
 )
+from puregym_bot.bot.slot_blocking import SlotBlockingIndex
+from puregym_bot.circuit_breaker import get_circuit_breaker, is_unavailable
 from puregym_bot.config import TimeSlot, get_config
 from puregym_bot.datetime_utils import combine_copenhagen, copenhagen_now
 from puregym_bot.formatting import (
     format_telegram_booking,
     format_telegram_class_summary,
+    format_telegram_datetime,
     format_telegram_time,
 )
-from puregym_bot.storage.db import get_db_session
+from puregym_bot.metrics import (
+    CYCLE_DURATION,
+    CYCLE_STEP_DURATION,
+    CYCLE_STEP_TIMEOUTS,
+    CYCLES,
+    PROMPTS_PUBLISHED,
+    TELEGRAM_SEND_DURATION,
+    TELEGRAM_SEND_ERRORS,
+    observe,
+)
+from puregym_bot.slot_index import SlotIndex, compile_slot_index
+from puregym_bot.storage.db import get_db_session, unit_of_work
 from puregym_bot.storage.models import BookingChoice, BookingStatus, ManagedBooking
 from puregym_bot.storage.repository import (
     add_booking_choice,
     add_managed_booking,
     get_active_bookings,
-    get_booking_by_participation_id,
+    get_bookings_by_participation_ids,
     get_bot_state,
     get_handled_bookings_for_slot,
-    get_pending_bookings,
     get_pending_choice,
-    set_booking_status,
     set_choice_message_id,
     set_message_id,
     set_reminder_sent,
+    upsert_managed_bookings,
 )
 
 
@@ -55,11 +89,80 @@ class OutboundPrompt:
     message: MessageSpec
     booking: ManagedBooking | None = None
     choice: BookingChoice | None = None
+    category: PromptCategory | None = None
+    # one-line summary used when the prompt is folded into a digest
+    detail: str | None = None
+
+    @property
+    def interactive(self) -> bool:
+        return bool(self.message.buttons) or self.booking is not None or self.choice is not None
 
 
 @dataclass
 class StepResult:
     prompts: list[OutboundPrompt] = field(default_factory=list)
+    unresolved_slots: set[SlotOccurrence] = field(default_factory=set)
+
+
+@dataclass
+class IncrementalCycleState:
+    snapshot: ClassSnapshot | None = None
+    retry_slots: set[SlotOccurrence] = field(default_factory=set)
+    last_full_sync: datetime | None = None
+
+
+@dataclass(frozen=True)
+class CycleReport:
+    started_at: datetime
+    ran: bool = True
+    unresolved_slots: int = 0
+    max_bookings_reached: bool = False
+    # PureGym was unavailable, so only the database-backed steps ran
+    degraded: bool = False
+
+    @property
+    def actionable(self) -> bool:
+        return self.ran and self.unresolved_slots > 0 and not self.max_bookings_reached
+
+
+# PureGym methods the cycle cannot book without; an open circuit on any of them degrades the cycle.
+CYCLE_PUREGYM_METHODS = ("get_available_classes", "book_by_ids")
+# Share of the cycle time budget each PureGym step may use.
+CYCLE_STEP_SHARES = {"fetch": 0.5, "bookings_snapshot": 0.1, "book_slots": 0.4}
+
+
+@dataclass
+class CycleTimeBudget:
+    """Wall-clock budget for one booking cycle.
+
+    A network step may use its share of the total but never the reserve kept for the reminder and
+    auto-cancel steps, so a hung PureGym call cannot hold those back.
+    """
+
+    total: float
+    reserve: float
+    clock: Callable[[], float] = time.monotonic
+    started: float = field(init=False)
+
+    def __post_init__(self):
+        self.started = self.clock()
+
+    def remaining(self) -> float:
+        return self.total - (self.clock() - self.started)
+
+    def allowance(self, step: str) -> float:
+        return max(min(self.total * CYCLE_STEP_SHARES[step], self.remaining() - self.reserve), 0.0)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining() <= self.reserve
+
+
+@dataclass(frozen=True)
+class CyclePlan:
+    sync_bookings: bool
+    # None means every slot occurrence in the horizon has to be evaluated
+    slots: frozenset[SlotOccurrence] | None
 
 
 class BookingChoiceOption(BaseModel):
@@ -74,10 +177,16 @@ class BookingChoiceOption(BaseModel):
     location: str
 
 
-def class_datetime(gym_class: GymClass) -> datetime:
+def class_datetime(gym_class: ClassRecord | GymClass) -> datetime:
+    if isinstance(gym_class, ClassRecord):
+        return gym_class.starts_at
     return combine_copenhagen(gym_class.date, gym_class.start_time)
 
 
+def booking_detail(booking: ManagedBooking) -> str:
+    return f"{format_telegram_datetime(booking.class_datetime)}  {booking.class_title} @ {booking.class_location}"
+
+
 def reminder_text(booking: ManagedBooking, intro: str, outro: str) -> str:
     summary = format_telegram_booking(
         class_datetime=booking.class_datetime,
@@ -88,31 +197,37 @@ def reminder_text(booking: ManagedBooking, intro: str, outro: str) -> str:
     return f"{intro}\n{summary}\n{outro}"
 
 
-def get_matching_slot_occurrence(gym_class: GymClass, time_slots: list[TimeSlot]) -> SlotOccurrence | None:
-    class_date = datetime.fromisoformat(gym_class.date).date()
-    weekday = class_date.weekday()
-    class_start = time.fromisoformat(gym_class.start_time)
-    class_end = time.fromisoformat(gym_class.end_time)
+def get_matching_slot_occurrence(
+    gym_class: ClassRecord | GymClass,
+    time_slots: list[TimeSlot],
+    slot_index: SlotIndex | None = None,
+) -> SlotOccurrence | None:
+    if slot_index is None:
+        slot_index = compile_slot_index(time_slots)
+    record = as_class_record(gym_class)
+    slot = slot_index.match_record(record)
+    if slot is None:
+        return None
+    return SlotOccurrence(
+        date=record.date,
+        slot_start=slot.start_time.isoformat(),
+        slot_end=slot.end_time.isoformat(),
+    )
 
-    for slot in time_slots:
-        if slot.day_of_week != weekday:
-            continue
-        if slot.start_time <= class_start <= class_end <= slot.end_time:
-            return SlotOccurrence(
-                date=gym_class.date,
-                slot_start=slot.start_time.isoformat(),
-                slot_end=slot.end_time.isoformat(),
-            )
-    return None
+
+def filter_by_slot_index(classes: list[ClassRecord], time_slots: list[TimeSlot]) -> list[ClassRecord]:
+    slot_index = compile_slot_index(time_slots)
+    return [record for record in classes if slot_index.match_record(record) is not None]
 
 
 def group_by_slot(
-    classes: list[GymClass], time_slots: list[TimeSlot]
-) -> dict[SlotOccurrence, list[GymClass]]:
-    grouped: dict[SlotOccurrence, list[GymClass]] = {}
+    classes: list[ClassRecord] | list[GymClass], time_slots: list[TimeSlot]
+) -> dict[SlotOccurrence, list[ClassRecord]]:
+    grouped: dict[SlotOccurrence, list[ClassRecord]] = {}
+    slot_index = compile_slot_index(time_slots)
 
-    for gym_class in classes:
-        slot_occurrence = get_matching_slot_occurrence(gym_class, time_slots)
+    for gym_class in build_class_records(classes):
+        slot_occurrence = get_matching_slot_occurrence(gym_class, time_slots, slot_index)
         if slot_occurrence is None:
             continue
         grouped.setdefault(slot_occurrence, []).append(gym_class)
@@ -124,50 +239,225 @@ def is_cycle_active(session) -> bool:
     return bot_state.is_active
 
 
-async def fetch_candidate_classes(client: PureGymClient, now: datetime) -> list[GymClass]:
+@dataclass(frozen=True)
+class FetchPartition:
+    from_date: str
+    to_date: str
+    center_ids: tuple[int, ...]
+
+
+@dataclass
+class ClassFetchResult:
+    classes: list[ClassRecord] = field(default_factory=list)
+    failed_partitions: list[FetchPartition] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_partitions
+
+
+@dataclass(frozen=True)
+class HorizonTier:
+    index: int
+    first_day: date
+    last_day: date
+    refresh_seconds: int
+
+    def contains(self, class_date: str) -> bool:
+        return self.first_day.isoformat() <= class_date <= self.last_day.isoformat()
+
+
+@dataclass
+class CachedTier:
+    tier: HorizonTier
+    fetched_at: datetime
+    classes: list[ClassRecord]
+
+
+@dataclass
+class ClassTierCache:
+    tiers: dict[int, CachedTier] = field(default_factory=dict)
+
+    def is_due(self, tier: HorizonTier, now: datetime) -> bool:
+        cached = self.tiers.get(tier.index)
+        if cached is None or cached.tier != tier:
+            return True
+        return now - cached.fetched_at >= timedelta(seconds=tier.refresh_seconds)
+
+    def invalidate(self) -> None:
+        self.tiers.clear()
+
+
+def build_horizon_tiers(now: datetime) -> list[HorizonTier]:
     config = get_config()
-    from_date = now.strftime("%Y-%m-%d")
-    to_date = (now + timedelta(days=config.max_days_in_advance)).strftime("%Y-%m-%d")
-    classes = await client.get_available_classes(
-        class_ids=config.class_preferences.interested_classes,
-        center_ids=config.class_preferences.interested_centers,
-        from_date=from_date,
-        to_date=to_date,
-    )
-    classes = filter_by_time_slots(
-        classes, cast(list[TimeSlotLike], config.class_preferences.available_time_slots)
+    today = now.date()
+    horizon_end = (now + timedelta(days=config.max_days_in_advance)).date()
+    tiers: list[HorizonTier] = []
+    first_day = today
+    for refresh_tier in sorted(config.refresh_tiers, key=lambda item: item.max_days_ahead):
+        if first_day > horizon_end:
+            break
+        last_day = min(today + timedelta(days=refresh_tier.max_days_ahead), horizon_end)
+        if last_day < first_day:
+            continue
+        tiers.append(HorizonTier(len(tiers), first_day, last_day, refresh_tier.refresh_seconds))
+        first_day = last_day + timedelta(days=1)
+    if first_day <= horizon_end:
+        # Days beyond the last configured tier are refreshed every cycle.
+        tiers.append(HorizonTier(len(tiers), first_day, horizon_end, 0))
+    return tiers
+
+
+def build_fetch_partitions(first_day: date, last_day: date) -> list[FetchPartition]:
+    config = get_config()
+    partition_days = config.fetch_partition_days or (last_day - first_day).days + 1
+
+    date_ranges: list[tuple[str, str]] = []
+    range_start = first_day
+    while range_start <= last_day:
+        range_end = min(range_start + timedelta(days=partition_days - 1), last_day)
+        date_ranges.append((range_start.isoformat(), range_end.isoformat()))
+        range_start = range_end + timedelta(days=1)
+
+    centers = config.class_preferences.interested_centers
+    center_groups = (
+        [(center,) for center in centers] if config.fetch_partition_by_center else [tuple(centers)]
     )
-    classes.sort(key=class_datetime)
-    return classes
+    return [
+        FetchPartition(from_date=from_date, to_date=to_date, center_ids=center_ids)
+        for from_date, to_date in date_ranges
+        for center_ids in center_groups
+    ]
+
+
+async def fetch_partitions(
+    client: PureGymClient, partitions: list[FetchPartition], timeout: float | None = None
+) -> ClassFetchResult:
+    config = get_config()
+    semaphore = asyncio.Semaphore(max(config.fetch_concurrency, 1))
+    time_slots = config.class_preferences.available_time_slots
+    result = ClassFetchResult()
+    errors: list[Exception] = []
+
+    async def fetch_partition(partition: FetchPartition) -> list[ClassRecord]:
+        async with semaphore:
+            try:
+                classes = await client.get_available_classes(
+                    class_ids=config.class_preferences.interested_classes,
+                    center_ids=list(partition.center_ids),
+                    from_date=partition.from_date,
+                    to_date=partition.to_date,
+                )
+            except Exception as exc:
+                errors.append(exc)
+                result.failed_partitions.append(partition)
+                return []
+        # Each class is parsed exactly once here; the rest of the cycle works on the records.
+        return filter_by_slot_index(build_class_records(classes), time_slots)
+
+    seen: set[str] = set()
+    tasks = {asyncio.create_task(fetch_partition(partition)): partition for partition in partitions}
+    merged: set[asyncio.Task] = set()
+
+    def merge(task: asyncio.Task) -> None:
+        merged.add(task)
+        for gym_class in task.result():
+            if gym_class.booking_id in seen:
+                continue
+            seen.add(gym_class.booking_id)
+            result.classes.append(gym_class)
+
+    try:
+        async with asyncio.timeout(timeout):
+            # Partitions are merged as they complete so a slow one does not hold the others back.
+            async for task in asyncio.as_completed(tasks):
+                merge(task)
+    except TimeoutError:
+        CYCLE_STEP_TIMEOUTS.inc(step="fetch")
+        for task, partition in tasks.items():
+            if task.done():
+                if task not in merged:
+                    merge(task)
+                continue
+            errors.append(TimeoutError(f"Fetching {partition} ran out of cycle time budget"))
+            result.failed_partitions.append(partition)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if errors:
+        if len(errors) == len(partitions):
+            raise errors[0]
+        logging.warning(
+            "Fetched %d of %d class partitions, continuing with partial results: %s",
+            len(partitions) - len(errors),
+            len(partitions),
+            errors[0],
+        )
+    return result
+
+
+async def fetch_candidate_classes(
+    client: PureGymClient,
+    now: datetime,
+    tier_cache: ClassTierCache | None = None,
+    timeout: float | None = None,
+) -> ClassFetchResult:
+    tiers = build_horizon_tiers(now)
+    due = [tier for tier in tiers if tier_cache is None or tier_cache.is_due(tier, now)]
+    partitions = [
+        partition for tier in due for partition in build_fetch_partitions(tier.first_day, tier.last_day)
+    ]
+    result = await fetch_partitions(client, partitions, timeout)
+
+    if tier_cache is not None:
+        for tier in due:
+            if any(tier.contains(partition.from_date) for partition in result.failed_partitions):
+                tier_cache.tiers.pop(tier.index, None)
+                continue
+            tier_classes = [gym_class for gym_class in result.classes if tier.contains(gym_class.date)]
+            tier_cache.tiers[tier.index] = CachedTier(tier=tier, fetched_at=now, classes=tier_classes)
+        for tier in tiers:
+            if tier not in due:
+                result.classes.extend(tier_cache.tiers[tier.index].classes)
+
+    result.classes.sort(key=lambda record: record.starts_at)
+    return result
 
 
 def reconcile_bookings_missing_in_puregym(
     session,
-    booked_by_participation: dict[str, GymClass],
+    booked_by_participation: dict[str, ClassRecord],
     now: datetime,
+    booking_state: BookingState | None = None,
 ) -> StepResult:
     result = StepResult()
-    active_bookings = get_active_bookings(session)
+    state = booking_state or BookingState.load(session)
 
-    for booking in active_bookings:
+    for booking in state.active():
         if booking.participation_id in booked_by_participation:
             continue
 
         if booking.class_datetime <= now:
             if booking.status == BookingStatus.CONFIRMED:
-                set_booking_status(session, booking, BookingStatus.ATTENDED)
+                state.set_status(session, booking, BookingStatus.ATTENDED)
             else:
-                set_booking_status(session, booking, BookingStatus.EXPIRED)
+                state.set_status(session, booking, BookingStatus.EXPIRED)
             result.prompts.append(
                 OutboundPrompt(
                     message=MessageSpec(text="A booking has passed and is now archived."),
+                    category=PromptCategory.ARCHIVED,
+                    detail=booking_detail(booking),
                 )
             )
         else:
-            set_booking_status(session, booking, BookingStatus.CANCELLED)
+            state.set_status(session, booking, BookingStatus.CANCELLED)
             result.prompts.append(
                 OutboundPrompt(
                     message=MessageSpec(text="A booking was missing in PureGym and has been cancelled."),
+                    category=PromptCategory.CANCELLED_MISSING,
+                    detail=booking_detail(booking),
                 )
             )
 
@@ -178,16 +468,13 @@ def reconcile_bookings_missing_in_puregym(
 
 def import_untracked_bookings(
     session,
-    booked_by_participation: dict[str, GymClass],
+    booked_by_participation: dict[str, ClassRecord],
+    booking_state: BookingState | None = None,
 ) -> StepResult:
     result = StepResult()
-
-    for participation_id, gym_class in booked_by_participation.items():
-        existing = get_booking_by_participation_id(session, participation_id)
-        if existing is not None:
-            continue
-
-        booking = ManagedBooking(
+    existing = get_bookings_by_participation_ids(session, booked_by_participation)
+    untracked = [
+        ManagedBooking(
             booking_id=gym_class.booking_id,
             activity_id=gym_class.activity_id,
             payment_type=gym_class.payment_type,
@@ -197,12 +484,25 @@ def import_untracked_bookings(
             class_datetime=class_datetime(gym_class),
             status=BookingStatus.PENDING,
         )
-        add_managed_booking(session, booking)
+        for participation_id, gym_class in booked_by_participation.items()
+        if participation_id not in existing
+    ]
+    # Rows recorded concurrently (e.g. by the release sniper) are skipped by the unique index.
+    imported = upsert_managed_bookings(session, untracked)
+    if imported:
         session.commit()
+    if booking_state is not None:
+        for booking in imported:
+            booking_state.add(booking)
 
+    for booking in imported:
+        participation_id = booking.participation_id
+        if participation_id is None:
+            continue
+        gym_class = as_class_record(booked_by_participation[participation_id])
         text = (
             "Found a booking not tracked by the bot:\n"
-            f"- {format_telegram_class_summary(gym_class.date, gym_class.start_time, gym_class.title, gym_class.center_name)}\n"
+            f"- {format_telegram_class_summary(gym_class.class_date, gym_class.start_clock, gym_class.title, gym_class.center_name)}\n"
             "Do you want to keep it?"
         )
         result.prompts.append(
@@ -217,13 +517,10 @@ def import_untracked_bookings(
 
 def detect_booking_state_mismatch(
     session,
-    booked_by_participation: dict[str, GymClass],
+    booked_by_participation: dict[str, ClassRecord],
+    booking_state: BookingState | None = None,
 ) -> StepResult:
-    db_participation_ids = {
-        booking.participation_id
-        for booking in get_active_bookings(session)
-        if booking.participation_id is not None
-    }
+    db_participation_ids = (booking_state or BookingState.load(session)).participation_ids()
     puregym_participation_ids = set(booked_by_participation)
 
     if db_participation_ids == puregym_participation_ids:
@@ -242,7 +539,9 @@ def detect_booking_state_mismatch(
         message += f" PureGym-only participation IDs: {', '.join(puregym_only)}."
 
     logging.warning(message)
-    return StepResult(prompts=[OutboundPrompt(message=MessageSpec(text=message))])
+    return StepResult(
+        prompts=[OutboundPrompt(message=MessageSpec(text=message), category=PromptCategory.STATE_MISMATCH)]
+    )
 
 
 def slot_is_blocked(session, slot_occurrence: SlotOccurrence) -> bool:
@@ -266,7 +565,7 @@ def slot_is_blocked(session, slot_occurrence: SlotOccurrence) -> bool:
 
 def assert_not_booked_in_slot_by_this_point(
     slot_occurrence: SlotOccurrence,
-    slot_classes: list[GymClass],
+    slot_classes: list[ClassRecord],
 ) -> bool:
     booked_in_slot = [gym_class for gym_class in slot_classes if gym_class.participation_id is not None]
     if not booked_in_slot:
@@ -283,147 +582,296 @@ def assert_not_booked_in_slot_by_this_point(
     return False
 
 
-async def handle_slot_booking_actions(
-    session,
-    client: PureGymClient,
-    grouped_by_slot: dict[SlotOccurrence, list[GymClass]],
-    active_count: int,
-) -> StepResult:
-    config = get_config()
-    result = StepResult()
+@dataclass
+class BookingBudget:
+    remaining: int
+    in_flight: int = 0
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    async def reserve(self) -> bool:
+        async with self._changed:
+            while self.remaining - self.in_flight <= 0:
+                # Only wait if an in-flight attempt might still hand its reservation back.
+                if self.in_flight == 0:
+                    return False
+                await self._changed.wait()
+            self.in_flight += 1
+            return True
+
+    async def settle(self, booked: bool) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            if booked:
+                self.remaining -= 1
+            self._changed.notify_all()
+
+
+@dataclass
+class PlannedSlot:
+    slot_occurrence: SlotOccurrence
+    available: list[ClassRecord]
+    response: BookClassResult | None = None
+    error: BaseException | None = None
 
+    @property
+    def is_single(self) -> bool:
+        return len(self.available) == 1
+
+
+def plan_slot_actions(
+    session,
+    grouped_by_slot: dict[SlotOccurrence, list[ClassRecord]],
+    unresolved_slots: set[SlotOccurrence],
+) -> list[PlannedSlot]:
+    planned: list[PlannedSlot] = []
+    # Two queries cover every slot in the horizon instead of two per slot.
+    blocking = SlotBlockingIndex.load(session, grouped_by_slot)
     for slot_occurrence in sorted(
         grouped_by_slot.keys(),
         key=lambda item: (item.date, item.slot_start, item.slot_end),
     ):
-        if active_count >= config.max_bookings:
-            logging.info("Max bookings reached, skipping further booking attempts")
-            break
-
-        if slot_is_blocked(session, slot_occurrence):
+        if blocking.is_blocked(slot_occurrence):
             continue
 
         slot_classes = grouped_by_slot[slot_occurrence]
         if not assert_not_booked_in_slot_by_this_point(slot_occurrence, slot_classes):
+            unresolved_slots.add(slot_occurrence)
             continue
 
         available = [gym_class for gym_class in slot_classes if gym_class.participation_id is None]
-        if not available:
-            continue
+        if available:
+            planned.append(PlannedSlot(slot_occurrence=slot_occurrence, available=available))
+    return planned
 
-        if len(available) == 1:
-            gym_class = available[0]
-            logging.info("Attempting to book class %s", gym_class.booking_id)
-            response = await client.book_by_ids(
-                gym_class.booking_id,
-                gym_class.activity_id,
-                gym_class.payment_type,
-            )
-            if response.status != "success":
-                logging.info("Booking failed for %s: %s", gym_class.booking_id, response)
-                continue
 
-            participation_id = response.participation_id
-            if not participation_id:
-                logging.info(
-                    "Booking response missing participation_id for %s: %s",
+async def book_planned_slots(
+    client: PureGymClient,
+    planned: list[PlannedSlot],
+    budget: BookingBudget,
+    concurrency: int,
+    timeout: float | None = None,
+) -> None:
+    # The semaphore hands out permits in FIFO order, so budget is reserved in slot order.
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def attempt(slot: PlannedSlot) -> None:
+        async with semaphore:
+            if not await budget.reserve():
+                return
+            gym_class = slot.available[0]
+            logging.info("Attempting to book class %s", gym_class.booking_id)
+            booked = False
+            try:
+                slot.response = await client.book_by_ids(
                     gym_class.booking_id,
-                    response,
+                    gym_class.activity_id,
+                    gym_class.payment_type,
                 )
-                continue
+                booked = slot.response.status == "success" and bool(slot.response.participation_id)
+            except Exception as exc:
+                slot.error = exc
+            finally:
+                await budget.settle(booked)
+
+    try:
+        async with asyncio.timeout(timeout):
+            await asyncio.gather(*(attempt(slot) for slot in planned if slot.is_single))
+    except TimeoutError:
+        # Finished attempts keep their response and are recorded; the rest are retried next cycle.
+        CYCLE_STEP_TIMEOUTS.inc(step="book_slots")
+        logging.warning("Booking ran out of cycle time budget; unfinished slots are retried")
+
+
+def record_single_booking(session, slot: PlannedSlot, result: StepResult) -> bool:
+    gym_class = slot.available[0]
+    response = slot.response
+    if response is None:
+        result.unresolved_slots.add(slot.slot_occurrence)
+        return False
+
+    if response.status != "success":
+        logging.info("Booking failed for %s: %s", gym_class.booking_id, response)
+        result.unresolved_slots.add(slot.slot_occurrence)
+        return False
+
+    participation_id = response.participation_id
+    if not participation_id:
+        logging.info(
+            "Booking response missing participation_id for %s: %s",
+            gym_class.booking_id,
+            response,
+        )
+        result.unresolved_slots.add(slot.slot_occurrence)
+        return False
+
+    booking = ManagedBooking(
+        booking_id=gym_class.booking_id,
+        activity_id=gym_class.activity_id,
+        payment_type=gym_class.payment_type,
+        participation_id=participation_id,
+        class_title=gym_class.title,
+        class_location=gym_class.center_name,
+        class_datetime=class_datetime(gym_class),
+        status=BookingStatus.PENDING,
+    )
+    add_managed_booking(session, booking)
+    session.commit()
+
+    message = build_keep_booking_prompt(
+        participation_id,
+        text=(
+            "Booked: "
+            f"{
+                format_telegram_booking(
+                    class_datetime=class_datetime(gym_class),
+                    title=gym_class.title,
+                    location=gym_class.center_name,
+                    waitlist_position=gym_class.waitlist_position,
+                )
+            }\n"
+            "Do you want to keep it?"
+        ),
+    )
+    result.prompts.append(OutboundPrompt(booking=booking, message=message))
+    return True
 
-            booking = ManagedBooking(
+
+def record_booking_choice(session, slot: PlannedSlot, result: StepResult) -> None:
+    slot_occurrence = slot.slot_occurrence
+    options: list[BookingChoiceOption] = []
+    ordered = sorted(slot.available, key=class_datetime)
+    for gym_class in ordered:
+        options.append(
+            BookingChoiceOption(
                 booking_id=gym_class.booking_id,
                 activity_id=gym_class.activity_id,
                 payment_type=gym_class.payment_type,
-                participation_id=participation_id,
-                class_title=gym_class.title,
-                class_location=gym_class.center_name,
-                class_datetime=class_datetime(gym_class),
-                status=BookingStatus.PENDING,
+                title=gym_class.title,
+                date=gym_class.date,
+                start_time=gym_class.start_time,
+                location=gym_class.center_name,
             )
-            add_managed_booking(session, booking)
-            session.commit()
-            active_count += 1
+        )
 
-            message = build_keep_booking_prompt(
-                participation_id,
-                text=(
-                    "Booked: "
-                    f"{
-                        format_telegram_booking(
-                            class_date=gym_class.date,
-                            start_time=gym_class.start_time,
-                            title=gym_class.title,
-                            location=gym_class.center_name,
-                            waitlist_position=gym_class.waitlist_position,
-                        )
-                    }\n"
-                    "Do you want to keep it?"
-                ),
-            )
-            result.prompts.append(OutboundPrompt(booking=booking, message=message))
+    choice = BookingChoice(
+        slot_date=slot_occurrence.date,
+        slot_start=slot_occurrence.slot_start,
+        slot_end=slot_occurrence.slot_end,
+        options_json=json.dumps([opt.model_dump() for opt in options]),
+    )
+    add_booking_choice(session, choice)
+    session.commit()
+    if choice.id is None:
+        raise ValueError("Booking choice ID must be set after commit")
+    choice_id = choice.id
+
+    lines = ["Multiple classes match this time slot. Pick one to book:"]
+    # The options carry ISO strings for storage; the prompt reuses the already parsed records.
+    for idx, gym_class in enumerate(ordered, start=1):
+        lines.append(
+            f"{idx}. "
+            f"{format_telegram_class_summary(gym_class.class_date, gym_class.start_clock, gym_class.title, gym_class.center_name)}"
+        )
+
+    buttons: tuple[tuple[ButtonSpec, ...], ...] = tuple(
+        (
+            build_choice_pick_button(
+                choice_id=choice_id,
+                option_index=idx,
+                label=f"{idx + 1}. {format_telegram_time(gym_class.start_clock)} {gym_class.title}",
+            ),
+        )
+        for idx, gym_class in enumerate(ordered)
+    )
+    result.prompts.append(
+        OutboundPrompt(
+            choice=choice,
+            message=MessageSpec(text="\n".join(lines), buttons=buttons),
+        )
+    )
+
+
+async def handle_slot_booking_actions(
+    session,
+    client: PureGymClient,
+    grouped_by_slot: dict[SlotOccurrence, list[ClassRecord]],
+    active_count: int,
+    timeout: float | None = None,
+) -> StepResult:
+    config = get_config()
+    result = StepResult()
+
+    planned = plan_slot_actions(session, grouped_by_slot, result.unresolved_slots)
+    budget = BookingBudget(remaining=config.max_bookings - active_count)
+    await book_planned_slots(client, planned, budget, config.booking_concurrency, timeout)
+
+    # Bookings are recorded in slot order so prompts stay deterministic regardless of
+    # which request finished first.
+    for index, slot in enumerate(planned):
+        if active_count >= config.max_bookings:
+            logging.info("Max bookings reached, skipping further booking attempts")
+            result.unresolved_slots.update(item.slot_occurrence for item in planned[index:])
+            break
+
+        if not slot.is_single:
+            record_booking_choice(session, slot, result)
             continue
 
-        options: list[BookingChoiceOption] = []
-        for gym_class in sorted(available, key=class_datetime):
-            options.append(
-                BookingChoiceOption(
-                    booking_id=gym_class.booking_id,
-                    activity_id=gym_class.activity_id,
-                    payment_type=gym_class.payment_type,
-                    title=gym_class.title,
-                    date=gym_class.date,
-                    start_time=gym_class.start_time,
-                    location=gym_class.center_name,
-                )
-            )
+        if record_single_booking(session, slot, result):
+            active_count += 1
 
-        choice = BookingChoice(
-            slot_date=slot_occurrence.date,
-            slot_start=slot_occurrence.slot_start,
-            slot_end=slot_occurrence.slot_end,
-            options_json=json.dumps([opt.model_dump() for opt in options]),
-        )
-        add_booking_choice(session, choice)
-        session.commit()
-        if choice.id is None:
-            raise ValueError("Booking choice ID must be set after commit")
-        choice_id = choice.id
-
-        lines = ["Multiple classes match this time slot. Pick one to book:"]
-        for idx, option in enumerate(options, start=1):
-            lines.append(
-                f"{idx}. "
-                f"{format_telegram_class_summary(option.date, option.start_time, option.title, option.location)}"
-            )
+    errors = [slot.error for slot in planned if slot.error is not None]
+    unavailable = [error for error in errors if is_unavailable(error)]
+    if unavailable:
+        # Those slots stay unresolved and are retried once PureGym answers again.
+        logging.warning("PureGym was unavailable for %d booking(s): %s", len(unavailable), unavailable[0])
+    errors = [error for error in errors if not is_unavailable(error)]
+    if errors:
+        raise errors[0]
+    return result
 
-        buttons: tuple[tuple[ButtonSpec, ...], ...] = tuple(
-            (
-                build_choice_pick_button(
-                    choice_id=choice_id,
-                    option_index=idx,
-                    label=f"{idx + 1}. {format_telegram_time(option.start_time)} {option.title}",
+
+def reminder_prompt(booking: ManagedBooking) -> OutboundPrompt | None:
+    if booking.participation_id is None:
+        return None
+    if booking.status == BookingStatus.PENDING:
+        return OutboundPrompt(
+            booking=booking,
+            message=build_keep_booking_prompt(
+                booking.participation_id,
+                text=reminder_text(
+                    booking,
+                    intro="Reminder: you have a pending booking coming up.",
+                    outro="Do you want to keep it?",
                 ),
-            )
-            for idx, option in enumerate(options)
+            ),
         )
-        result.prompts.append(
-            OutboundPrompt(
-                choice=choice,
-                message=MessageSpec(text="\n".join(lines), buttons=buttons),
-            )
+    if booking.status == BookingStatus.CONFIRMED:
+        return OutboundPrompt(
+            booking=booking,
+            message=build_confirmed_booking_prompt(
+                booking.participation_id,
+                text=reminder_text(
+                    booking,
+                    intro="Reminder: your class is coming up soon.",
+                    outro="If you changed your mind, cancel now or revert to pending to reconsider.",
+                ),
+            ),
         )
-
-    return result
+    return None
 
 
-def send_due_reminders(session, now: datetime, reminder_hours: int) -> StepResult:
+def send_due_reminders(
+    session,
+    now: datetime,
+    reminder_hours: int,
+    booking_state: BookingState | None = None,
+) -> StepResult:
     result = StepResult()
     threshold = timedelta(hours=reminder_hours)
-    active_bookings = get_active_bookings(session)
+    state = booking_state or BookingState.load(session)
 
-    for booking in active_bookings:
+    for booking in state.starting_before(now + threshold):
         if booking.reminder_sent:
             continue
 
@@ -431,37 +879,9 @@ def send_due_reminders(session, now: datetime, reminder_hours: int) -> StepResul
         if time_to_class > threshold:
             continue
 
-        if booking.status == BookingStatus.PENDING and booking.participation_id is not None:
-            result.prompts.append(
-                OutboundPrompt(
-                    booking=booking,
-                    message=build_keep_booking_prompt(
-                        booking.participation_id,
-                        text=reminder_text(
-                            booking,
-                            intro="Reminder: you have a pending booking coming up.",
-                            outro="Do you want to keep it?",
-                        ),
-                    ),
-                )
-            )
-            set_reminder_sent(session, booking)
-            continue
-
-        if booking.status == BookingStatus.CONFIRMED and booking.participation_id is not None:
-            result.prompts.append(
-                OutboundPrompt(
-                    booking=booking,
-                    message=build_confirmed_booking_prompt(
-                        booking.participation_id,
-                        text=reminder_text(
-                            booking,
-                            intro="Reminder: your class is coming up soon.",
-                            outro="If you changed your mind, cancel now or revert to pending to reconsider.",
-                        ),
-                    ),
-                )
-            )
+        prompt = reminder_prompt(booking)
+        if prompt is not None:
+            result.prompts.append(prompt)
             set_reminder_sent(session, booking)
 
     if result.prompts:
@@ -469,102 +889,483 @@ def send_due_reminders(session, now: datetime, reminder_hours: int) -> StepResul
     return result
 
 
+async def auto_cancel_booking(
+    session,
+    client: PureGymClient,
+    booking: ManagedBooking,
+    auto_cancel_hours: int,
+    state: BookingState,
+) -> OutboundPrompt | None:
+    if booking.participation_id is None:
+        return None
+
+    try:
+        response = await client.unbook_participation(booking.participation_id)
+    except Exception as exc:
+        if not is_unavailable(exc):
+            raise
+        logging.info("Postponing auto-cancel of booking %s: %s", booking.booking_id, exc)
+        return None
+    if response.status != "success":
+        logging.info("Failed to auto-cancel booking %s: %s", booking.booking_id, response)
+        return None
+
+    state.set_status(session, booking, BookingStatus.CANCELLED)
+    return OutboundPrompt(
+        message=MessageSpec(text=(f"Pending booking was cancelled {auto_cancel_hours}h before class time.")),
+        category=PromptCategory.AUTO_CANCELLED,
+        detail=booking_detail(booking),
+    )
+
+
 async def auto_cancel_stale_pending_bookings(
     session,
     client: PureGymClient,
     now: datetime,
     auto_cancel_hours: int,
+    booking_state: BookingState | None = None,
 ) -> StepResult:
     result = StepResult()
     threshold = timedelta(hours=auto_cancel_hours)
-    pending = get_pending_bookings(session)
+    state = booking_state or BookingState.load(session)
 
-    for booking in pending:
+    for booking in state.starting_before(now + threshold, status=BookingStatus.PENDING):
         time_to_class = booking.class_datetime - now
         if time_to_class > threshold:
             continue
 
-        if booking.participation_id is None:
+        prompt = await auto_cancel_booking(session, client, booking, auto_cancel_hours, state)
+        if prompt is not None:
+            result.prompts.append(prompt)
+
+    if result.prompts:
+        session.commit()
+    return result
+
+
+async def handle_due_deadlines(
+    session,
+    client: PureGymClient,
+    deadlines: DeadlineQueue,
+    now: datetime,
+    booking_state: BookingState,
+) -> StepResult:
+    """Send the reminders and auto-cancels whose deadline has passed, without scanning the bookings."""
+    config = get_config()
+    result = StepResult()
+    for booking_id, kind in deadlines.pop_due(now):
+        # The entry may predate a status change, so the booking is checked again before acting.
+        booking = booking_state.bookings.get(booking_id)
+        if booking is None:
             continue
 
-        response = await client.unbook_participation(booking.participation_id)
-        if response.status != "success":
-            logging.info("Failed to auto-cancel booking %s: %s", booking.booking_id, response)
+        if kind == DeadlineKind.REMINDER:
+            prompt = reminder_prompt(booking) if reminder_is_due(booking) else None
+            if prompt is not None:
+                result.prompts.append(prompt)
+                set_reminder_sent(session, booking)
             continue
 
-        set_booking_status(session, booking, BookingStatus.CANCELLED)
-        result.prompts.append(
-            OutboundPrompt(
-                message=MessageSpec(
-                    text=(f"Pending booking was cancelled {auto_cancel_hours}h before class time.")
-                ),
-            )
+        if not auto_cancel_is_due(booking):
+            continue
+        prompt = await auto_cancel_booking(
+            session, client, booking, deadlines.auto_cancel_hours, booking_state
         )
+        if prompt is None:
+            # PureGym refused; try again on the next booking interval rather than on the next tick.
+            deadlines.push(booking_id, kind, now + timedelta(seconds=config.booking_interval_seconds))
+            continue
+        result.prompts.append(prompt)
 
     if result.prompts:
         session.commit()
     return result
 
 
-async def publish_prompts(context: ContextTypes.DEFAULT_TYPE, session, prompts: list[OutboundPrompt]) -> None:
+async def publish_prompts(
+    context: ContextTypes.DEFAULT_TYPE,
+    session,
+    prompts: list[OutboundPrompt],
+    digest: PromptDigest | None = None,
+) -> None:
     config = get_config()
+    if digest is not None:
+        prompts = digest.hold(prompts)
+    sender = get_outbox_sender(context.bot_data)
+    if sender is not None:
+        # Queued in the step's own transaction; the sender delivers them once it commits.
+        enqueue_prompts(session, sender, config.telegram_id, prompts)
+        PROMPTS_PUBLISHED.inc(len(prompts), delivery="outbox")
+        return
+
     for prompt in prompts:
-        sent_message = await context.bot.send_message(
-            chat_id=config.telegram_id,
-            text=prompt.message.text,
-            reply_markup=message_markup(prompt.message),
-        )
+        with observe(TELEGRAM_SEND_DURATION, TELEGRAM_SEND_ERRORS, path="cycle"):
+            sent_message = await context.bot.send_message(
+                chat_id=config.telegram_id,
+                text=prompt.message.text,
+                reply_markup=message_markup(prompt.message),
+            )
+        PROMPTS_PUBLISHED.inc(delivery="direct")
 
         if prompt.booking is not None:
             set_message_id(session, prompt.booking, sent_message.message_id)
-            session.commit()
 
         if prompt.choice is not None:
             set_choice_message_id(session, prompt.choice, sent_message.message_id)
-            session.commit()
+
+    if any(prompt.booking is not None or prompt.choice is not None for prompt in prompts):
+        session.commit()
 
 
-async def run_booking_cycle(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def run_booking_deadlines(context: ContextTypes.DEFAULT_TYPE) -> None:
     config = get_config()
-    now = copenhagen_now()
     client = context.bot_data.get("puregym_client")
     if client is None:
         raise ValueError("No PureGym client found")
 
     with get_db_session() as session:
         if not is_cycle_active(session):
-            logging.info("Booking cycle skipped because bot is inactive")
+            # Left in the queue; the timer retries after booking_interval_seconds.
             return
+        async with get_booking_lock(context):
+            booking_state = BookingState.load(session)
+            deadlines = load_deadline_queue(
+                context.bot_data,
+                booking_state.active,
+                config.booking_reminder_hours,
+                config.pending_auto_cancel_hours,
+            )
+            result = await handle_due_deadlines(session, client, deadlines, copenhagen_now(), booking_state)
+        if result.prompts:
+            mark_bookings_changed(context.bot_data)
+        if any(prompt.category == PromptCategory.AUTO_CANCELLED for prompt in result.prompts):
+            invalidate_class_cache(context.bot_data)
+        await publish_prompts(context, session, result.prompts)
 
-    logging.info("Running booking cycle: {%s}", now.isoformat())
-    classes = await fetch_candidate_classes(client, now)
-    booked_classes = filter_by_booked(classes)
-    booked_by_participation = {
-        item.participation_id: item for item in booked_classes if item.participation_id
-    }
-    grouped = group_by_slot(classes, config.class_preferences.available_time_slots)
 
+def start_booking_deadline_timer(application) -> None:
+    config = get_config()
     with get_db_session() as session:
-        result = reconcile_bookings_missing_in_puregym(session, booked_by_participation, now)
-        await publish_prompts(context, session, result.prompts)
+        deadlines = load_deadline_queue(
+            application.bot_data,
+            lambda: get_active_bookings(session),
+            config.booking_reminder_hours,
+            config.pending_auto_cancel_hours,
+        )
+    # The application carries the bot and bot_data that the deadline run reads from a job context.
+    context = cast(ContextTypes.DEFAULT_TYPE, application)
+    start_deadline_timer(
+        application.bot_data,
+        deadlines,
+        lambda: run_booking_deadlines(context),
+        config.booking_interval_seconds,
+    )
 
-        result = import_untracked_bookings(session, booked_by_participation)
-        await publish_prompts(context, session, result.prompts)
 
-        result = detect_booking_state_mismatch(session, booked_by_participation)
-        await publish_prompts(context, session, result.prompts)
+def get_booking_lock(context: ContextTypes.DEFAULT_TYPE) -> asyncio.Lock:
+    # Serialises slot booking between the regular cycle and release-time snipes.
+    lock = context.bot_data.get("booking_lock")
+    if lock is None:
+        lock = asyncio.Lock()
+        context.bot_data["booking_lock"] = lock
+    return lock
 
-        active_count = len(get_active_bookings(session))
-        result = await handle_slot_booking_actions(session, client, grouped, active_count)
-        await publish_prompts(context, session, result.prompts)
 
-        result = send_due_reminders(session, now, config.booking_reminder_hours)
-        await publish_prompts(context, session, result.prompts)
+def get_class_tier_cache(context: ContextTypes.DEFAULT_TYPE) -> ClassTierCache:
+    tier_cache = context.bot_data.get("class_tier_cache")
+    if tier_cache is None:
+        tier_cache = ClassTierCache()
+        context.bot_data["class_tier_cache"] = tier_cache
+    return tier_cache
 
-        result = await auto_cancel_stale_pending_bookings(
-            session,
-            client,
-            now,
-            config.pending_auto_cancel_hours,
+
+def invalidate_class_cache(bot_data: dict) -> None:
+    # Booking writes change participation state, so neither cached tiers nor the bookings snapshot
+    # may hide them.
+    tier_cache = bot_data.get("class_tier_cache")
+    if tier_cache is not None:
+        tier_cache.invalidate()
+    invalidate_bookings_snapshot(bot_data)
+
+
+def bookings_snapshot_due(cache: BookingsSnapshotCache, plan: CyclePlan) -> bool:
+    """Only booking changes trigger a fetch; the commands refresh an aging snapshot when they read it."""
+    if cache.snapshot is None:
+        # Not fetched yet, or invalidated by a booking write
+        return True
+    # The incremental diff saw a booking change that was not made by the bot.
+    return plan.slots is not None and plan.sync_bookings
+
+
+async def publish_bookings_snapshot(
+    context: ContextTypes.DEFAULT_TYPE, client: PureGymClient, timeout: float | None = None
+) -> None:
+    try:
+        async with asyncio.timeout(timeout):
+            await get_bookings_snapshot_cache(context.bot_data).fetch(client)
+    except TimeoutError:
+        CYCLE_STEP_TIMEOUTS.inc(step="bookings_snapshot")
+        logging.warning("Publishing the bookings snapshot ran out of cycle time budget")
+    except Exception:
+        # The commands fall back to a live fetch, so a missed snapshot only costs them latency.
+        logging.warning("Failed to publish the bookings snapshot", exc_info=True)
+
+
+def get_incremental_state(context: ContextTypes.DEFAULT_TYPE) -> IncrementalCycleState:
+    state = context.bot_data.get("incremental_cycle_state")
+    if state is None:
+        state = IncrementalCycleState()
+        context.bot_data["incremental_cycle_state"] = state
+    return state
+
+
+def affected_slot_occurrences(delta: ClassDelta, time_slots: list[TimeSlot]) -> set[SlotOccurrence]:
+    affected: set[SlotOccurrence] = set()
+    slot_index = compile_slot_index(time_slots)
+    for gym_class in delta.touched_classes():
+        slot_occurrence = get_matching_slot_occurrence(gym_class, time_slots, slot_index)
+        if slot_occurrence is not None:
+            affected.add(slot_occurrence)
+    return affected
+
+
+def plan_cycle(
+    state: IncrementalCycleState,
+    snapshot: ClassSnapshot,
+    time_slots: list[TimeSlot],
+    now: datetime,
+) -> CyclePlan:
+    config = get_config()
+    full_sync_due = state.last_full_sync is None or now - state.last_full_sync >= timedelta(
+        seconds=config.full_sync_interval_seconds
+    )
+    if not config.incremental_booking_cycle or state.snapshot is None or full_sync_due:
+        return CyclePlan(sync_bookings=True, slots=None)
+
+    delta = diff_class_snapshots(state.snapshot, snapshot)
+    slots = affected_slot_occurrences(delta, time_slots) | state.retry_slots
+    return CyclePlan(sync_bookings=delta.touches_bookings(), slots=frozenset(slots))
+
+
+def select_slot_classes(
+    classes: list[ClassRecord],
+    time_slots: list[TimeSlot],
+    slots: frozenset[SlotOccurrence] | None,
+) -> dict[SlotOccurrence, list[ClassRecord]]:
+    if slots is not None and not slots:
+        return {}
+    grouped = group_by_slot(classes, time_slots)
+    if slots is None:
+        return grouped
+    return {
+        slot_occurrence: grouped[slot_occurrence] for slot_occurrence in slots if slot_occurrence in grouped
+    }
+
+
+async def run_deadline_steps(
+    context: ContextTypes.DEFAULT_TYPE,
+    session,
+    client: PureGymClient,
+    booking_state: BookingState,
+    now: datetime,
+    digest: PromptDigest,
+) -> None:
+    """The reminder and auto-cancel steps; only the auto-cancels call PureGym."""
+    config = get_config()
+    if config.booking_deadline_timer:
+        # Deadlines that passed while the cycle ran are handled here; the timer fires the rest.
+        session.checkpoint()
+        async with get_booking_lock(context):
+            booking_state.refresh_if_stale(session, context.bot_data)
+            deadlines = load_deadline_queue(
+                context.bot_data,
+                booking_state.active,
+                config.booking_reminder_hours,
+                config.pending_auto_cancel_hours,
+            )
+            with observe(CYCLE_STEP_DURATION, step="deadlines"):
+                result = await handle_due_deadlines(session, client, deadlines, now, booking_state)
+            session.checkpoint()
+        if any(prompt.category == PromptCategory.AUTO_CANCELLED for prompt in result.prompts):
+            invalidate_class_cache(context.bot_data)
+        await publish_prompts(context, session, result.prompts, digest)
+        session.checkpoint()
+    else:
+        booking_state.refresh_if_stale(session, context.bot_data)
+        with observe(CYCLE_STEP_DURATION, step="reminders"):
+            result = send_due_reminders(session, now, config.booking_reminder_hours, booking_state)
+        session.checkpoint()
+        await publish_prompts(context, session, result.prompts, digest)
+
+        session.checkpoint()
+        booking_state.refresh_if_stale(session, context.bot_data)
+        with observe(CYCLE_STEP_DURATION, step="auto_cancel"):
+            result = await auto_cancel_stale_pending_bookings(
+                session,
+                client,
+                now,
+                config.pending_auto_cancel_hours,
+                booking_state,
+            )
+        session.checkpoint()
+        if result.prompts:
+            invalidate_class_cache(context.bot_data)
+        await publish_prompts(context, session, result.prompts, digest)
+        session.checkpoint()
+
+
+async def flush_digest(context: ContextTypes.DEFAULT_TYPE, session, digest: PromptDigest) -> None:
+    await publish_prompts(context, session, [OutboundPrompt(message=message) for message in digest.flush()])
+    session.checkpoint()
+
+
+async def run_booking_cycle(context: ContextTypes.DEFAULT_TYPE) -> CycleReport:
+    try:
+        with observe(CYCLE_DURATION):
+            report = await execute_booking_cycle(context)
+    except Exception:
+        CYCLES.inc(outcome="failed")
+        raise
+    CYCLES.inc(outcome="completed" if report.ran else "skipped")
+    return report
+
+
+async def execute_booking_cycle(context: ContextTypes.DEFAULT_TYPE) -> CycleReport:
+    config = get_config()
+    now = copenhagen_now()
+    client = context.bot_data.get("puregym_client")
+    if client is None:
+        raise ValueError("No PureGym client found")
+
+    with get_db_session() as session:
+        if not is_cycle_active(session):
+            logging.info("Booking cycle skipped because bot is inactive")
+            return CycleReport(started_at=now, ran=False)
+
+    # Steps stage their writes and the unit of work commits them at each durability point,
+    # which sits before every network call so no write lock is held while awaiting.
+    with get_db_session() as db_session, unit_of_work(db_session, config.cycle_unit_of_work) as session:
+        # Active bookings are loaded once and every step reads and updates this snapshot. Writers
+        # outside the cycle bump the version, which makes the next step reload it.
+        booking_state = BookingState.load(session, booking_state_version(context.bot_data))
+        digest = PromptDigest(config.notification_digest, config.digest_min_prompts)
+        try:
+            return await run_booking_steps(context, session, client, booking_state, now, digest)
+        finally:
+            try:
+                # Reminders and auto-cancels only need the database; a failed PureGym step cannot skip them.
+                await run_deadline_steps(context, session, client, booking_state, now, digest)
+            finally:
+                # Held notices describe changes that are already committed, so they go out whatever fails.
+                await flush_digest(context, session, digest)
+
+
+async def run_booking_steps(
+    context: ContextTypes.DEFAULT_TYPE,
+    session,
+    client: PureGymClient,
+    booking_state: BookingState,
+    now: datetime,
+    digest: PromptDigest,
+) -> CycleReport:
+    config = get_config()
+    breaker = get_circuit_breaker(context.bot_data)
+    if breaker is not None and not all(breaker.available(method) for method in CYCLE_PUREGYM_METHODS):
+        logging.warning("PureGym circuit is open; running only the reminder steps")
+        return CycleReport(started_at=now, degraded=True)
+
+    logging.info("Running booking cycle: {%s}", now.isoformat())
+    budget = CycleTimeBudget(config.cycle_time_budget_seconds, config.cycle_deadline_reserve_seconds)
+    try:
+        with observe(CYCLE_STEP_DURATION, step="fetch"):
+            fetch = await fetch_candidate_classes(
+                client, now, get_class_tier_cache(context), budget.allowance("fetch")
+            )
+    except Exception as exc:
+        # Outages, open circuits and a fetch that used up its time budget all degrade the cycle.
+        if not is_unavailable(exc):
+            raise
+        logging.warning("PureGym is unavailable (%s); running only the reminder steps", exc)
+        return CycleReport(started_at=now, degraded=True)
+    classes = fetch.classes
+    booked_classes = filter_by_booked(classes)
+    booked_by_participation = {
+        item.participation_id: item for item in booked_classes if item.participation_id
+    }
+    time_slots = config.class_preferences.available_time_slots
+    incremental = get_incremental_state(context)
+    snapshot = ClassSnapshot.from_classes(classes, taken_at=now)
+    plan = plan_cycle(incremental, snapshot, time_slots, now)
+    if not fetch.complete:
+        # Classes from failed partitions look cancelled, so booking reconciliation has to wait.
+        plan = CyclePlan(sync_bookings=False, slots=plan.slots)
+    grouped = select_slot_classes(classes, time_slots, plan.slots)
+    if not budget.exhausted and bookings_snapshot_due(get_bookings_snapshot_cache(context.bot_data), plan):
+        with observe(CYCLE_STEP_DURATION, step="bookings_snapshot"):
+            await publish_bookings_snapshot(context, client, budget.allowance("bookings_snapshot"))
+    if plan.slots is not None:
+        logging.info(
+            "Incremental booking cycle: %d affected slot(s), booking sync %s",
+            len(grouped),
+            "needed" if plan.sync_bookings else "skipped",
         )
-        await publish_prompts(context, session, result.prompts)
+
+    booking_state.refresh_if_stale(session, context.bot_data)
+    if plan.sync_bookings:
+        with observe(CYCLE_STEP_DURATION, step="reconcile"):
+            prompts = reconcile_bookings_missing_in_puregym(
+                session, booked_by_participation, now, booking_state
+            ).prompts
+        with observe(CYCLE_STEP_DURATION, step="import"):
+            prompts += import_untracked_bookings(session, booked_by_participation, booking_state).prompts
+        with observe(CYCLE_STEP_DURATION, step="mismatch"):
+            prompts += detect_booking_state_mismatch(session, booked_by_participation, booking_state).prompts
+        session.checkpoint()
+        track_booking_deadlines(context.bot_data, [prompt.booking for prompt in prompts if prompt.booking])
+        await publish_prompts(context, session, prompts, digest)
+        # Queued prompts are flushed writes; committing them here keeps the lock wait below lock-free.
+        session.checkpoint()
+
+    unresolved_slots: set[SlotOccurrence] = set()
+    max_bookings_reached = False
+    if grouped and budget.exhausted:
+        # Left for the next cycle so the reminder steps still run on time.
+        CYCLE_STEP_TIMEOUTS.inc(step="book_slots")
+        logging.warning("Cycle time budget is spent; deferring %d slot(s)", len(grouped))
+        unresolved_slots = set(grouped)
+    elif grouped:
+        async with get_booking_lock(context):
+            session.checkpoint()
+            booking_state.refresh_if_stale(session, context.bot_data)
+            active_count = booking_state.active_count
+            try:
+                with observe(CYCLE_STEP_DURATION, step="book_slots"):
+                    result = await handle_slot_booking_actions(
+                        session, client, grouped, active_count, budget.allowance("book_slots")
+                    )
+            finally:
+                # Classes booked at PureGym are made durable before anything else happens.
+                session.checkpoint()
+            for prompt in result.prompts:
+                if prompt.booking is not None:
+                    booking_state.add(prompt.booking)
+            unresolved_slots = result.unresolved_slots
+            booked_count = sum(1 for prompt in result.prompts if prompt.booking is not None)
+            max_bookings_reached = active_count + booked_count >= config.max_bookings
+            if booked_count:
+                invalidate_class_cache(context.bot_data)
+                track_booking_deadlines(
+                    context.bot_data, [prompt.booking for prompt in result.prompts if prompt.booking]
+                )
+            await publish_prompts(context, session, result.prompts, digest)
+            session.checkpoint()
+
+    incremental.snapshot = snapshot
+    incremental.retry_slots = unresolved_slots
+    if plan.slots is None and fetch.complete:
+        incremental.last_full_sync = now
+    return CycleReport(
+        started_at=now,
+        unresolved_slots=len(unresolved_slots),
+        max_bookings_reached=max_bookings_reached,
+    )
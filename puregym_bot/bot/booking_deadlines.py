@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import Awaitable, Callable, Iterable
+
+from puregym_bot.datetime_utils import copenhagen_now
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+
+DEADLINE_QUEUE_KEY = "booking_deadlines"
+DEADLINE_TIMER_KEY = "booking_deadline_timer"
+
+
+class DeadlineKind(StrEnum):
+    REMINDER = "reminder"
+    AUTO_CANCEL = "auto_cancel"
+
+
+def reminder_is_due(booking: ManagedBooking) -> bool:
+    return (
+        booking.participation_id is not None
+        and not booking.reminder_sent
+        and booking.status in (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+    )
+
+
+def auto_cancel_is_due(booking: ManagedBooking) -> bool:
+    return booking.participation_id is not None and booking.status == BookingStatus.PENDING
+
+
+@dataclass
+class DeadlineQueue:
+    """Reminder and auto-cancel deadlines of the active bookings, earliest first.
+
+    Entries are invalidated lazily: re-tracking a booking only records which entry is current, and
+    superseded entries are dropped when they reach the top of the heap.
+    """
+
+    reminder_hours: int
+    auto_cancel_hours: int
+    heap: list[tuple[datetime, int, int, DeadlineKind]] = field(default_factory=list)
+    # (booking id, kind) -> sequence number of the entry that is still valid
+    live: dict[tuple[int, DeadlineKind], int] = field(default_factory=dict)
+    sequence: itertools.count = field(default_factory=itertools.count)
+
+    @classmethod
+    def from_bookings(
+        cls, bookings: Iterable[ManagedBooking], reminder_hours: int, auto_cancel_hours: int
+    ) -> "DeadlineQueue":
+        queue = cls(reminder_hours, auto_cancel_hours)
+        queue.track(bookings)
+        return queue
+
+    def deadlines(self, booking: ManagedBooking) -> dict[DeadlineKind, datetime]:
+        deadlines: dict[DeadlineKind, datetime] = {}
+        if reminder_is_due(booking):
+            deadlines[DeadlineKind.REMINDER] = booking.class_datetime - timedelta(hours=self.reminder_hours)
+        if auto_cancel_is_due(booking):
+            deadlines[DeadlineKind.AUTO_CANCEL] = booking.class_datetime - timedelta(
+                hours=self.auto_cancel_hours
+            )
+        return deadlines
+
+    def track(self, bookings: Iterable[ManagedBooking]) -> None:
+        for booking in bookings:
+            if booking.id is None:
+                continue
+            deadlines = self.deadlines(booking)
+            for kind in DeadlineKind:
+                if kind in deadlines:
+                    self.push(booking.id, kind, deadlines[kind])
+                else:
+                    self.live.pop((booking.id, kind), None)
+        if len(self.heap) > 2 * len(self.live) + 32:
+            self.compact()
+
+    def push(self, booking_id: int, kind: DeadlineKind, due_at: datetime) -> None:
+        sequence = next(self.sequence)
+        self.live[(booking_id, kind)] = sequence
+        heapq.heappush(self.heap, (due_at, sequence, booking_id, kind))
+
+    def discard_stale(self) -> None:
+        while self.heap:
+            _due_at, sequence, booking_id, kind = self.heap[0]
+            if self.live.get((booking_id, kind)) == sequence:
+                return
+            heapq.heappop(self.heap)
+
+    def compact(self) -> None:
+        self.heap = [entry for entry in self.heap if self.live.get((entry[2], entry[3])) == entry[1]]
+        heapq.heapify(self.heap)
+
+    def next_due(self) -> datetime | None:
+        self.discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: datetime) -> list[tuple[int, DeadlineKind]]:
+        due: list[tuple[int, DeadlineKind]] = []
+        while (next_due := self.next_due()) is not None and next_due <= now:
+            _due_at, _sequence, booking_id, kind = heapq.heappop(self.heap)
+            del self.live[(booking_id, kind)]
+            due.append((booking_id, kind))
+        return due
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+
+class DeadlineTimer:
+    """Background task that calls `fire` whenever the earliest deadline is reached."""
+
+    def __init__(self, queue: DeadlineQueue, fire: Callable[[], Awaitable[None]], retry_seconds: float):
+        self.queue = queue
+        self.fire = fire
+        self.retry_seconds = retry_seconds
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="booking_deadlines")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def seconds_until_next(self) -> float | None:
+        next_due = self.queue.next_due()
+        if next_due is None:
+            return None
+        return max((next_due - copenhagen_now()).total_seconds(), 0.0)
+
+    async def run(self) -> None:
+        while True:
+            self._wake.clear()
+            delay = self.seconds_until_next()
+            if delay == 0.0:
+                try:
+                    await self.fire()
+                except Exception:
+                    logging.exception("Booking deadline run failed")
+                delay = self.seconds_until_next()
+                if delay == 0.0:
+                    # Deadlines left due were deferred (e.g. the bot is paused), so retry later.
+                    delay = self.retry_seconds
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+
+
+def get_deadline_queue(bot_data: dict) -> DeadlineQueue | None:
+    return bot_data.get(DEADLINE_QUEUE_KEY)
+
+
+def load_deadline_queue(
+    bot_data: dict,
+    active_bookings: Callable[[], Iterable[ManagedBooking]],
+    reminder_hours: int,
+    auto_cancel_hours: int,
+) -> DeadlineQueue:
+    queue = get_deadline_queue(bot_data)
+    if queue is None:
+        queue = DeadlineQueue.from_bookings(active_bookings(), reminder_hours, auto_cancel_hours)
+        bot_data[DEADLINE_QUEUE_KEY] = queue
+    return queue
+
+
+def track_booking_deadlines(bot_data: dict, bookings: Iterable[ManagedBooking]) -> None:
+    queue = get_deadline_queue(bot_data)
+    if queue is None:
+        # Not loaded yet; the bookings are picked up from the database when it is.
+        return
+    queue.track(bookings)
+    timer = bot_data.get(DEADLINE_TIMER_KEY)
+    if timer is not None:
+        timer.wake()
+
+
+def start_deadline_timer(
+    bot_data: dict,
+    queue: DeadlineQueue,
+    fire: Callable[[], Awaitable[None]],
+    retry_seconds: float,
+) -> DeadlineTimer:
+    timer = DeadlineTimer(queue, fire, retry_seconds)
+    bot_data[DEADLINE_TIMER_KEY] = timer
+    timer.start()
+    return timer
+
+
+async def stop_deadline_timer(bot_data: dict) -> None:
+    timer = bot_data.pop(DEADLINE_TIMER_KEY, None)
+    if timer is not None:
+        await timer.stop()
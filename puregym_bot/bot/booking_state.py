@@ -0,0 +1,90 @@
+from bisect import bisect_right, insort
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+from puregym_bot.storage.repository import ACTIVE_BOOKING_STATUSES, get_active_bookings, set_booking_status
+
+BOOKING_STATE_VERSION_KEY = "booking_state_version"
+
+
+def booking_state_version(bot_data: dict) -> int:
+    return bot_data.get(BOOKING_STATE_VERSION_KEY, 0)
+
+
+def mark_bookings_changed(bot_data: dict) -> None:
+    # Writers outside the booking cycle bump this so a running cycle reloads its snapshot.
+    bot_data[BOOKING_STATE_VERSION_KEY] = booking_state_version(bot_data) + 1
+
+
+@dataclass
+class BookingState:
+    """Active bookings loaded once per cycle and kept in step with the cycle's own writes."""
+
+    version: int = 0
+    bookings: dict[int, ManagedBooking] = field(default_factory=dict)
+    by_participation: dict[str, ManagedBooking] = field(default_factory=dict)
+    by_status: dict[BookingStatus, dict[int, ManagedBooking]] = field(default_factory=dict)
+    by_time: list[tuple[datetime, int]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, session, version: int = 0, refresh: bool = False) -> "BookingState":
+        state = cls(version=version)
+        for booking in get_active_bookings(session, refresh=refresh):
+            state.add(booking)
+        return state
+
+    def refresh_if_stale(self, session, bot_data: dict) -> bool:
+        version = booking_state_version(bot_data)
+        if version == self.version:
+            return False
+        # Rows already in the session would otherwise keep the values this cycle first saw.
+        fresh = BookingState.load(session, version, refresh=True)
+        for item in fields(self):
+            setattr(self, item.name, getattr(fresh, item.name))
+        return True
+
+    def add(self, booking: ManagedBooking) -> None:
+        if booking.id is None:
+            raise ValueError("Booking ID must be set before it is tracked")
+        if booking.status not in ACTIVE_BOOKING_STATUSES or booking.id in self.bookings:
+            return
+        self.bookings[booking.id] = booking
+        if booking.participation_id is not None:
+            self.by_participation[booking.participation_id] = booking
+        self.by_status.setdefault(booking.status, {})[booking.id] = booking
+        insort(self.by_time, (booking.class_datetime, booking.id))
+
+    def discard(self, booking: ManagedBooking) -> None:
+        if booking.id is None or self.bookings.pop(booking.id, None) is None:
+            return
+        if booking.participation_id is not None:
+            self.by_participation.pop(booking.participation_id, None)
+        for bookings in self.by_status.values():
+            bookings.pop(booking.id, None)
+        self.by_time.remove((booking.class_datetime, booking.id))
+
+    def set_status(self, session, booking: ManagedBooking, status: BookingStatus) -> None:
+        self.discard(booking)
+        set_booking_status(session, booking, status)
+        self.add(booking)
+
+    @property
+    def active_count(self) -> int:
+        return len(self.bookings)
+
+    def active(self) -> list[ManagedBooking]:
+        return list(self.bookings.values())
+
+    def participation_ids(self) -> set[str]:
+        return set(self.by_participation)
+
+    def starting_before(
+        self, deadline: datetime, status: BookingStatus | None = None
+    ) -> list[ManagedBooking]:
+        end = bisect_right(self.by_time, (deadline, float("inf")))
+        bookings = [self.bookings[booking_id] for _class_datetime, booking_id in self.by_time[:end]]
+        if status is not None:
+            bookings = [booking for booking in bookings if booking.status == status]
+        # Steps emit prompts in storage order, as they did when each one queried the table.
+        return sorted(bookings, key=lambda booking: booking.id or 0)
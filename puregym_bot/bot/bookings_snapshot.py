@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from puregym_mcp.puregym.client import PureGymClient
+from puregym_mcp.puregym.models import GymClass
+
+from puregym_bot.datetime_utils import copenhagen_now
+
+BOOKINGS_SNAPSHOT_KEY = "bookings_snapshot"
+
+
+@dataclass(frozen=True)
+class BookingsSnapshot:
+    bookings: list[GymClass]
+    taken_at: datetime
+    # False when the handler had to fetch the bookings itself
+    cached: bool = True
+
+    def age(self, now: datetime) -> timedelta:
+        return now - self.taken_at
+
+
+def format_snapshot_age(age: timedelta) -> str:
+    minutes = int(age.total_seconds() // 60)
+    if minutes < 1:
+        return "less than a minute ago"
+    if minutes < 60:
+        return f"{minutes} min ago"
+    return f"{minutes // 60}h {minutes % 60:02d}min ago"
+
+
+class BookingsSnapshotCache:
+    """The latest `get_my_bookings` result, published by the booking cycle and read by the commands.
+
+    A snapshot up to `max_age` old is served as is. Up to `stale_age` it is still served, but a
+    background fetch replaces it. Older, missing or invalidated snapshots are fetched live.
+    """
+
+    def __init__(self):
+        self.snapshot: BookingsSnapshot | None = None
+        # Bumped by invalidate() so fetches that were already running cannot publish afterwards
+        self.generation = 0
+        self._refresh: asyncio.Task | None = None
+
+    def publish(self, bookings: list[GymClass], taken_at: datetime) -> BookingsSnapshot:
+        self.snapshot = BookingsSnapshot(bookings=bookings, taken_at=taken_at)
+        return self.snapshot
+
+    def invalidate(self) -> None:
+        self.snapshot = None
+        self.generation += 1
+
+    async def fetch(self, client: PureGymClient) -> BookingsSnapshot:
+        generation = self.generation
+        taken_at = copenhagen_now()
+        bookings = await client.get_my_bookings()
+        if generation != self.generation:
+            # The bookings changed while PureGym answered; the caller gets the result, the cache does not.
+            return BookingsSnapshot(bookings=bookings, taken_at=taken_at)
+        return self.publish(bookings, taken_at)
+
+    def revalidate(self, client: PureGymClient) -> None:
+        if self._refresh is not None and not self._refresh.done():
+            return
+        self._refresh = asyncio.create_task(self._fetch_logged(client), name="bookings_snapshot_refresh")
+
+    async def _fetch_logged(self, client: PureGymClient) -> None:
+        try:
+            await self.fetch(client)
+        except Exception:
+            logging.warning("Failed to refresh the bookings snapshot", exc_info=True)
+
+    async def read(self, client: PureGymClient, max_age: timedelta, stale_age: timedelta) -> BookingsSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            age = snapshot.age(copenhagen_now())
+            if age <= max_age:
+                return snapshot
+            if age <= stale_age:
+                self.revalidate(client)
+                return snapshot
+        live = await self.fetch(client)
+        return BookingsSnapshot(bookings=live.bookings, taken_at=live.taken_at, cached=False)
+
+    async def stop(self) -> None:
+        if self._refresh is None:
+            return
+        self._refresh.cancel()
+        try:
+            await self._refresh
+        except asyncio.CancelledError:
+            pass
+        self._refresh = None
+
+
+def get_bookings_snapshot_cache(bot_data: dict) -> BookingsSnapshotCache:
+    cache = bot_data.get(BOOKINGS_SNAPSHOT_KEY)
+    if cache is None:
+        cache = BookingsSnapshotCache()
+        bot_data[BOOKINGS_SNAPSHOT_KEY] = cache
+    return cache
+
+
+def invalidate_bookings_snapshot(bot_data: dict) -> None:
+    cache = bot_data.get(BOOKINGS_SNAPSHOT_KEY)
+    if cache is not None:
+        cache.invalidate()
+
+
+async def stop_bookings_snapshot(bot_data: dict) -> None:
+    cache = bot_data.pop(BOOKINGS_SNAPSHOT_KEY, None)
+    if cache is not None:
+        await cache.stop()
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from puregym_mcp.puregym.client import PureGymClient
+from puregym_mcp.puregym.models import CenterGroup, GymClassTypesGroup
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from puregym_bot.datetime_utils import copenhagen_now
+
+CATALOG_CACHE_KEY = "catalog_cache"
+
+
+class CatalogKind(StrEnum):
+    CLASS_TYPES = "class_types"
+    CENTERS = "centers"
+
+
+CATALOG_HEADERS = {
+    CatalogKind.CLASS_TYPES: "🏋 <b>Available Class Types</b>\n",
+    CatalogKind.CENTERS: "🏢 <b>Available Centers</b>\n",
+}
+CATALOG_MODELS = {
+    CatalogKind.CLASS_TYPES: TypeAdapter(list[GymClassTypesGroup]),
+    CatalogKind.CENTERS: TypeAdapter(list[CenterGroup]),
+}
+
+
+@dataclass(frozen=True)
+class Catalog:
+    kind: CatalogKind
+    version: str
+    fetched_at: datetime
+    groups: list[Any]
+    html: str
+
+    def is_stale(self, now: datetime, ttl: timedelta) -> bool:
+        return now - self.fetched_at >= ttl
+
+
+def render_catalog(kind: CatalogKind, groups: list) -> str:
+    lines = [CATALOG_HEADERS[kind]]
+    for group in groups:
+        lines.append(group.format())
+        lines.append("")  # blank line between groups
+    return "\n".join(lines)
+
+
+def build_catalog(
+    kind: CatalogKind, groups: list, fetched_at: datetime, previous: "Catalog | None"
+) -> Catalog:
+    payload = to_jsonable_python(groups)
+    version = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+    if previous is not None and previous.version == version:
+        # Unchanged catalog: keep the HTML already rendered for this version.
+        return Catalog(kind, version, fetched_at, previous.groups, previous.html)
+    return Catalog(kind, version, fetched_at, groups, render_catalog(kind, groups))
+
+
+async def fetch_catalog_groups(client: PureGymClient, kind: CatalogKind) -> list:
+    if kind == CatalogKind.CLASS_TYPES:
+        return await client.get_all_class_types()
+    return await client.get_all_centers()
+
+
+class CatalogCache:
+    """Class type and center catalogs kept on disk and served from memory.
+
+    A stale catalog is still served while a background task refreshes it, so only the very first
+    request for a catalog waits on PureGym.
+    """
+
+    def __init__(self, client: PureGymClient, directory: Path, ttl: timedelta):
+        self.client = client
+        self.directory = directory
+        self.ttl = ttl
+        self.catalogs: dict[CatalogKind, Catalog] = {}
+        self._refreshing: dict[CatalogKind, asyncio.Task] = {}
+
+    def path(self, kind: CatalogKind) -> Path:
+        return self.directory / f"{kind}.json"
+
+    def load(self) -> None:
+        for kind in CatalogKind:
+            path = self.path(kind)
+            if not path.exists():
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self.catalogs[kind] = Catalog(
+                    kind=kind,
+                    version=data["version"],
+                    fetched_at=datetime.fromisoformat(data["fetched_at"]),
+                    groups=CATALOG_MODELS[kind].validate_python(data["groups"]),
+                    html=data["html"],
+                )
+            except (OSError, ValueError, KeyError):
+                logging.warning("Ignoring unreadable catalog cache %s", path, exc_info=True)
+
+    def save(self, catalog: Catalog) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": catalog.version,
+            "fetched_at": catalog.fetched_at.isoformat(),
+            "groups": to_jsonable_python(catalog.groups),
+            "html": catalog.html,
+        }
+        path = self.path(catalog.kind)
+        partial = path.with_suffix(".tmp")
+        partial.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        partial.replace(path)
+
+    async def refresh(self, kind: CatalogKind) -> Catalog:
+        groups = await fetch_catalog_groups(self.client, kind)
+        catalog = build_catalog(kind, groups, copenhagen_now(), self.catalogs.get(kind))
+        self.catalogs[kind] = catalog
+        self.save(catalog)
+        return catalog
+
+    def refresh_in_background(self, kind: CatalogKind) -> None:
+        task = self._refreshing.get(kind)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._refresh_logged(kind), name=f"catalog_refresh_{kind}")
+        self._refreshing[kind] = task
+
+    async def _refresh_logged(self, kind: CatalogKind) -> None:
+        try:
+            await self.refresh(kind)
+        except Exception:
+            logging.exception("Refreshing the %s catalog failed", kind)
+
+    def refresh_stale(self) -> None:
+        now = copenhagen_now()
+        for kind in CatalogKind:
+            catalog = self.catalogs.get(kind)
+            if catalog is None or catalog.is_stale(now, self.ttl):
+                self.refresh_in_background(kind)
+
+    async def get(self, kind: CatalogKind) -> Catalog:
+        catalog = self.catalogs.get(kind)
+        if catalog is None:
+            task = self._refreshing.get(kind)
+            if task is not None and not task.done():
+                await asyncio.shield(task)
+                catalog = self.catalogs.get(kind)
+            if catalog is None:
+                return await self.refresh(kind)
+            return catalog
+        if catalog.is_stale(copenhagen_now(), self.ttl):
+            self.refresh_in_background(kind)
+        return catalog
+
+    async def stop(self) -> None:
+        tasks = list(self._refreshing.values())
+        self._refreshing.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_catalog_cache(bot_data: dict) -> CatalogCache | None:
+    return bot_data.get(CATALOG_CACHE_KEY)
+
+
+def start_catalog_cache(
+    bot_data: dict, client: PureGymClient, directory: Path, ttl: timedelta
+) -> CatalogCache:
+    cache = CatalogCache(client, directory, ttl)
+    cache.load()
+    bot_data[CATALOG_CACHE_KEY] = cache
+    cache.refresh_stale()
+    return cache
+
+
+async def stop_catalog_cache(bot_data: dict) -> None:
+    cache = bot_data.pop(CATALOG_CACHE_KEY, None)
+    if cache is not None:
+        await cache.stop()
+
+
+async def catalog_html(bot_data: dict, client: PureGymClient, kind: CatalogKind) -> str:
+    cache = get_catalog_cache(bot_data)
+    if cache is None:
+        return render_catalog(kind, await fetch_catalog_groups(client, kind))
+    return (await cache.get(kind)).html
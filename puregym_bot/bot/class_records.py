@@ -0,0 +1,73 @@
+from datetime import date, datetime, time
+from typing import Iterable
+
+from puregym_mcp.puregym.models import GymClass
+
+from puregym_bot.slot_index import MINUTES_PER_DAY, is_whole_minute, minute_of_day
+
+
+class ClassRecord:
+    """A fetched class with its timing parsed once, carrying only what the booking cycle needs."""
+
+    __slots__ = (
+        "booking_id",
+        "activity_id",
+        "payment_type",
+        "participation_id",
+        "title",
+        "center_name",
+        "waitlist_position",
+        "waitlist_size",
+        "date",
+        "start_time",
+        "end_time",
+        "class_date",
+        "start_clock",
+        "end_clock",
+        "starts_at",
+        "weekday",
+        "start_minute",
+        "end_minute",
+        "week_minute",
+        "whole_minutes",
+    )
+
+    def __init__(self, gym_class: GymClass):
+        self.booking_id = gym_class.booking_id
+        self.activity_id = gym_class.activity_id
+        self.payment_type = gym_class.payment_type
+        self.participation_id = gym_class.participation_id
+        self.title = gym_class.title
+        self.center_name = gym_class.center_name
+        self.waitlist_position = gym_class.waitlist_position
+        self.waitlist_size = gym_class.waitlist_size
+        # The raw ISO strings stay around for storage and callback payloads.
+        self.date = gym_class.date
+        self.start_time = gym_class.start_time
+        self.end_time = gym_class.end_time
+
+        self.class_date = date.fromisoformat(gym_class.date)
+        self.start_clock = time.fromisoformat(gym_class.start_time)
+        self.end_clock = time.fromisoformat(gym_class.end_time)
+        self.starts_at = datetime.combine(self.class_date, self.start_clock)
+        self.weekday = self.class_date.weekday()
+        self.start_minute = minute_of_day(self.start_clock)
+        self.end_minute = minute_of_day(self.end_clock)
+        self.week_minute = self.weekday * MINUTES_PER_DAY + self.start_minute
+        # Only whole-minute classes that end after they start can use the slot index's minute lookup.
+        self.whole_minutes = (
+            is_whole_minute(self.start_clock)
+            and is_whole_minute(self.end_clock)
+            and self.start_clock < self.end_clock
+        )
+
+    def __repr__(self) -> str:
+        return f"ClassRecord(booking_id={self.booking_id!r}, starts_at={self.starts_at.isoformat()!r})"
+
+
+def as_class_record(item: ClassRecord | GymClass) -> ClassRecord:
+    return item if isinstance(item, ClassRecord) else ClassRecord(item)
+
+
+def build_class_records(classes: Iterable[ClassRecord | GymClass]) -> list[ClassRecord]:
+    return [as_class_record(item) for item in classes]
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from puregym_bot.bot.class_records import ClassRecord
+
+
+def class_fingerprint(gym_class: ClassRecord) -> tuple:
+    return (
+        gym_class.date,
+        gym_class.start_time,
+        gym_class.end_time,
+        gym_class.participation_id,
+        gym_class.waitlist_position,
+        gym_class.waitlist_size,
+    )
+
+
+@dataclass(frozen=True)
+class ClassDelta:
+    added: tuple[ClassRecord, ...] = ()
+    removed: tuple[ClassRecord, ...] = ()
+    changed: tuple[tuple[ClassRecord, ClassRecord], ...] = ()
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def touched_classes(self) -> list[ClassRecord]:
+        touched = [*self.added, *self.removed]
+        for previous, current in self.changed:
+            touched.append(previous)
+            touched.append(current)
+        return touched
+
+    def touches_bookings(self) -> bool:
+        if any(gym_class.participation_id is not None for gym_class in (*self.added, *self.removed)):
+            return True
+        return any(
+            previous.participation_id != current.participation_id for previous, current in self.changed
+        )
+
+
+@dataclass
+class ClassSnapshot:
+    taken_at: datetime
+    classes: dict[str, ClassRecord] = field(default_factory=dict)
+    fingerprints: dict[str, tuple] = field(default_factory=dict)
+
+    @classmethod
+    def from_classes(cls, classes: list[ClassRecord], taken_at: datetime) -> "ClassSnapshot":
+        snapshot = cls(taken_at=taken_at)
+        for gym_class in classes:
+            snapshot.classes[gym_class.booking_id] = gym_class
+            snapshot.fingerprints[gym_class.booking_id] = class_fingerprint(gym_class)
+        return snapshot
+
+
+def diff_class_snapshots(previous: ClassSnapshot, current: ClassSnapshot) -> ClassDelta:
+    added = tuple(
+        gym_class for booking_id, gym_class in current.classes.items() if booking_id not in previous.classes
+    )
+    removed = tuple(
+        gym_class for booking_id, gym_class in previous.classes.items() if booking_id not in current.classes
+    )
+    changed = tuple(
+        (previous.classes[booking_id], gym_class)
+        for booking_id, gym_class in current.classes.items()
+        if booking_id in previous.fingerprints
+        and previous.fingerprints[booking_id] != current.fingerprints[booking_id]
+    )
+    return ClassDelta(added=added, removed=removed, changed=changed)
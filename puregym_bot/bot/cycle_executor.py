@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import CycleReport, run_booking_cycle
+
+CYCLE_EXECUTOR_KEY = "cycle_executor"
+
+CycleRunner = Callable[[ContextTypes.DEFAULT_TYPE], Awaitable[CycleReport]]
+
+
+class CycleExecutor:
+    """Runs at most one booking cycle at a time.
+
+    A trigger that arrives while a cycle is running waits for one follow-up cycle, which every
+    trigger received in the meantime shares, because the running cycle may have fetched its
+    classes before the trigger was made.
+    """
+
+    def __init__(self, runner: CycleRunner = run_booking_cycle):
+        self.runner = runner
+        self._running: asyncio.Future[CycleReport] | None = None
+        self._follow_up: asyncio.Future[CycleReport] | None = None
+        self._follow_up_context: ContextTypes.DEFAULT_TYPE | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def trigger(self, context: ContextTypes.DEFAULT_TYPE) -> CycleReport:
+        loop = asyncio.get_running_loop()
+        if self._running is None:
+            future = self._running = loop.create_future()
+            self._task = asyncio.create_task(self._drive(context, future), name="booking_cycle")
+        elif self._follow_up is None:
+            logging.info("Booking cycle already running, queueing one follow-up run")
+            future = self._follow_up = loop.create_future()
+            self._follow_up_context = context
+        else:
+            future = self._follow_up
+        # A cancelled caller must not cancel the cycle other callers are waiting on.
+        return await asyncio.shield(future)
+
+    async def _drive(self, context: ContextTypes.DEFAULT_TYPE, future: asyncio.Future[CycleReport]) -> None:
+        while True:
+            try:
+                future.set_result(await self.runner(context))
+            except asyncio.CancelledError:
+                future.cancel()
+                if self._follow_up is not None:
+                    self._follow_up.cancel()
+                self._running = self._follow_up = self._follow_up_context = self._task = None
+                raise
+            except Exception as exc:
+                future.set_exception(exc)
+
+            if self._follow_up is None or self._follow_up_context is None:
+                self._running = None
+                self._task = None
+                return
+            future, self._follow_up = self._follow_up, None
+            context, self._follow_up_context = self._follow_up_context, None
+            self._running = future
+
+
+def get_cycle_executor(bot_data: dict) -> CycleExecutor:
+    executor = bot_data.get(CYCLE_EXECUTOR_KEY)
+    if executor is None:
+        executor = CycleExecutor()
+        bot_data[CYCLE_EXECUTOR_KEY] = executor
+    return executor
+
+
+async def run_single_flight_cycle(context: ContextTypes.DEFAULT_TYPE) -> CycleReport:
+    return await get_cycle_executor(context.bot_data).trigger(context)
+
+
+async def stop_cycle_executor(bot_data: dict) -> None:
+    executor = bot_data.pop(CYCLE_EXECUTOR_KEY, None)
+    if executor is not None:
+        await executor.stop()
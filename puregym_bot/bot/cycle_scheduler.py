@@ -0,0 +1,89 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from telegram.ext import ContextTypes, JobQueue
+
+from puregym_bot.bot.booking_cycle import CycleReport
+from puregym_bot.bot.cycle_executor import run_single_flight_cycle
+from puregym_bot.bot.release_sniper import known_class_starts, upcoming_releases
+from puregym_bot.config import get_config
+from puregym_bot.datetime_utils import copenhagen_now
+from puregym_bot.storage.db import get_db_session
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+from puregym_bot.storage.repository import get_active_bookings
+
+BOOKING_CYCLE_JOB_NAME = "booking_cycle"
+# Fire slightly after a deadline so the threshold comparisons in the cycle steps have passed.
+DEADLINE_GRACE = timedelta(seconds=1)
+
+
+def booking_deadlines(bookings: list[ManagedBooking]) -> list[datetime]:
+    config = get_config()
+    deadlines: list[datetime] = []
+    for booking in bookings:
+        if not booking.reminder_sent:
+            deadlines.append(booking.class_datetime - timedelta(hours=config.booking_reminder_hours))
+        if booking.status == BookingStatus.PENDING:
+            deadlines.append(booking.class_datetime - timedelta(hours=config.pending_auto_cancel_hours))
+    return deadlines
+
+
+def release_deadlines(now: datetime, class_starts: dict[int, set[time]] | None = None) -> list[datetime]:
+    config = get_config()
+    releases = upcoming_releases(
+        now,
+        config.class_preferences.available_time_slots,
+        config.max_days_in_advance,
+        class_starts=class_starts,
+    )
+    # The sniper owns the release window itself; the cycle follows up once it closes.
+    follow_up = timedelta(
+        seconds=config.release_sniper_window_seconds if config.release_sniper_enabled else 0
+    )
+    return [target.release_at + follow_up for target in releases]
+
+
+def collect_cycle_deadlines(
+    session, now: datetime, class_starts: dict[int, set[time]] | None = None
+) -> list[datetime]:
+    if get_config().booking_deadline_timer:
+        # Reminders and auto-cancels have their own timer, so only releases need a cycle.
+        return release_deadlines(now, class_starts)
+    return booking_deadlines(get_active_bookings(session)) + release_deadlines(now, class_starts)
+
+
+def next_cycle_delay(now: datetime, report: CycleReport | None, deadlines: list[datetime]) -> float:
+    config = get_config()
+    if report is None or not report.ran or report.actionable or report.degraded:
+        delay = float(config.booking_interval_seconds)
+    else:
+        delay = float(config.idle_booking_interval_seconds)
+
+    upcoming = [deadline for deadline in deadlines if deadline + DEADLINE_GRACE > now]
+    if upcoming:
+        until_deadline = (min(upcoming) + DEADLINE_GRACE - now).total_seconds()
+        delay = min(delay, until_deadline)
+    return max(delay, float(config.min_booking_interval_seconds))
+
+
+def schedule_booking_cycle(job_queue: JobQueue, delay: float) -> None:
+    job_queue.run_once(run_adaptive_booking_cycle, when=delay, name=BOOKING_CYCLE_JOB_NAME)
+
+
+async def run_adaptive_booking_cycle(context: ContextTypes.DEFAULT_TYPE) -> None:
+    report: CycleReport | None = None
+    try:
+        report = await run_single_flight_cycle(context)
+    finally:
+        delay = float(get_config().booking_interval_seconds)
+        try:
+            now = copenhagen_now()
+            with get_db_session() as session:
+                deadlines = collect_cycle_deadlines(session, now, known_class_starts(context.bot_data))
+            delay = next_cycle_delay(now, report, deadlines)
+        except Exception:
+            # The next cycle is scheduled no matter what, or booking would stop for good.
+            logging.exception("Failed to plan the next booking cycle, falling back to the base interval")
+        logging.info("Next booking cycle in %.0fs", delay)
+        if context.job_queue is not None:
+            schedule_booking_cycle(context.job_queue, delay)
@@ -6,7 +6,21 @@ from sqlmodel import Session
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from puregym_bot.config import get_config
+from puregym_bot.bot.booking_deadlines import stop_deadline_timer
+from puregym_bot.bot.bookings_snapshot import stop_bookings_snapshot
+from puregym_bot.bot.catalog_cache import stop_catalog_cache
+from puregym_bot.bot.cycle_executor import stop_cycle_executor
+from puregym_bot.bot.outbox import stop_outbox_sender
+from puregym_bot.cassette import CassetteRecorder, CassetteReplayClient, load_cassette
+from puregym_bot.circuit_breaker import CIRCUIT_BREAKER_KEY, CircuitBreakerClient
+from puregym_bot.config import CassetteMode, get_config
+from puregym_bot.metrics import (
+    HANDLER_DURATION,
+    HANDLER_ERRORS,
+    InstrumentedPureGymClient,
+    observe,
+    stop_metrics_server,
+)
 from puregym_bot.storage.db import get_db_session
 from puregym_bot.storage.repository import get_bot_state
 
@@ -18,13 +32,35 @@ class HandlerContext:
     bot_active: bool
 
 
-async def on_startup(app):
+def build_puregym_client():
     config = get_config()
-    app.bot_data["puregym_client"] = PureGymClient(
+    if config.puregym_cassette_mode == CassetteMode.REPLAY:
+        return CassetteReplayClient(
+            load_cassette(config.puregym_cassette_path), config.puregym_cassette_time_scale
+        )
+    client = PureGymClient(
         config.puregym_username,
         config.puregym_password.get_secret_value(),
         config.puregym_timeout_seconds,
     )
+    if config.puregym_cassette_mode == CassetteMode.RECORD:
+        secrets = (config.puregym_username, config.puregym_password.get_secret_value())
+        return CassetteRecorder(client, config.puregym_cassette_path, secrets)
+    return client
+
+
+async def on_startup(app):
+    config = get_config()
+    client = build_puregym_client()
+    if config.circuit_breaker_enabled:
+        client = CircuitBreakerClient(
+            client,
+            config.circuit_breaker_failure_threshold,
+            config.circuit_breaker_backoff_seconds,
+            config.circuit_breaker_max_backoff_seconds,
+        )
+        app.bot_data[CIRCUIT_BREAKER_KEY] = client
+    app.bot_data["puregym_client"] = InstrumentedPureGymClient(client) if config.metrics_enabled else client
     with get_db_session() as session:
         bot_state = get_bot_state(session)
     if bot_state.is_active:
@@ -35,6 +71,12 @@ async def on_startup(app):
 
 
 async def on_shutdown(app):
+    await stop_cycle_executor(app.bot_data)
+    await stop_deadline_timer(app.bot_data)
+    await stop_outbox_sender(app.bot_data)
+    await stop_catalog_cache(app.bot_data)
+    await stop_bookings_snapshot(app.bot_data)
+    await stop_metrics_server(app.bot_data)
     client = cast(PureGymClient | None, app.bot_data.get("puregym_client"))
     if client is not None:
         await client.aclose()
@@ -64,6 +106,7 @@ def build_handler(
                 return
             client = cast(PureGymClient, context.bot_data["puregym_client"])
             ctx = HandlerContext(session=session, client=client, bot_active=bot_state.is_active)
-            return await handler(update, context, ctx)
+            with observe(HANDLER_DURATION, HANDLER_ERRORS, handler=handler.__name__):
+                return await handler(update, context, ctx)
 
     return wrapper
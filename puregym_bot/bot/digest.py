@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Protocol
+
+from puregym_bot.bot.prompts import MessageSpec
+from puregym_bot.config import DigestPolicy
+
+
+class PromptCategory(StrEnum):
+    ARCHIVED = "archived"
+    CANCELLED_MISSING = "cancelled_missing"
+    AUTO_CANCELLED = "auto_cancelled"
+    STATE_MISMATCH = "state_mismatch"
+
+
+DIGEST_HEADERS = {
+    PromptCategory.ARCHIVED: "{count} bookings have passed and are now archived:",
+    PromptCategory.CANCELLED_MISSING: "{count} bookings were missing in PureGym and have been cancelled:",
+    PromptCategory.AUTO_CANCELLED: "{count} pending bookings were cancelled before class time:",
+    PromptCategory.STATE_MISMATCH: "{count} booking state warnings:",
+}
+CYCLE_DIGEST_HEADER = "Booking cycle updates:"
+
+
+class DigestiblePrompt(Protocol):
+    message: MessageSpec
+    category: PromptCategory | None
+    detail: str | None
+
+    @property
+    def interactive(self) -> bool: ...
+
+
+@dataclass
+class PromptDigest:
+    """Holds a cycle's informational prompts back so they can be sent as one message per category."""
+
+    policy: DigestPolicy
+    min_prompts: int = 2
+    held: dict[PromptCategory, list[DigestiblePrompt]] = field(default_factory=dict)
+
+    def hold(self, prompts: list) -> list:
+        """Keep the digestible prompts and return the ones that have to go out right away."""
+        if self.policy == DigestPolicy.OFF:
+            return prompts
+        immediate = []
+        for prompt in prompts:
+            if prompt.interactive or prompt.category is None:
+                immediate.append(prompt)
+            else:
+                self.held.setdefault(prompt.category, []).append(prompt)
+        return immediate
+
+    def flush(self) -> list[MessageSpec]:
+        groups = [(category, self.held[category]) for category in PromptCategory if category in self.held]
+        self.held = {}
+        held_count = sum(len(prompts) for _category, prompts in groups)
+        if held_count == 0:
+            return []
+        if self.policy == DigestPolicy.CYCLE and held_count >= self.min_prompts and len(groups) > 1:
+            sections = [render_category(category, prompts) for category, prompts in groups]
+            return [MessageSpec(text="\n\n".join([CYCLE_DIGEST_HEADER, *sections]))]
+
+        messages = []
+        for category, prompts in groups:
+            if len(prompts) < self.min_prompts:
+                messages.extend(prompt.message for prompt in prompts)
+            else:
+                messages.append(MessageSpec(text=render_category(category, prompts)))
+        return messages
+
+
+def render_category(category: PromptCategory, prompts: list[DigestiblePrompt]) -> str:
+    if len(prompts) == 1:
+        return prompts[0].message.text
+    lines = [DIGEST_HEADERS[category].format(count=len(prompts))]
+    lines.extend(f"- {prompt.detail or prompt.message.text}" for prompt in prompts)
+    return "\n".join(lines)
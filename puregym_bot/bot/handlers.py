@@ -5,17 +5,27 @@ from datetime import datetime, timedelta
 
 from puregym_mcp.puregym.client import PureGymClient
 from puregym_mcp.puregym.models import GymClass
-from telegram import Update
+from telegram import InputFile, Update
 from telegram.ext import ContextTypes
 
-from puregym_bot.bot.booking_cycle import BookingChoiceOption, run_booking_cycle
+from puregym_bot.bot.booking_cycle import BookingChoiceOption, CycleReport, invalidate_class_cache
+from puregym_bot.bot.booking_deadlines import track_booking_deadlines
+from puregym_bot.bot.booking_state import mark_bookings_changed
+from puregym_bot.bot.bookings_snapshot import (
+    BookingsSnapshot,
+    format_snapshot_age,
+    get_bookings_snapshot_cache,
+)
+from puregym_bot.bot.catalog_cache import CatalogKind, catalog_html
 from puregym_bot.bot.callback_data import (
     BookingCallback,
     BookingCallbackAction,
     ChoicePickCallback,
     parse_callback_data,
 )
+from puregym_bot.bot.cycle_executor import get_cycle_executor
 from puregym_bot.bot.dependencies import HandlerContext
+from puregym_bot.bot.profiling import parse_profile_args, profile_cycle
 from puregym_bot.bot.prompts import (
     build_cancel_booking_prompt,
     build_confirmed_booking_prompt,
@@ -23,6 +33,7 @@ from puregym_bot.bot.prompts import (
     build_selected_choice_confirmation_prompt,
     message_markup,
 )
+from puregym_bot.circuit_breaker import format_circuit_status, get_circuit_breaker
 from puregym_bot.config import get_config
 from puregym_bot.datetime_utils import copenhagen_now, combine_copenhagen
 from puregym_bot.formatting import format_telegram_booking, format_telegram_class_summary
@@ -149,7 +160,8 @@ async def status(
         chat_id=update.effective_chat.id,
         text=(
             f"Automatic booking is currently {auto_booking_status}. "
-            "Use /start to enable it or /stop to disable it."
+            "Use /start to enable it or /stop to disable it.\n"
+            f"{format_circuit_status(get_circuit_breaker(context.bot_data))}"
         ),
     )
 
@@ -214,11 +226,15 @@ async def handle_booking_decision_callback(
         if callback.action == BookingCallbackAction.ACCEPT:
             set_booking_status(session, booking, BookingStatus.CONFIRMED)
             session.commit()
+            mark_bookings_changed(context.bot_data)
+            track_booking_deadlines(context.bot_data, [booking])
             await query.edit_message_text(text="Booking accepted.")
             return
 
         client = get_puregym_client(context)
-        await cancel_booking_from_callback(session, query, callback.participation_id, client)
+        if await cancel_booking_from_callback(session, query, callback.participation_id, client):
+            invalidate_class_cache(context.bot_data)
+            mark_bookings_changed(context.bot_data)
 
 
 async def handle_booking_cancel_callback(
@@ -237,7 +253,9 @@ async def handle_booking_cancel_callback(
             return
 
         client = get_puregym_client(context)
-        await cancel_booking_from_callback(session, query, callback.participation_id, client)
+        if await cancel_booking_from_callback(session, query, callback.participation_id, client):
+            invalidate_class_cache(context.bot_data)
+            mark_bookings_changed(context.bot_data)
 
 
 async def handle_booking_revert_callback(
@@ -263,19 +281,21 @@ async def handle_booking_revert_callback(
         booking.reminder_sent = False
         session.add(booking)
         session.commit()
+        mark_bookings_changed(context.bot_data)
+        track_booking_deadlines(context.bot_data, [booking])
         await query.edit_message_text(text="Booking reverted to pending.")
 
 
 async def cancel_booking_from_callback(
     session, query, participation_id: str, client: PureGymClient | None
-) -> None:
+) -> bool:
     booking = get_booking_by_participation_id(session, participation_id)
     if booking is not None and booking.status not in {BookingStatus.PENDING, BookingStatus.CONFIRMED}:
         await query.edit_message_text(text="This booking can no longer be cancelled.")
-        return
+        return False
 
     if client is None:
-        return
+        return False
 
     resp = await client.unbook_participation(participation_id)
     if resp.status == "success":
@@ -283,10 +303,11 @@ async def cancel_booking_from_callback(
             set_booking_status(session, booking, BookingStatus.CANCELLED)
             session.commit()
         await query.edit_message_text(text="Booking cancelled.")
-        return
+        return True
 
     logging.debug("Failed to cancel booking %s: %s", participation_id, resp)
     await query.edit_message_text(text="Failed to cancel!")
+    return False
 
 
 async def handle_choice_pick_callback(
@@ -346,6 +367,9 @@ async def handle_choice_pick_callback(
         session.add(booking)
         set_choice_status(session, choice, ChoiceStatus.HANDLED)
         session.commit()
+        invalidate_class_cache(context.bot_data)
+        mark_bookings_changed(context.bot_data)
+        track_booking_deadlines(context.bot_data, [booking])
 
         follow_up_message = build_selected_choice_confirmation_prompt(
             title=selected.title,
@@ -362,8 +386,19 @@ async def handle_choice_pick_callback(
         )
 
 
-async def get_live_bookings(ctx: HandlerContext) -> list[GymClass]:
-    return await ctx.client.get_my_bookings()
+async def get_recent_bookings(context: ContextTypes.DEFAULT_TYPE, ctx: HandlerContext) -> BookingsSnapshot:
+    config = get_config()
+    return await get_bookings_snapshot_cache(context.bot_data).read(
+        ctx.client,
+        max_age=timedelta(seconds=config.bookings_snapshot_max_age_seconds),
+        stale_age=timedelta(seconds=config.bookings_snapshot_stale_seconds),
+    )
+
+
+def snapshot_age(snapshot: BookingsSnapshot) -> str | None:
+    if not snapshot.cached:
+        return None
+    return format_snapshot_age(snapshot.age(copenhagen_now()))
 
 
 def build_managed_booking_lookup(active_bookings: list[ManagedBooking]) -> dict[str, ManagedBooking]:
@@ -461,7 +496,8 @@ async def booked_classes(
     if update.effective_chat is None:
         return
 
-    bookings = await get_live_bookings(ctx)
+    snapshot = await get_recent_bookings(context, ctx)
+    bookings = snapshot.bookings
     active_bookings = get_active_bookings(ctx.session)
 
     managed_by_participation = build_managed_booking_lookup(active_bookings)
@@ -479,7 +515,9 @@ async def booked_classes(
         )
         return
 
-    for chunk in chunk_message_lines("Your upcoming bookings:", lines):
+    age = snapshot_age(snapshot)
+    header = "Your upcoming bookings:" if age is None else f"Your upcoming bookings (as of {age}):"
+    for chunk in chunk_message_lines(header, lines):
         await context.bot.send_message(chat_id=update.effective_chat.id, text=chunk)
 
 
@@ -491,9 +529,9 @@ async def manage_bookings(
     if update.effective_chat is None:
         return
 
-    bookings = await get_live_bookings(ctx)
+    snapshot = await get_recent_bookings(context, ctx)
     active_bookings = get_active_bookings(ctx.session)
-    actionable_bookings = build_actionable_bookings(bookings, active_bookings)
+    actionable_bookings = build_actionable_bookings(snapshot.bookings, active_bookings)
 
     if not actionable_bookings:
         await context.bot.send_message(
@@ -502,9 +540,13 @@ async def manage_bookings(
         )
         return
 
+    summary = build_manage_summary(actionable_bookings)
+    age = snapshot_age(snapshot)
+    if age is not None:
+        summary = f"{summary} Bookings as of {age}."
     await context.bot.send_message(
         chat_id=update.effective_chat.id,
-        text=build_manage_summary(actionable_bookings),
+        text=summary,
     )
     for actionable_booking in actionable_bookings:
         prompt = build_manage_booking_prompt(actionable_booking)
@@ -523,14 +565,7 @@ async def all_class_ids(
     if update.effective_chat is None:
         return
 
-    class_groups = await ctx.client.get_all_class_types()
-    lines = ["🏋 <b>Available Class Types</b>\n"]
-    for group in class_groups:
-        lines.append(group.format())
-        lines.append("")  # blank line between groups
-
-    message = "\n".join(lines)
-
+    message = await catalog_html(context.bot_data, ctx.client, CatalogKind.CLASS_TYPES)
     await context.bot.send_message(chat_id=update.effective_chat.id, text=message, parse_mode="HTML")
 
 
@@ -542,15 +577,20 @@ async def all_center_ids(
     if update.effective_chat is None:
         return
 
-    center_groups = await ctx.client.get_all_centers()
-    lines = ["🏢 <b>Available Centers</b>\n"]
-    for group in center_groups:
-        lines.append(group.format())
-        lines.append("")  # blank line between groups
+    message = await catalog_html(context.bot_data, ctx.client, CatalogKind.CENTERS)
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=message, parse_mode="HTML")
 
-    message = "\n".join(lines)
 
-    await context.bot.send_message(chat_id=update.effective_chat.id, text=message, parse_mode="HTML")
+def format_cycle_report(report: CycleReport) -> str:
+    if not report.ran:
+        return "Booking cycle skipped because the bot is inactive."
+    if report.degraded:
+        return "PureGym is unavailable, so the booking cycle only handled reminders."
+    if report.max_bookings_reached:
+        return "Booking cycle finished. Maximum number of bookings reached."
+    if report.unresolved_slots:
+        return f"Booking cycle finished. {report.unresolved_slots} slot(s) could not be booked yet."
+    return "Booking cycle finished."
 
 
 async def run_now(
@@ -560,14 +600,68 @@ async def run_now(
 ):
     if update.effective_chat is None:
         return
-    if context.job_queue is None:
+    executor = get_cycle_executor(context.bot_data)
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text=(
+            "A booking cycle is already running, another one will follow it..."
+            if executor.busy
+            else "Running booking cycle now..."
+        ),
+    )
+    try:
+        report = await executor.trigger(context)
+    except Exception:
+        logging.exception("Booking cycle requested with /run_now failed")
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
-            text="Job queue is not available.",
+            text="Booking cycle failed, check the logs for details.",
         )
         return
-    await context.bot.send_message(
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=format_cycle_report(report))
+
+
+async def profile(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    ctx: HandlerContext,
+):
+    if update.effective_chat is None:
+        return
+    try:
+        request = parse_profile_args(context.args or [])
+    except ValueError as exc:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text=f"{exc}. Usage: /profile [entries] [memory]",
+        )
+        return
+
+    executor = get_cycle_executor(context.bot_data)
+    if executor.busy:
+        # Profiling a follow-up run would also capture the tail of the running cycle.
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="A booking cycle is already running, try /profile again once it finishes.",
+        )
+        return
+    await context.bot.send_message(chat_id=update.effective_chat.id, text="Profiling one booking cycle...")
+    try:
+        result = await profile_cycle(executor, context, request)
+    except Exception:
+        logging.exception("Profiled booking cycle failed")
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="Booking cycle failed, check the logs for details.",
+        )
+        return
+
+    text = result.render()
+    if len(text) <= 4000:
+        await context.bot.send_message(chat_id=update.effective_chat.id, text=text)
+        return
+    await context.bot.send_document(
         chat_id=update.effective_chat.id,
-        text="Running booking cycle now...",
+        document=InputFile(text.encode(), filename="cycle_profile.txt"),
+        caption=f"{format_cycle_report(result.report)} Profiled in {result.elapsed_seconds:.2f}s.",
     )
-    context.job_queue.run_once(callback=run_booking_cycle, when=0)
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+import warnings
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+from telegram.warnings import PTBDeprecationWarning
+
+from puregym_bot.bot.prompts import MessageSpec, buttons_from_json, buttons_to_json, message_markup
+from puregym_bot.config import get_config
+from puregym_bot.datetime_utils import copenhagen_now
+from puregym_bot.metrics import TELEGRAM_SEND_DURATION, TELEGRAM_SEND_ERRORS, observe
+from puregym_bot.storage.db import get_db_session
+from puregym_bot.storage.models import BookingChoice, ManagedBooking, OutboxMessage, OutboxStatus
+from puregym_bot.storage.repository import (
+    add_outbox_message,
+    delete_finished_outbox_messages,
+    get_due_outbox_messages,
+    get_next_pending_outbox_message,
+    set_choice_message_id,
+    set_message_id,
+)
+
+if TYPE_CHECKING:
+    from puregym_bot.bot.booking_cycle import OutboundPrompt
+
+OUTBOX_SENDER_KEY = "outbox_sender"
+# session.info key holding the sender to wake once the enqueued rows are committed
+OUTBOX_WAKE_KEY = "outbox_wake"
+MAX_RETRY_BACKOFF = timedelta(minutes=5)
+OUTBOX_PRUNE_INTERVAL = timedelta(hours=1)
+
+
+@event.listens_for(Session, "after_commit")
+def wake_sender_after_commit(session: Session) -> None:
+    sender = session.info.pop(OUTBOX_WAKE_KEY, None)
+    if sender is not None:
+        sender.wake()
+
+
+def retry_after_seconds(exc: RetryAfter) -> float:
+    with warnings.catch_warnings():
+        # The int form is deprecated in favour of timedelta; both are handled below.
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = exc.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def enqueue_prompts(session, sender: "OutboxSender", chat_id: int, prompts: list["OutboundPrompt"]) -> None:
+    for prompt in prompts:
+        add_outbox_message(
+            session,
+            OutboxMessage(
+                chat_id=chat_id,
+                text=prompt.message.text,
+                buttons_json=buttons_to_json(prompt.message.buttons),
+                managed_booking_id=prompt.booking.id if prompt.booking is not None else None,
+                booking_choice_id=prompt.choice.id if prompt.choice is not None else None,
+            ),
+        )
+    if prompts:
+        session.info[OUTBOX_WAKE_KEY] = sender
+        session.commit()
+
+
+class OutboxSender:
+    """Background task that delivers queued Telegram messages in order."""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._next_prune = 0.0
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="telegram_outbox")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        config = get_config()
+        while True:
+            self._wake.clear()
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL.total_seconds()
+                try:
+                    self.prune()
+                except Exception:
+                    logging.exception("Pruning the Telegram outbox failed")
+            try:
+                delay = await self.drain()
+            except Exception:
+                logging.exception("Telegram outbox drain failed")
+                delay = config.outbox_poll_seconds
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+
+    def prune(self) -> int:
+        """Delete sent and failed messages older than the retention window."""
+        config = get_config()
+        # created_at is stamped by SQLite, in UTC.
+        cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=config.outbox_retention_days)
+        with get_db_session() as session:
+            deleted = delete_finished_outbox_messages(session, cutoff)
+            session.commit()
+        if deleted:
+            logging.info("Pruned %d delivered or failed outbox message(s)", deleted)
+        return deleted
+
+    async def drain(self) -> float:
+        """Send every due message and return how long to sleep before the next attempt."""
+        config = get_config()
+        blocked = False
+        while not blocked:
+            with get_db_session() as session:
+                due = get_due_outbox_messages(session, copenhagen_now(), config.outbox_batch_size)
+            if not due:
+                break
+            for message in due:
+                if not await self.deliver(message):
+                    blocked = True
+                    break
+
+        with get_db_session() as session:
+            head = get_next_pending_outbox_message(session)
+        if head is None:
+            return config.outbox_poll_seconds
+        if head.next_attempt_at is None:
+            return 0.0
+        until_next = (head.next_attempt_at - copenhagen_now()).total_seconds()
+        return min(max(until_next, 0.0), config.outbox_poll_seconds)
+
+    async def deliver(self, message: OutboxMessage) -> bool:
+        """Try to send one message; False means later messages must wait for its retry."""
+        config = get_config()
+        spec = MessageSpec(text=message.text, buttons=buttons_from_json(message.buttons_json))
+        try:
+            with observe(TELEGRAM_SEND_DURATION, TELEGRAM_SEND_ERRORS, path="outbox"):
+                sent = await self.bot.send_message(
+                    chat_id=message.chat_id,
+                    text=spec.text,
+                    reply_markup=message_markup(spec),
+                )
+        except RetryAfter as exc:
+            delay = timedelta(seconds=retry_after_seconds(exc))
+            logging.info("Telegram flood control, retrying outbox message %s in %s", message.id, delay)
+            self.reschedule(message, delay, str(exc), count_attempt=False)
+            return False
+        except BadRequest as exc:
+            # Telegram rejected the message itself, so retrying cannot help.
+            logging.warning("Dropping outbox message %s: %s", message.id, exc)
+            self.fail(message, str(exc))
+            return True
+        except NetworkError as exc:
+            attempts = message.attempts + 1
+            if attempts >= config.outbox_max_attempts:
+                logging.warning("Giving up on outbox message %s after %d attempts", message.id, attempts)
+                self.fail(message, str(exc))
+                return True
+            delay = min(timedelta(seconds=2**attempts), MAX_RETRY_BACKOFF)
+            logging.info("Sending outbox message %s failed, retrying in %s: %s", message.id, delay, exc)
+            self.reschedule(message, delay, str(exc), count_attempt=True)
+            return False
+        except TelegramError as exc:
+            # Anything else (blocked bot, unknown chat) will not succeed on retry either.
+            logging.warning("Dropping outbox message %s: %s", message.id, exc)
+            self.fail(message, str(exc))
+            return True
+
+        self.mark_sent(message, sent.message_id)
+        return True
+
+    def reschedule(self, message: OutboxMessage, delay: timedelta, error: str, count_attempt: bool) -> None:
+        with get_db_session() as session:
+            stored = session.get(OutboxMessage, message.id)
+            if stored is None:
+                return
+            if count_attempt:
+                stored.attempts += 1
+            stored.next_attempt_at = copenhagen_now() + delay
+            stored.last_error = error
+            session.add(stored)
+            session.commit()
+
+    def fail(self, message: OutboxMessage, error: str) -> None:
+        with get_db_session() as session:
+            stored = session.get(OutboxMessage, message.id)
+            if stored is None:
+                return
+            stored.status = OutboxStatus.FAILED
+            stored.attempts += 1
+            stored.last_error = error
+            session.add(stored)
+            session.commit()
+
+    def mark_sent(self, message: OutboxMessage, telegram_message_id: int) -> None:
+        with get_db_session() as session:
+            stored = session.get(OutboxMessage, message.id)
+            if stored is None:
+                return
+            stored.status = OutboxStatus.SENT
+            stored.telegram_message_id = telegram_message_id
+            stored.sent_at = copenhagen_now()
+            session.add(stored)
+
+            if stored.managed_booking_id is not None:
+                booking = session.get(ManagedBooking, stored.managed_booking_id)
+                if booking is not None:
+                    set_message_id(session, booking, telegram_message_id)
+            if stored.booking_choice_id is not None:
+                choice = session.get(BookingChoice, stored.booking_choice_id)
+                if choice is not None:
+                    set_choice_message_id(session, choice, telegram_message_id)
+            session.commit()
+
+
+def get_outbox_sender(bot_data: dict) -> OutboxSender | None:
+    return bot_data.get(OUTBOX_SENDER_KEY)
+
+
+def start_outbox_sender(bot_data: dict, bot: Bot) -> OutboxSender:
+    sender = OutboxSender(bot)
+    bot_data[OUTBOX_SENDER_KEY] = sender
+    sender.start()
+    return sender
+
+
+async def stop_outbox_sender(bot_data: dict) -> None:
+    sender = bot_data.pop(OUTBOX_SENDER_KEY, None)
+    if sender is not None:
+        await sender.stop()
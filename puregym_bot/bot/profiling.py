@@ -0,0 +1,111 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import CycleReport
+from puregym_bot.bot.cycle_executor import CycleExecutor
+
+DEFAULT_PROFILE_ENTRIES = 25
+MAX_PROFILE_ENTRIES = 200
+
+
+@dataclass(frozen=True)
+class ProfileRequest:
+    top: int = DEFAULT_PROFILE_ENTRIES
+    trace_memory: bool = False
+
+
+@dataclass(frozen=True)
+class CycleProfile:
+    report: CycleReport
+    elapsed_seconds: float
+    hot_spots: str
+    allocations: str | None = None
+
+    def render(self) -> str:
+        sections = [f"Profiled booking cycle in {self.elapsed_seconds:.2f}s", self.hot_spots]
+        if self.allocations is not None:
+            sections.append(self.allocations)
+        return "\n\n".join(sections)
+
+
+def parse_profile_args(args: list[str]) -> ProfileRequest:
+    top = DEFAULT_PROFILE_ENTRIES
+    trace_memory = False
+    for arg in args:
+        if arg.isdigit():
+            top = min(max(int(arg), 1), MAX_PROFILE_ENTRIES)
+        elif arg.lower() in ("mem", "memory"):
+            trace_memory = True
+        else:
+            raise ValueError(f"Unknown /profile argument: {arg}")
+    return ProfileRequest(top=top, trace_memory=trace_memory)
+
+
+def format_hot_spots(profiler: cProfile.Profile, top: int) -> str:
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    lines = [line.rstrip() for line in output.getvalue().splitlines() if line.strip()]
+    # print_stats opens with a summary; only the table from its header row on is worth sending.
+    header = next((index for index, line in enumerate(lines) if line.lstrip().startswith("ncalls")), 0)
+    return "\n".join([f"Top {top} by cumulative time:", *lines[header:]])
+
+
+def format_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int, top: int) -> str:
+    own_traces = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    before, after = before.filter_traces(own_traces), after.filter_traces(own_traces)
+    lines = [f"Top {top} allocation sites (peak {peak / 1024:.0f} KiB):"]
+    for stat in after.compare_to(before, "lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks  {frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines)
+
+
+async def profile_cycle(
+    executor: CycleExecutor,
+    context: ContextTypes.DEFAULT_TYPE,
+    request: ProfileRequest,
+) -> CycleProfile:
+    """Run one cycle through the executor with cProfile and, if asked, tracemalloc enabled.
+
+    The profiler sees everything the event loop runs meanwhile, so the numbers are only clean when the
+    bot is otherwise idle.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    before: tracemalloc.Snapshot | None = None
+    if request.trace_memory:
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        report = await executor.trigger(context)
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        after = tracemalloc.take_snapshot() if before is not None else None
+        peak = tracemalloc.get_traced_memory()[1] if before is not None else 0
+        if request.trace_memory and not already_tracing:
+            tracemalloc.stop()
+
+    allocations = None
+    if before is not None and after is not None:
+        allocations = format_allocations(before, after, peak, request.top)
+    return CycleProfile(
+        report=report,
+        elapsed_seconds=elapsed,
+        hot_spots=format_hot_spots(profiler, request.top),
+        allocations=allocations,
+    )
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import json
+from dataclasses import asdict, dataclass
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -18,6 +19,14 @@ class MessageSpec:
     buttons: tuple[tuple[ButtonSpec, ...], ...] = ()
 
 
+def buttons_to_json(buttons: tuple[tuple[ButtonSpec, ...], ...]) -> str:
+    return json.dumps([[asdict(button) for button in row] for row in buttons])
+
+
+def buttons_from_json(raw: str) -> tuple[tuple[ButtonSpec, ...], ...]:
+    return tuple(tuple(ButtonSpec(**button) for button in row) for row in json.loads(raw))
+
+
 def message_markup(message: MessageSpec) -> InlineKeyboardMarkup | None:
     if not message.buttons:
         return None
@@ -14,6 +14,8 @@ class CommandSpec:
     description: str
     handler: Callable[[Update, ContextTypes.DEFAULT_TYPE, HandlerContext], Awaitable[None]]
     allow_inactive: bool = False
+    # Commands that wait for a whole booking cycle run alongside other updates instead of holding them up
+    blocking: bool = True
 
 
 COMMANDS: list[CommandSpec] = [
@@ -29,5 +31,6 @@ COMMANDS: list[CommandSpec] = [
     ),
     CommandSpec("class_ids", "List available class types", handlers.all_class_ids, allow_inactive=True),
     CommandSpec("center_ids", "List available centers", handlers.all_center_ids, allow_inactive=True),
-    CommandSpec("run_now", "Run booking cycle immediately", handlers.run_now),
+    CommandSpec("run_now", "Run booking cycle immediately", handlers.run_now, blocking=False),
+    CommandSpec("profile", "Profile one booking cycle", handlers.profile, blocking=False),
 ]
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from puregym_mcp.puregym.client import PureGymClient
+from telegram.ext import ContextTypes, JobQueue
+
+from puregym_bot.bot.booking_cycle import (
+    SlotOccurrence,
+    get_booking_lock,
+    group_by_slot,
+    handle_slot_booking_actions,
+    invalidate_class_cache,
+    is_cycle_active,
+    publish_prompts,
+    slot_is_blocked,
+)
+from puregym_bot.bot.booking_deadlines import track_booking_deadlines
+from puregym_bot.bot.booking_state import mark_bookings_changed
+from puregym_bot.bot.class_records import ClassRecord
+from puregym_bot.config import TimeSlot, get_config
+from puregym_bot.datetime_utils import combine_copenhagen, copenhagen_now
+from puregym_bot.storage.db import get_db_session
+from puregym_bot.storage.repository import get_active_bookings
+
+RELEASE_SNIPER_JOB_NAME = "release_sniper"
+
+
+@dataclass(frozen=True)
+class ReleaseTarget:
+    release_at: datetime
+    slot_occurrence: SlotOccurrence
+
+
+def weekly_class_starts(classes: Iterable[ClassRecord]) -> dict[int, set[time]]:
+    # The timetable repeats weekly, so this week's start times predict the ones about to be released.
+    starts: dict[int, set[time]] = {}
+    for gym_class in classes:
+        starts.setdefault(gym_class.weekday, set()).add(gym_class.start_clock)
+    return starts
+
+
+def known_class_starts(bot_data: dict) -> dict[int, set[time]]:
+    state = bot_data.get("incremental_cycle_state")
+    if state is None or state.snapshot is None:
+        return {}
+    return weekly_class_starts(state.snapshot.classes.values())
+
+
+def release_instants(
+    slot_occurrence: SlotOccurrence,
+    max_days_in_advance: int,
+    class_starts: dict[int, set[time]] | None = None,
+) -> list[datetime]:
+    """Each class is released max_days_in_advance before it starts, not before its slot does."""
+    slot_start = time.fromisoformat(slot_occurrence.slot_start)
+    slot_end = time.fromisoformat(slot_occurrence.slot_end)
+    weekday = date.fromisoformat(slot_occurrence.date).weekday()
+    starts = sorted(
+        start for start in (class_starts or {}).get(weekday, ()) if slot_start <= start < slot_end
+    )
+    # Without a known timetable the slot start is the earliest moment anything can be released.
+    return [
+        combine_copenhagen(slot_occurrence.date, start) - timedelta(days=max_days_in_advance)
+        for start in starts or [slot_start]
+    ]
+
+
+def upcoming_releases(
+    after: datetime,
+    time_slots: list[TimeSlot],
+    max_days_in_advance: int,
+    days: int = 8,
+    class_starts: dict[int, set[time]] | None = None,
+) -> list[ReleaseTarget]:
+    # A slot occurrence is released max_days_in_advance before it starts, so the occurrences
+    # released in the next few days are the ones just past the current horizon.
+    first_day = (after + timedelta(days=max_days_in_advance)).date() - timedelta(days=1)
+    targets: list[ReleaseTarget] = []
+    for offset in range(days + 1):
+        day = first_day + timedelta(days=offset)
+        for slot in time_slots:
+            if slot.day_of_week != day.weekday():
+                continue
+            slot_occurrence = SlotOccurrence(
+                date=day.isoformat(),
+                slot_start=slot.start_time.isoformat(),
+                slot_end=slot.end_time.isoformat(),
+            )
+            for release_at in release_instants(slot_occurrence, max_days_in_advance, class_starts):
+                if release_at > after:
+                    targets.append(ReleaseTarget(release_at=release_at, slot_occurrence=slot_occurrence))
+    targets.sort(key=lambda target: target.release_at)
+    return targets
+
+
+def next_release(
+    after: datetime,
+    time_slots: list[TimeSlot],
+    max_days_in_advance: int,
+    class_starts: dict[int, set[time]] | None = None,
+) -> ReleaseTarget | None:
+    targets = upcoming_releases(after, time_slots, max_days_in_advance, class_starts=class_starts)
+    return targets[0] if targets else None
+
+
+def schedule_next_release(
+    job_queue: JobQueue,
+    after: datetime | None = None,
+    class_starts: dict[int, set[time]] | None = None,
+) -> ReleaseTarget | None:
+    config = get_config()
+    now = copenhagen_now()
+    target = next_release(
+        after or now,
+        config.class_preferences.available_time_slots,
+        config.max_days_in_advance,
+        class_starts,
+    )
+    if target is None:
+        return None
+
+    fire_at = target.release_at - timedelta(seconds=config.release_sniper_lead_seconds)
+    job_queue.run_once(
+        snipe_release,
+        when=max((fire_at - now).total_seconds(), 0),
+        data=target,
+        name=RELEASE_SNIPER_JOB_NAME,
+    )
+    logging.info(
+        "Release sniper armed for %s %s-%s at %s",
+        target.slot_occurrence.date,
+        target.slot_occurrence.slot_start,
+        target.slot_occurrence.slot_end,
+        target.release_at.isoformat(),
+    )
+    return target
+
+
+async def prewarm_session(client: PureGymClient) -> None:
+    # An authenticated round trip opens the pooled connection before the release instant.
+    try:
+        await client.get_my_bookings()
+    except Exception:
+        logging.warning("Failed to pre-warm PureGym session", exc_info=True)
+
+
+async def attempt_release_booking(
+    context: ContextTypes.DEFAULT_TYPE,
+    client: PureGymClient,
+    target: ReleaseTarget,
+) -> bool:
+    config = get_config()
+    slot_occurrence = target.slot_occurrence
+    classes = await client.get_available_classes(
+        class_ids=config.class_preferences.interested_classes,
+        center_ids=config.class_preferences.interested_centers,
+        from_date=slot_occurrence.date,
+        to_date=slot_occurrence.date,
+    )
+    slot_classes = group_by_slot(classes, config.class_preferences.available_time_slots).get(slot_occurrence)
+    if not slot_classes:
+        return False
+
+    async with get_booking_lock(context):
+        with get_db_session() as session:
+            if slot_is_blocked(session, slot_occurrence):
+                return True
+            active_count = len(get_active_bookings(session))
+            if active_count >= config.max_bookings:
+                logging.info("Release sniper stopped because max bookings are reached")
+                return True
+            result = await handle_slot_booking_actions(
+                session, client, {slot_occurrence: slot_classes}, active_count
+            )
+            booked = [prompt.booking for prompt in result.prompts if prompt.booking is not None]
+            if booked:
+                invalidate_class_cache(context.bot_data)
+                mark_bookings_changed(context.bot_data)
+                track_booking_deadlines(context.bot_data, booked)
+            await publish_prompts(context, session, result.prompts)
+    return slot_occurrence not in result.unresolved_slots
+
+
+async def run_release_snipe(context: ContextTypes.DEFAULT_TYPE, target: ReleaseTarget) -> None:
+    config = get_config()
+    client = context.bot_data.get("puregym_client")
+    if client is None:
+        raise ValueError("No PureGym client found")
+
+    with get_db_session() as session:
+        if not is_cycle_active(session):
+            logging.info("Release sniper skipped because bot is inactive")
+            return
+
+    await prewarm_session(client)
+    wait_seconds = (target.release_at - copenhagen_now()).total_seconds()
+    if wait_seconds > 0:
+        await asyncio.sleep(wait_seconds)
+
+    deadline = target.release_at + timedelta(seconds=config.release_sniper_window_seconds)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            if await attempt_release_booking(context, client, target):
+                logging.info("Release sniper finished after %d attempt(s)", attempts)
+                return
+        except Exception:
+            logging.warning("Release sniper attempt %d failed", attempts, exc_info=True)
+        if copenhagen_now() >= deadline:
+            logging.info("Release sniper window elapsed after %d attempt(s)", attempts)
+            return
+        await asyncio.sleep(config.release_sniper_retry_interval_seconds)
+
+
+async def snipe_release(context: ContextTypes.DEFAULT_TYPE) -> None:
+    job = context.job
+    if job is None or not isinstance(job.data, ReleaseTarget):
+        return
+    target = job.data
+    try:
+        await run_release_snipe(context, target)
+    finally:
+        if context.job_queue is not None:
+            schedule_next_release(
+                context.job_queue, after=target.release_at, class_starts=known_class_starts(context.bot_data)
+            )
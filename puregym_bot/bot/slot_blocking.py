@@ -0,0 +1,56 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Protocol
+
+from puregym_bot.datetime_utils import combine_copenhagen
+from puregym_bot.storage.repository import get_handled_bookings_between, get_pending_choices_between
+
+
+class SlotLike(Protocol):
+    date: str
+    slot_start: str
+    slot_end: str
+
+
+@dataclass
+class SlotBlockingIndex:
+    pending_choices: set[tuple[str, str, str]] = field(default_factory=set)
+    # class date -> sorted start times of bookings that already handled a slot on that day
+    handled_starts: dict[str, list[datetime]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, session, slot_occurrences: Iterable[SlotLike]) -> "SlotBlockingIndex":
+        dates = sorted({slot_occurrence.date for slot_occurrence in slot_occurrences})
+        index = cls()
+        if not dates:
+            return index
+
+        for choice in get_pending_choices_between(session, dates[0], dates[-1]):
+            index.pending_choices.add((choice.slot_date, choice.slot_start, choice.slot_end))
+
+        horizon_start = combine_copenhagen(dates[0], "00:00")
+        horizon_end = combine_copenhagen(dates[-1], "00:00") + timedelta(days=1)
+        for booking in get_handled_bookings_between(session, horizon_start, horizon_end):
+            index.add_handled_booking(booking.class_datetime)
+        return index
+
+    def add_handled_booking(self, class_datetime: datetime) -> None:
+        starts = self.handled_starts.setdefault(class_datetime.date().isoformat(), [])
+        starts.insert(bisect_left(starts, class_datetime), class_datetime)
+
+    def add_pending_choice(self, slot_occurrence: SlotLike) -> None:
+        self.pending_choices.add((slot_occurrence.date, slot_occurrence.slot_start, slot_occurrence.slot_end))
+
+    def is_blocked(self, slot_occurrence: SlotLike) -> bool:
+        key = (slot_occurrence.date, slot_occurrence.slot_start, slot_occurrence.slot_end)
+        if key in self.pending_choices:
+            return True
+
+        starts = self.handled_starts.get(slot_occurrence.date)
+        if not starts:
+            return False
+        slot_start = combine_copenhagen(slot_occurrence.date, slot_occurrence.slot_start)
+        slot_end = combine_copenhagen(slot_occurrence.date, slot_occurrence.slot_end)
+        position = bisect_left(starts, slot_start)
+        return position < len(starts) and starts[position] < slot_end
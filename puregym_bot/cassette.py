@@ -0,0 +1,202 @@
+import asyncio
+import builtins
+import gzip
+import inspect
+import json
+import time
+from collections import defaultdict, deque
+from datetime import date
+from functools import wraps
+from pathlib import Path
+from typing import Any, get_type_hints
+
+import httpx
+from puregym_mcp.puregym.client import PureGymClient
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from puregym_bot.datetime_utils import copenhagen_now
+
+REDACTED = "[redacted]"
+# Argument and response keys whose values never go to disk, whatever they contain.
+SENSITIVE_KEYS = ("password", "token", "authorization", "cookie", "secret", "username", "email")
+# Arguments keyed by their offset from the recording day, so a cassette replays on any later day
+DATE_ARGUMENTS = ("from_date", "to_date")
+
+
+class CassetteMiss(LookupError):
+    """The cassette holds no response for a call that replay was asked to serve."""
+
+
+class RecordedError(Exception):
+    """Replays an error that the real client raised while recording."""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+
+def redact(value: Any, secrets: tuple[str, ...]) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED
+            if any(sensitive in key.lower() for sensitive in SENSITIVE_KEYS)
+            else redact(item, secrets)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item, secrets) for item in value]
+    if isinstance(value, str):
+        for secret in secrets:
+            if secret:
+                value = value.replace(secret, REDACTED)
+    return value
+
+
+def call_key(method: str, arguments: dict[str, Any], today: date | None = None) -> str:
+    if today is not None:
+        arguments = dict(arguments)
+        for name in DATE_ARGUMENTS:
+            value = arguments.get(name)
+            if isinstance(value, str):
+                arguments[name] = f"{(date.fromisoformat(value) - today).days:+d}d"
+    return json.dumps([method, arguments], sort_keys=True, separators=(",", ":"))
+
+
+def recorded_error(exc: Exception) -> dict[str, Any]:
+    error: dict[str, Any] = {"type": type(exc).__name__, "message": str(exc)}
+    if isinstance(exc, httpx.HTTPStatusError):
+        error["status_code"] = exc.response.status_code
+    return error
+
+
+def replayed_error(error: dict[str, Any]) -> Exception:
+    """Rebuild a recorded error as its original httpx or builtin type, so replayed outages stay outages."""
+    error_type, message = error["type"], error["message"]
+    if "status_code" in error:
+        request = httpx.Request("GET", "https://puregym.invalid")
+        response = httpx.Response(error["status_code"], request=request)
+        return httpx.HTTPStatusError(message, request=request, response=response)
+    exc_type = getattr(httpx, error_type, None) or getattr(builtins, error_type, None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        try:
+            return exc_type(message)
+        except TypeError:
+            pass
+    return RecordedError(error_type, message)
+
+
+def bound_arguments(name: str, args: tuple, kwargs: dict) -> dict[str, Any]:
+    # Bound against PureGymClient itself so recordings match however the client was wrapped.
+    bound = inspect.signature(getattr(PureGymClient, name)).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    arguments.pop("self")
+    return to_jsonable_python(arguments)
+
+
+class CassetteRecorder:
+    """Proxy that logs every PureGym call, its response or error and its latency as one gzipped JSON line.
+
+    Credentials and anything under a sensitive key are replaced before the entry is written.
+    """
+
+    def __init__(self, client, path: Path, secrets: tuple[str, ...] = ()):
+        self.client = client
+        self.path = path
+        self.secrets = secrets
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending starts a new gzip member, which readers treat as one continuous stream.
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not inspect.iscoroutinefunction(getattr(PureGymClient, name, None)):
+            return attribute
+
+        @wraps(attribute)
+        async def recorded(*args, **kwargs):
+            entry: dict[str, Any] = {
+                "method": name,
+                "args": bound_arguments(name, args, kwargs),
+                "recorded_on": copenhagen_now().date().isoformat(),
+            }
+            started = time.perf_counter()
+            try:
+                response = await attribute(*args, **kwargs)
+            except asyncio.CancelledError:
+                # Usually a step timeout; the call never answered, and replay reproduces exactly that.
+                entry["cancelled"] = True
+                raise
+            except Exception as exc:
+                entry["error"] = recorded_error(exc)
+                raise
+            else:
+                entry["response"] = to_jsonable_python(response)
+                return response
+            finally:
+                entry["seconds"] = round(time.perf_counter() - started, 4)
+                self.write(entry)
+
+        return recorded
+
+    def write(self, entry: dict[str, Any]) -> None:
+        self._file.write(json.dumps(redact(entry, self.secrets), separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self.client.aclose()
+
+
+def load_cassette(path: Path) -> list[dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as cassette:
+        return [json.loads(line) for line in cassette if line.strip()]
+
+
+class CassetteReplayClient:
+    """Serves recorded responses in their original order per call, after their recorded latency.
+
+    Each distinct call (method and arguments) replays its own recordings in sequence and then keeps
+    returning the last one. Date arguments match by their offset from the recording day, while the
+    responses keep the dates they were recorded with. A call that was cancelled while recording never
+    answers, so the caller's own timeout ends it again. `time_scale` multiplies the latencies; 0 replays
+    without waiting.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]], time_scale: float = 1.0):
+        self.time_scale = time_scale
+        self.recordings: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        for entry in entries:
+            recorded_on = entry.get("recorded_on")
+            # Older cassettes carry no recording day and only match their literal dates.
+            today = date.fromisoformat(recorded_on) if recorded_on else None
+            self.recordings[call_key(entry["method"], entry["args"], today)].append(entry)
+
+    def __getattr__(self, name: str):
+        method = getattr(PureGymClient, name, None)
+        if not inspect.iscoroutinefunction(method):
+            raise AttributeError(name)
+        response_type = TypeAdapter(get_type_hints(method)["return"])
+
+        @wraps(method)
+        async def replayed(*args, **kwargs):
+            arguments = bound_arguments(name, args, kwargs)
+            recordings = self.recordings.get(
+                call_key(name, arguments, copenhagen_now().date())
+            ) or self.recordings.get(call_key(name, arguments))
+            if not recordings:
+                raise CassetteMiss(f"No recorded response for {name}({arguments})")
+            entry = recordings.popleft() if len(recordings) > 1 else recordings[0]
+            if self.time_scale > 0:
+                await asyncio.sleep(entry["seconds"] * self.time_scale)
+            if entry.get("cancelled"):
+                await asyncio.Future()
+            if "error" in entry:
+                raise replayed_error(entry["error"])
+            return response_type.validate_python(entry["response"])
+
+        return replayed
+
+    async def aclose(self) -> None:
+        return None
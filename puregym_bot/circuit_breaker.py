@@ -0,0 +1,203 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import wraps
+from typing import Callable
+
+import httpx
+from puregym_mcp.puregym.client import PureGymClient
+
+from puregym_bot.metrics import CIRCUIT_REJECTIONS, CIRCUIT_TRANSITIONS
+
+CIRCUIT_BREAKER_KEY = "circuit_breaker"
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    # one trial call is let through to see whether the endpoint recovered
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, method: str, retry_in: float):
+        super().__init__(f"PureGym {method} circuit is open; retrying in {retry_in:.0f}s")
+        self.method = method
+        self.retry_in = retry_in
+
+
+def is_outage(exc: BaseException) -> bool:
+    """Timeouts, connection errors and server errors count against the circuit; client errors do not."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (httpx.TransportError, TimeoutError))
+
+
+def is_unavailable(exc: BaseException) -> bool:
+    """PureGym could not be reached or its circuit is open, so the call is worth retrying later."""
+    return isinstance(exc, CircuitOpenError) or is_outage(exc)
+
+
+@dataclass
+class EndpointCircuit:
+    failure_threshold: int
+    backoff_seconds: float
+    max_backoff_seconds: float
+    state: BreakerState = BreakerState.CLOSED
+    failures: int = 0
+    # consecutive openings, which double the backoff each time
+    openings: int = 0
+    retry_at: float = 0.0
+    trial_in_flight: bool = False
+
+    def available(self, now: float) -> bool:
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.state == BreakerState.OPEN:
+            return now >= self.retry_at
+        return not self.trial_in_flight
+
+    def acquire(self, now: float) -> bool:
+        if not self.available(now):
+            return False
+        if self.state != BreakerState.CLOSED:
+            self.state = BreakerState.HALF_OPEN
+            self.trial_in_flight = True
+        return True
+
+    def succeed(self) -> None:
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.openings = 0
+        self.trial_in_flight = False
+
+    def fail(self, now: float, rng: random.Random) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == BreakerState.OPEN:
+            # A call that was already in flight when the circuit opened; the backoff stands.
+            return
+        if self.state == BreakerState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.openings += 1
+            backoff = min(self.backoff_seconds * 2 ** (self.openings - 1), self.max_backoff_seconds)
+            # Equal jitter keeps at least half the backoff while spreading retries out.
+            self.retry_at = now + backoff / 2 + rng.uniform(0, backoff / 2)
+            self.state = BreakerState.OPEN
+
+    def retry_in(self, now: float) -> float:
+        return max(self.retry_at - now, 0.0)
+
+
+class CircuitBreakerClient:
+    """Proxy that tracks failures per PureGym method and fails fast while a method's circuit is open."""
+
+    def __init__(
+        self,
+        client,
+        failure_threshold: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ):
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.circuits: dict[str, EndpointCircuit] = {}
+
+    def circuit(self, method: str) -> EndpointCircuit:
+        circuit = self.circuits.get(method)
+        if circuit is None:
+            circuit = EndpointCircuit(self.failure_threshold, self.backoff_seconds, self.max_backoff_seconds)
+            self.circuits[method] = circuit
+        return circuit
+
+    def available(self, method: str) -> bool:
+        circuit = self.circuits.get(method)
+        return circuit is None or circuit.available(self.clock())
+
+    def open_circuits(self) -> dict[str, EndpointCircuit]:
+        return {
+            method: circuit
+            for method, circuit in sorted(self.circuits.items())
+            if circuit.state != BreakerState.CLOSED
+        }
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not inspect.iscoroutinefunction(getattr(PureGymClient, name, None)):
+            return attribute
+
+        @wraps(attribute)
+        async def guarded(*args, **kwargs):
+            circuit = self.circuit(name)
+            if not circuit.acquire(self.clock()):
+                CIRCUIT_REJECTIONS.inc(method=name)
+                raise CircuitOpenError(name, circuit.retry_in(self.clock()))
+            try:
+                result = await attribute(*args, **kwargs)
+            except asyncio.CancelledError:
+                # Says nothing about the endpoint; just let the next call be the trial.
+                circuit.trial_in_flight = False
+                raise
+            except Exception as exc:
+                # Any answer that is not an outage, such as a 4xx, shows the endpoint is up.
+                self.settle(name, circuit, failed=is_outage(exc))
+                raise
+            self.settle(name, circuit, failed=False)
+            return result
+
+        return guarded
+
+    def settle(self, method: str, circuit: EndpointCircuit, failed: bool) -> None:
+        previous = circuit.state
+        if failed:
+            circuit.fail(self.clock(), self.rng)
+        else:
+            circuit.succeed()
+        if circuit.state != previous:
+            self.transitioned(method, circuit)
+
+    def transitioned(self, method: str, circuit: EndpointCircuit) -> None:
+        CIRCUIT_TRANSITIONS.inc(method=method, state=circuit.state)
+        if circuit.state == BreakerState.OPEN:
+            logging.warning(
+                "PureGym %s circuit opened after %d failure(s); retrying in %.0fs",
+                method,
+                circuit.failures,
+                circuit.retry_in(self.clock()),
+            )
+        else:
+            logging.info("PureGym %s circuit %s", method, circuit.state)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def get_circuit_breaker(bot_data: dict) -> CircuitBreakerClient | None:
+    return bot_data.get(CIRCUIT_BREAKER_KEY)
+
+
+def format_circuit_status(breaker: CircuitBreakerClient | None) -> str:
+    if breaker is None:
+        return "PureGym circuit breaker is disabled."
+    circuits = breaker.open_circuits()
+    if not circuits:
+        return "PureGym API is healthy."
+    now = breaker.clock()
+    lines = ["PureGym API is degraded:"]
+    for method, circuit in circuits.items():
+        if circuit.state == BreakerState.HALF_OPEN:
+            lines.append(f"- {method}: testing recovery")
+        else:
+            lines.append(
+                f"- {method}: open after {circuit.failures} failure(s), retry in {circuit.retry_in(now):.0f}s"
+            )
+    return "\n".join(lines)
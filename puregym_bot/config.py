@@ -1,5 +1,5 @@
 from datetime import time
-from enum import IntEnum
+from enum import IntEnum, StrEnum
 from functools import lru_cache
 from pathlib import Path
 from typing import Annotated
@@ -12,6 +12,8 @@ from pydantic_settings import (
     YamlConfigSettingsSource,
 )
 
+from puregym_bot.slot_index import SlotIndex, compile_slot_index
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 CONFIG_PATH = PROJECT_ROOT / "config.yaml"
 
@@ -44,12 +46,34 @@ class Weekday(IntEnum):
     SUNDAY = 6
 
 
+class DigestPolicy(StrEnum):
+    # every informational prompt is its own message
+    OFF = "off"
+    # one message per notification category and cycle
+    CATEGORY = "category"
+    # one message for all of a cycle's informational prompts
+    CYCLE = "cycle"
+
+
+class CassetteMode(StrEnum):
+    OFF = "off"
+    # log PureGym calls and responses to puregym_cassette_path
+    RECORD = "record"
+    # serve PureGym calls from puregym_cassette_path without touching the network
+    REPLAY = "replay"
+
+
 class TimeSlot(BaseModel):
     day_of_week: Weekday
     start_time: time
     end_time: time
 
 
+class RefreshTier(BaseModel):
+    max_days_ahead: int
+    refresh_seconds: int = 0
+
+
 class GymClassPreferences(BaseModel):
     interested_classes: list[int]
     interested_centers: list[int]
@@ -71,8 +95,14 @@ class GymClassPreferences(BaseModel):
                         f"overlaps with {current.start_time.isoformat()}-{current.end_time.isoformat()}"
                     )
 
+        # Compile the matching index up front so the booking cycle never pays for it.
+        compile_slot_index(self.available_time_slots)
         return self
 
+    @property
+    def slot_index(self) -> SlotIndex:
+        return compile_slot_index(self.available_time_slots)
+
 
 class Config(BaseSettings):
     telegram_token: Annotated[SecretStr, AfterValidator(valid_secret)] = SecretStr("")
@@ -85,11 +115,53 @@ class Config(BaseSettings):
 
     max_days_in_advance: int = 28
     max_bookings: int = 18
+    booking_concurrency: int = 4
     booking_reminder_hours: int = 24
     pending_auto_cancel_hours: int = 3
+    booking_deadline_timer: bool = True
     booking_interval_seconds: int = 60
+    adaptive_booking_interval: bool = True
+    idle_booking_interval_seconds: int = 900
+    min_booking_interval_seconds: int = 5
+    cycle_time_budget_seconds: float = 45.0
+    cycle_deadline_reserve_seconds: float = 10.0
+    incremental_booking_cycle: bool = True
+    cycle_unit_of_work: bool = True
+    telegram_outbox_enabled: bool = True
+    outbox_max_attempts: int = 8
+    outbox_poll_seconds: float = 60.0
+    outbox_batch_size: int = 20
+    outbox_retention_days: int = 7
+    notification_digest: DigestPolicy = DigestPolicy.CATEGORY
+    digest_min_prompts: int = 2
+    full_sync_interval_seconds: int = 900
+    bookings_snapshot_max_age_seconds: int = 900
+    bookings_snapshot_stale_seconds: int = 3600
+    release_sniper_enabled: bool = True
+    release_sniper_lead_seconds: float = 5.0
+    release_sniper_window_seconds: float = 60.0
+    release_sniper_retry_interval_seconds: float = 1.0
+    fetch_partition_days: int | None = None
+    # One request per center keeps a failing center from hiding the others' classes, but multiplies
+    # the class requests per cycle by the number of centers, which brings PureGym rate limits (429s)
+    # and with them the circuit breaker closer.
+    fetch_partition_by_center: bool = False
+    fetch_concurrency: int = 4
+    refresh_tiers: list[RefreshTier] = Field(default_factory=list)
     telegram_timeout_seconds: float = 10.0
+    metrics_enabled: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9464
     puregym_timeout_seconds: float = 10.0
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_threshold: int = 3
+    circuit_breaker_backoff_seconds: float = 30.0
+    circuit_breaker_max_backoff_seconds: float = 900.0
+    puregym_cassette_mode: CassetteMode = CassetteMode.OFF
+    puregym_cassette_path: Path = Path("data/puregym_cassette.jsonl.gz")
+    puregym_cassette_time_scale: float = 1.0
+    catalog_cache_dir: Path = Path("data/catalogs")
+    catalog_cache_ttl_hours: int = 168
 
     model_config = SettingsConfigDict(yaml_file=str(CONFIG_PATH), yaml_file_encoding="utf-8")
 
@@ -38,7 +38,9 @@ def format_telegram_datetime(value: str | datetime) -> str:
     return _format_telegram_when(parsed.date(), parsed.time())
 
 
-def format_telegram_class_summary(class_date: str, start_time: str, title: str, location: str) -> str:
+def format_telegram_class_summary(
+    class_date: str | date, start_time: str | time, title: str, location: str
+) -> str:
     return f"{_format_telegram_when(class_date, start_time)}  {title} @ {location}"
 
 
@@ -59,7 +61,7 @@ def format_telegram_booking(
     else:
         class_dt = _parse_datetime(class_datetime)
 
-    message = f"{format_telegram_class_summary(class_dt.date().isoformat(), class_dt.time().isoformat(), title, location)}"
+    message = format_telegram_class_summary(class_dt.date(), class_dt.time(), title, location)
     if waitlist_position is not None:
         message = f"{message} | waitlist #{waitlist_position}"
     if include_cancel_deadline:
@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_SERVER_KEY = "metrics_server"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def label_values(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self.label_values(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self.values.get(self.label_values(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: observations per bucket (last one is +Inf), sum
+        self.counts: dict[LabelValues, list[int]] = {}
+        self.sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self.label_values(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        return sum(self.counts.get(self.label_values(labels), ()))
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, counts in sorted(self.counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, f'le="{format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(self.sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CYCLE_DURATION = REGISTRY.histogram("puregym_bot_cycle_duration_seconds", "Booking cycle duration.")
+CYCLES = REGISTRY.counter("puregym_bot_cycles_total", "Booking cycles by outcome.", ("outcome",))
+CYCLE_STEP_DURATION = REGISTRY.histogram(
+    "puregym_bot_cycle_step_duration_seconds", "Booking cycle step duration.", ("step",)
+)
+CYCLE_STEP_TIMEOUTS = REGISTRY.counter(
+    "puregym_bot_cycle_step_timeouts_total",
+    "Booking cycle steps cut off by the cycle time budget.",
+    ("step",),
+)
+PUREGYM_REQUEST_DURATION = REGISTRY.histogram(
+    "puregym_bot_puregym_request_duration_seconds", "PureGym API call latency.", ("method",)
+)
+PUREGYM_REQUEST_ERRORS = REGISTRY.counter(
+    "puregym_bot_puregym_request_errors_total", "PureGym API calls that raised.", ("method",)
+)
+TELEGRAM_SEND_DURATION = REGISTRY.histogram(
+    "puregym_bot_telegram_send_duration_seconds", "Telegram send_message latency.", ("path",)
+)
+TELEGRAM_SEND_ERRORS = REGISTRY.counter(
+    "puregym_bot_telegram_send_errors_total", "Telegram send_message calls that raised.", ("path",)
+)
+PROMPTS_PUBLISHED = REGISTRY.counter(
+    "puregym_bot_prompts_published_total", "Cycle prompts sent or queued.", ("delivery",)
+)
+HANDLER_DURATION = REGISTRY.histogram(
+    "puregym_bot_handler_duration_seconds", "Telegram command handler duration.", ("handler",)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "puregym_bot_handler_errors_total", "Telegram command handlers that raised.", ("handler",)
+)
+DB_QUERIES = REGISTRY.counter("puregym_bot_db_queries_total", "SQL statements executed.", ("statement",))
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "puregym_bot_circuit_transitions_total", "PureGym circuit breaker state changes.", ("method", "state")
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "puregym_bot_circuit_rejections_total", "PureGym calls refused by an open circuit.", ("method",)
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, errors: Counter | None = None, **labels: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if errors is not None:
+            errors.inc(**labels)
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+def count_query(_conn, _cursor, statement: str, _parameters, _context, _executemany) -> None:
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    DB_QUERIES.inc(statement=verb if verb in ("select", "insert", "update", "delete") else "other")
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", count_query):
+        event.listen(engine, "before_cursor_execute", count_query)
+
+
+class InstrumentedPureGymClient:
+    """Proxy that times every coroutine method of the PureGym client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @wraps(attribute)
+        async def timed(*args, **kwargs):
+            with observe(PUREGYM_REQUEST_DURATION, PUREGYM_REQUEST_ERRORS, method=name):
+                return await attribute(*args, **kwargs)
+
+        return timed
+
+
+async def handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        # Headers are not needed, but the client expects them to be read.
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        if (
+            len(request_line) >= 2
+            and request_line[0] == "GET"
+            and request_line[1].split("?")[0] == "/metrics"
+        ):
+            status, body = "200 OK", REGISTRY.render().encode()
+        else:
+            status, body = "404 Not Found", b"Not found\n"
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(bot_data: dict, host: str, port: int) -> asyncio.Server:
+    server = await asyncio.start_server(handle_metrics_request, host, port)
+    bot_data[METRICS_SERVER_KEY] = server
+    logging.info("Serving metrics on http://%s:%d/metrics", host, port)
+    return server
+
+
+async def stop_metrics_server(bot_data: dict) -> None:
+    server = bot_data.pop(METRICS_SERVER_KEY, None)
+    if server is not None:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,101 @@
+from array import array
+from dataclasses import dataclass
+from datetime import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
+
+from puregym_mcp.puregym.filters import TimeSlotLike
+
+if TYPE_CHECKING:
+    from puregym_bot.bot.class_records import ClassRecord
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+NO_SLOT = -1
+
+
+def minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def is_whole_minute(value: time) -> bool:
+    return value.second == 0 and value.microsecond == 0
+
+
+@dataclass(frozen=True)
+class SlotIndex:
+    time_slots: tuple[TimeSlotLike, ...]
+    # minute of week -> position in time_slots of the slot covering [minute, minute + 1)
+    minute_to_slot: array
+    slot_end_minutes: tuple[int, ...]
+    exact: bool
+
+    @classmethod
+    def compile(cls, time_slots: Iterable[TimeSlotLike]) -> "SlotIndex":
+        slots = tuple(time_slots)
+        minute_to_slot = array("h", [NO_SLOT]) * MINUTES_PER_WEEK
+        exact = all(
+            is_whole_minute(slot.start_time)
+            and is_whole_minute(slot.end_time)
+            and slot.start_time < slot.end_time
+            for slot in slots
+        )
+        for slot_id, slot in enumerate(slots):
+            day_offset = int(slot.day_of_week) * MINUTES_PER_DAY
+            for minute in range(minute_of_day(slot.start_time), minute_of_day(slot.end_time)):
+                if minute_to_slot[day_offset + minute] != NO_SLOT:
+                    # Overlapping slots resolve by list order, which only the linear scan preserves.
+                    exact = False
+                minute_to_slot[day_offset + minute] = slot_id
+        return cls(
+            time_slots=slots,
+            minute_to_slot=minute_to_slot,
+            slot_end_minutes=tuple(minute_of_day(slot.end_time) for slot in slots),
+            exact=exact,
+        )
+
+    def match(self, weekday: int, class_start: time, class_end: time) -> TimeSlotLike | None:
+        if not self.exact or class_end <= class_start:
+            return self.match_linear(weekday, class_start, class_end)
+        if not (is_whole_minute(class_start) and is_whole_minute(class_end)):
+            return self.match_linear(weekday, class_start, class_end)
+
+        end_minute = minute_of_day(class_end)
+        slot_id = self.minute_to_slot[weekday * MINUTES_PER_DAY + minute_of_day(class_start)]
+        if slot_id == NO_SLOT or end_minute > self.slot_end_minutes[slot_id]:
+            return None
+        return self.time_slots[slot_id]
+
+    def match_record(self, record: "ClassRecord") -> TimeSlotLike | None:
+        """Looks up by the record's precomputed minutes; its whole-minute check ran once when it was built."""
+        if not (self.exact and record.whole_minutes):
+            return self.match_linear(record.weekday, record.start_clock, record.end_clock)
+        slot_id = self.minute_to_slot[record.week_minute]
+        if slot_id == NO_SLOT or record.end_minute > self.slot_end_minutes[slot_id]:
+            return None
+        return self.time_slots[slot_id]
+
+    def match_linear(self, weekday: int, class_start: time, class_end: time) -> TimeSlotLike | None:
+        for slot in self.time_slots:
+            if slot.day_of_week != weekday:
+                continue
+            if slot.start_time <= class_start <= class_end <= slot.end_time:
+                return slot
+        return None
+
+
+@lru_cache(maxsize=8)
+def _compile_cached(slot_key: tuple[tuple[int, time, time], ...]) -> SlotIndex:
+    return SlotIndex.compile(_KeyedSlot(*item) for item in slot_key)
+
+
+@dataclass(frozen=True)
+class _KeyedSlot:
+    day_of_week: int
+    start_time: time
+    end_time: time
+
+
+def compile_slot_index(time_slots: Iterable[TimeSlotLike]) -> SlotIndex:
+    slot_key = tuple((int(slot.day_of_week), slot.start_time, slot.end_time) for slot in time_slots)
+    return _compile_cached(slot_key)
@@ -1,9 +1,12 @@
+import logging
 from contextlib import contextmanager
 from pathlib import Path
 
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, SQLModel, create_engine
 
-from puregym_bot.storage.models import BotState
+from puregym_bot.metrics import instrument_engine
+from puregym_bot.storage.models import BotState, ManagedBooking
 
 DATABASE_DIR = Path("data")
 DATABASE_PATH = DATABASE_DIR / "puregym_bot.db"
@@ -14,6 +17,7 @@ engine = create_engine(
     echo=False,
     connect_args={"check_same_thread": False},  # needed for async telegram handlers
 )
+instrument_engine(engine)
 
 
 def ensure_database_dir() -> None:
@@ -24,6 +28,7 @@ def init_db() -> None:
     ensure_database_dir()
     # Create DB file + tables if not exists
     SQLModel.metadata.create_all(engine)
+    create_missing_indexes()
 
     with Session(engine) as session:
         if session.get(BotState, 1) is None:
@@ -31,6 +36,17 @@ def init_db() -> None:
             session.commit()
 
 
+def create_missing_indexes() -> None:
+    # create_all skips existing tables, so indexes added to the models later are created here.
+    for index in ManagedBooking.__table__.indexes:
+        try:
+            index.create(engine, checkfirst=True)
+        except IntegrityError:
+            logging.warning(
+                "Could not create index %s because stored rows violate it", index.name, exc_info=True
+            )
+
+
 @contextmanager
 def get_db_session():
     ensure_database_dir()
@@ -38,5 +54,49 @@ def get_db_session():
         yield session
 
 
+class UnitOfWork:
+    """Session proxy that turns step-level commits into flushes until the next durability point."""
+
+    def __init__(self, session: Session, deferred: bool = True):
+        self.session = session
+        self.deferred = deferred
+        self.staged = False
+        self.commits = 0
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def commit(self) -> None:
+        if not self.deferred:
+            self.session.commit()
+            self.commits += 1
+            return
+        # Flushing assigns primary keys, so callers can still rely on ids after commit().
+        self.session.flush()
+        self.staged = True
+
+    def checkpoint(self) -> None:
+        session = self.session
+        if self.staged or session.new or session.dirty or session.deleted:
+            session.commit()
+            self.commits += 1
+        self.staged = False
+
+
+@contextmanager
+def unit_of_work(session: Session, deferred: bool = True):
+    uow = UnitOfWork(session, deferred=deferred)
+    try:
+        yield uow
+    except BaseException:
+        # Staged steps had completed, so they are kept just like their own commits would have been.
+        try:
+            uow.checkpoint()
+        except Exception:
+            logging.warning("Discarding staged changes after a failed unit of work", exc_info=True)
+        raise
+    uow.checkpoint()
+
+
 if __name__ == "__main__":
     init_db()
@@ -24,7 +24,7 @@ class ManagedBooking(SQLModel, table=True):
     booking_id: str = Field(index=True)
     activity_id: int
     payment_type: str
-    participation_id: str | None = None
+    participation_id: str | None = Field(default=None, unique=True, index=True)
     telegram_message_id: int | None = None
     class_title: str
     class_location: str
@@ -63,3 +63,33 @@ class BookingChoice(SQLModel, table=True):
         default=None,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
     )
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class OutboxMessage(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+
+    chat_id: int
+    text: str
+    buttons_json: str = "[]"
+
+    # Rows whose Telegram message ID is written back once the message is sent
+    managed_booking_id: int | None = None
+    booking_choice_id: int | None = None
+
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING, index=True)
+    attempts: int = 0
+    next_attempt_at: datetime | None = None
+    telegram_message_id: int | None = None
+    last_error: str | None = None
+
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+    sent_at: datetime | None = None
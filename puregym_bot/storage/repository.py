@@ -1,4 +1,8 @@
-from sqlmodel import Session, col, select
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, col, delete, select
 
 from puregym_bot.datetime_utils import combine_copenhagen
 from puregym_bot.storage.models import (
@@ -7,8 +11,14 @@ from puregym_bot.storage.models import (
     BotState,
     ChoiceStatus,
     ManagedBooking,
+    OutboxMessage,
+    OutboxStatus,
 )
 
+ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+# Bookings in these states mean a slot has already been dealt with and must not be booked again.
+HANDLED_BOOKING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED, BookingStatus.CANCELLED)
+
 
 def get_bot_state(session: Session) -> BotState:
     bot_state = session.get(BotState, 1)
@@ -32,15 +42,31 @@ def get_booking_by_participation_id(session: Session, participation_id: str) ->
     return session.exec(statement).first()
 
 
+def get_bookings_by_participation_ids(
+    session: Session, participation_ids: Iterable[str]
+) -> dict[str, ManagedBooking]:
+    participation_ids = list(participation_ids)
+    if not participation_ids:
+        return {}
+    statement = select(ManagedBooking).where(col(ManagedBooking.participation_id).in_(participation_ids))
+    return {
+        booking.participation_id: booking
+        for booking in session.exec(statement).all()
+        if booking.participation_id is not None
+    }
+
+
 def get_booking_by_booking_id(session: Session, booking_id: str) -> ManagedBooking | None:
     statement = select(ManagedBooking).where(ManagedBooking.booking_id == booking_id)
     return session.exec(statement).first()
 
 
-def get_active_bookings(session: Session) -> list[ManagedBooking]:
+def get_active_bookings(session: Session, refresh: bool = False) -> list[ManagedBooking]:
     statement = select(ManagedBooking).where(
-        col(ManagedBooking.status).in_([BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value]),
+        col(ManagedBooking.status).in_([status.value for status in ACTIVE_BOOKING_STATUSES]),
     )
+    if refresh:
+        statement = statement.execution_options(populate_existing=True)
     return list(session.exec(statement).all())
 
 
@@ -59,16 +85,14 @@ def get_handled_bookings_for_slot(
 ) -> list[ManagedBooking]:
     slot_start_dt = combine_copenhagen(slot_date, slot_start)
     slot_end_dt = combine_copenhagen(slot_date, slot_end)
+    return get_handled_bookings_between(session, slot_start_dt, slot_end_dt)
+
+
+def get_handled_bookings_between(session: Session, start: datetime, end: datetime) -> list[ManagedBooking]:
     statement = select(ManagedBooking).where(
-        ManagedBooking.class_datetime >= slot_start_dt,
-        ManagedBooking.class_datetime < slot_end_dt,
-        col(ManagedBooking.status).in_(
-            [
-                BookingStatus.PENDING.value,
-                BookingStatus.CONFIRMED.value,
-                BookingStatus.CANCELLED.value,
-            ]
-        ),
+        ManagedBooking.class_datetime >= start,
+        ManagedBooking.class_datetime < end,
+        col(ManagedBooking.status).in_([status.value for status in HANDLED_BOOKING_STATUSES]),
     )
     return list(session.exec(statement).all())
 
@@ -77,6 +101,21 @@ def add_managed_booking(session: Session, booking: ManagedBooking) -> None:
     session.add(booking)
 
 
+def upsert_managed_bookings(session: Session, bookings: list[ManagedBooking]) -> list[ManagedBooking]:
+    """Insert bookings whose participation ID is not stored yet and return the inserted rows."""
+    if not bookings:
+        return []
+    statement = (
+        sqlite_insert(ManagedBooking)
+        .values([booking.model_dump(exclude={"id", "created_at"}) for booking in bookings])
+        .on_conflict_do_nothing()
+        .returning(col(ManagedBooking.participation_id))
+    )
+    inserted_ids = set(session.exec(statement).scalars())
+    stored = get_bookings_by_participation_ids(session, inserted_ids)
+    return [stored[booking.participation_id] for booking in bookings if booking.participation_id in stored]
+
+
 def set_booking_status(session: Session, booking: ManagedBooking, status: BookingStatus) -> None:
     booking.status = status
     session.add(booking)
@@ -104,6 +143,15 @@ def get_pending_choice(
     return session.exec(statement).first()
 
 
+def get_pending_choices_between(session: Session, first_date: str, last_date: str) -> list[BookingChoice]:
+    statement = select(BookingChoice).where(
+        BookingChoice.slot_date >= first_date,
+        BookingChoice.slot_date <= last_date,
+        BookingChoice.status == ChoiceStatus.PENDING,
+    )
+    return list(session.exec(statement).all())
+
+
 def add_booking_choice(session: Session, choice: BookingChoice) -> None:
     session.add(choice)
 
@@ -121,3 +169,41 @@ def set_choice_message_id(session: Session, choice: BookingChoice, message_id: i
 def get_choice_by_id(session: Session, choice_id: int) -> BookingChoice | None:
     statement = select(BookingChoice).where(BookingChoice.id == choice_id)
     return session.exec(statement).first()
+
+
+def add_outbox_message(session: Session, message: OutboxMessage) -> None:
+    session.add(message)
+
+
+def get_due_outbox_messages(session: Session, now: datetime, limit: int) -> list[OutboxMessage]:
+    statement = (
+        select(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.PENDING)
+        .order_by(col(OutboxMessage.id))
+        .limit(limit)
+    )
+    # Messages go out in order, so a message waiting for its retry holds back the ones behind it.
+    due: list[OutboxMessage] = []
+    for message in session.exec(statement).all():
+        if message.next_attempt_at is not None and message.next_attempt_at > now:
+            break
+        due.append(message)
+    return due
+
+
+def delete_finished_outbox_messages(session: Session, created_before: datetime) -> int:
+    statement = delete(OutboxMessage).where(
+        col(OutboxMessage.status).in_((OutboxStatus.SENT, OutboxStatus.FAILED)),
+        col(OutboxMessage.created_at) < created_before,
+    )
+    return session.exec(statement).rowcount
+
+
+def get_next_pending_outbox_message(session: Session) -> OutboxMessage | None:
+    statement = (
+        select(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.PENDING)
+        .order_by(col(OutboxMessage.id))
+        .limit(1)
+    )
+    return session.exec(statement).first()
@@ -5,7 +5,15 @@ import pytest
 from pydantic import SecretStr
 from sqlmodel import Session, SQLModel, create_engine
 
-from puregym_bot.bot import app, booking_cycle, dependencies, handlers
+from puregym_bot.bot import (
+    app,
+    booking_cycle,
+    cycle_scheduler,
+    dependencies,
+    handlers,
+    outbox,
+    release_sniper,
+)
 from puregym_bot.config import Config, GymClassPreferences, TimeSlot, Weekday, clear_config_cache
 from puregym_bot.storage.models import BotState
 
@@ -34,6 +42,12 @@ def configured_jobs(monkeypatch, session_factory, test_config):
     monkeypatch.setattr(booking_cycle, "get_config", lambda: test_config)
     monkeypatch.setattr(dependencies, "get_config", lambda: test_config)
     monkeypatch.setattr(handlers, "get_config", lambda: test_config)
+    monkeypatch.setattr(release_sniper, "get_db_session", session_factory)
+    monkeypatch.setattr(release_sniper, "get_config", lambda: test_config)
+    monkeypatch.setattr(cycle_scheduler, "get_db_session", session_factory)
+    monkeypatch.setattr(cycle_scheduler, "get_config", lambda: test_config)
+    monkeypatch.setattr(outbox, "get_db_session", session_factory)
+    monkeypatch.setattr(outbox, "get_config", lambda: test_config)
 
 
 @pytest.fixture
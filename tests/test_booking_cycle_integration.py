@@ -146,7 +146,7 @@ async def test_run_booking_cycle_full_chain(configured_jobs, session_factory, te
         "If you changed your mind, cancel now or revert to pending to reconsider." == text
         for text in texts
     )
-    assert any("Pending booking was cancelled" in text for text in texts)
+    assert any("2 pending bookings were cancelled before class time:" in text for text in texts)
 
 
 @pytest.mark.asyncio
@@ -168,3 +168,63 @@ async def test_run_booking_cycle_skips_when_inactive(configured_jobs, test_engin
     assert context.bot.calls == []
     assert client.book_calls == []
     assert client.unbook_calls == []
+
+
+class FailingBookingClient(FakePureGymClient):
+    async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str):
+        self.book_by_ids_calls.append((booking_id, activity_id, payment_type))
+        raise RuntimeError("unexpected booking response")
+
+
+@pytest.mark.asyncio
+async def test_run_booking_cycle_runs_deadline_steps_when_booking_fails(
+    configured_jobs, session_factory, test_engine
+):
+    now = datetime(2026, 3, 23, 17, 0, 0)
+    booked_pending = make_gym_class(
+        booking_id="b-pending",
+        activity_id=2,
+        day=date(2026, 3, 23),
+        start=datetime(2026, 3, 23, 19, 0).time(),
+        end=datetime(2026, 3, 23, 20, 0).time(),
+        participation_id="pid-pending",
+    )
+    available = make_gym_class(
+        booking_id="b-single",
+        activity_id=4,
+        day=date(2026, 3, 24),
+        start=datetime(2026, 3, 24, 18, 0).time(),
+        end=datetime(2026, 3, 24, 19, 0).time(),
+        participation_id=None,
+    )
+    client = FailingBookingClient([booked_pending, available])
+    context = FakeContext(client)
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(BotState(id=1, is_active=True))
+        session.add(
+            ManagedBooking(
+                booking_id="b-pending",
+                activity_id=2,
+                payment_type="membership",
+                participation_id="pid-pending",
+                class_title="Body Pump",
+                class_location="Main Hall",
+                class_datetime=now + timedelta(hours=2),
+                status=BookingStatus.PENDING,
+            )
+        )
+        session.commit()
+
+    with time_machine.travel(now, tick=False), pytest.raises(RuntimeError, match="unexpected booking"):
+        await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    with session_factory() as session:
+        pending = session.exec(select(ManagedBooking).where(ManagedBooking.booking_id == "b-pending")).one()
+
+    assert client.book_by_ids_calls == [("b-single", 4, "membership")]
+    assert pending.status == BookingStatus.CANCELLED
+    assert client.unbook_calls == ["pid-pending"]
+    texts = [call["text"] for call in context.bot.calls]
+    assert texts[0].startswith("Reminder: you have a pending booking coming up.")
+    assert texts[1:] == ["Pending booking was cancelled 3h before class time."]
@@ -1,13 +1,17 @@
+import asyncio
 from datetime import date, datetime, time, timedelta
 from typing import cast
 
 import pytest
+from puregym_mcp.puregym.models import BookClassResult
+from sqlalchemy import event
 from sqlmodel import Session, select
 
 from puregym_bot.bot import booking_cycle
 from puregym_bot.bot.callback_data import BookingCallback, BookingCallbackAction
 from puregym_mcp.puregym.client import PureGymClient
 from puregym_bot.storage.models import BookingChoice, BookingStatus, BotState, ManagedBooking
+from puregym_bot.storage.repository import upsert_managed_bookings
 from tests.fakes import FakePureGymClient, make_gym_class
 
 
@@ -97,6 +101,76 @@ def test_import_untracked_bookings_creates_pending_and_prompt(configured_jobs, t
         )
 
 
+def test_import_untracked_bookings_skips_tracked_participations_with_one_lookup(configured_jobs, test_engine):
+    day = date(2026, 3, 23)
+    booked = {
+        f"pid-{index}": make_gym_class(
+            booking_id=f"b-{index}",
+            activity_id=index,
+            day=day,
+            start=time(17 + index, 0),
+            end=time(18 + index, 0),
+            participation_id=f"pid-{index}",
+        )
+        for index in range(4)
+    }
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(
+            ManagedBooking(
+                booking_id="b-0",
+                activity_id=0,
+                payment_type="membership",
+                participation_id="pid-0",
+                class_title="Body Pump",
+                class_location="Center 1",
+                class_datetime=datetime(2026, 3, 23, 17, 0),
+                status=BookingStatus.CONFIRMED,
+            )
+        )
+        session.commit()
+
+    statements: list[str] = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        result = booking_cycle.import_untracked_bookings(session, booked)
+        import_statements = [statement for statement in statements if "managedbooking" in statement.lower()]
+        rows = session.exec(select(ManagedBooking)).all()
+
+    assert [prompt.booking.participation_id for prompt in result.prompts if prompt.booking] == [
+        "pid-1",
+        "pid-2",
+        "pid-3",
+    ]
+    assert sorted(booking.participation_id for booking in rows) == ["pid-0", "pid-1", "pid-2", "pid-3"]
+    # One lookup, one multi-row upsert and one reload, regardless of how many classes are booked.
+    assert len(import_statements) == 3
+
+
+def test_upsert_managed_bookings_ignores_existing_participation_ids(configured_jobs, test_engine):
+    def booking(participation_id: str) -> ManagedBooking:
+        return ManagedBooking(
+            booking_id=f"b-{participation_id}",
+            activity_id=1,
+            payment_type="membership",
+            participation_id=participation_id,
+            class_title="Body Pump",
+            class_location="Center 1",
+            class_datetime=datetime(2026, 3, 23, 18, 0),
+        )
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        assert [row.participation_id for row in upsert_managed_bookings(session, [booking("pid-a")])] == [
+            "pid-a"
+        ]
+        inserted = upsert_managed_bookings(session, [booking("pid-a"), booking("pid-b")])
+        session.commit()
+
+        assert [row.participation_id for row in inserted] == ["pid-b"]
+        assert inserted[0].status == BookingStatus.PENDING
+        assert len(session.exec(select(ManagedBooking)).all()) == 2
+
+
 def test_detect_booking_state_mismatch_warns_and_prompts(configured_jobs, test_engine, caplog):
     now = datetime(2026, 3, 20, 18, 0, 0)
     gym_class = make_gym_class(
@@ -450,3 +524,144 @@ async def test_auto_cancel_stale_pending_bookings(configured_jobs, test_engine):
         assert refreshed_future is not None
         assert refreshed_stale.status == BookingStatus.CANCELLED
         assert refreshed_future.status == BookingStatus.PENDING
+
+
+class SlowPureGymClient(FakePureGymClient):
+    def __init__(self, classes, delays: dict[str, float]):
+        super().__init__(classes)
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(booking_id, 0))
+            return await super().book_by_ids(booking_id, activity_id, payment_type)
+        finally:
+            self.in_flight -= 1
+
+
+def make_single_slot_classes(count: int) -> list:
+    start_day = date(2026, 3, 23)
+    classes = []
+    for week in range(count):
+        classes.append(
+            make_gym_class(
+                booking_id=f"b-week-{week}",
+                activity_id=50 + week,
+                day=start_day + timedelta(weeks=week),
+                start=time(18, 0),
+                end=time(19, 0),
+                participation_id=None,
+            )
+        )
+    return classes
+
+
+@pytest.mark.asyncio
+async def test_handle_slot_booking_actions_books_concurrently_in_slot_order(
+    configured_jobs, test_engine, test_config
+):
+    test_config.booking_concurrency = 3
+    classes = make_single_slot_classes(4)
+    grouped = booking_cycle.group_by_slot(classes, test_config.class_preferences.available_time_slots)
+    # Earlier slots finish last, prompts must still follow slot order.
+    client = SlowPureGymClient([], delays={"b-week-0": 0.03, "b-week-1": 0.02, "b-week-2": 0.01})
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        result = await booking_cycle.handle_slot_booking_actions(
+            session,
+            cast(PureGymClient, client),
+            grouped,
+            active_count=0,
+        )
+
+    assert client.max_in_flight == 3
+    assert [prompt.booking.booking_id for prompt in result.prompts if prompt.booking] == [
+        "b-week-0",
+        "b-week-1",
+        "b-week-2",
+        "b-week-3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_slot_booking_actions_keeps_bookings_finished_before_the_timeout(
+    configured_jobs, test_engine, test_config
+):
+    test_config.booking_concurrency = 2
+    classes = make_single_slot_classes(2)
+    grouped = booking_cycle.group_by_slot(classes, test_config.class_preferences.available_time_slots)
+    client = SlowPureGymClient([], delays={"b-week-1": 10})
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        result = await booking_cycle.handle_slot_booking_actions(
+            session,
+            cast(PureGymClient, client),
+            grouped,
+            active_count=0,
+            timeout=0.05,
+        )
+        all_bookings = list(session.exec(select(ManagedBooking)).all())
+
+    assert client.in_flight == 0
+    assert [booking.booking_id for booking in all_bookings] == ["b-week-0"]
+    assert [prompt.booking.booking_id for prompt in result.prompts if prompt.booking] == ["b-week-0"]
+    assert {slot.date for slot in result.unresolved_slots} == {"2026-03-30"}
+
+
+@pytest.mark.asyncio
+async def test_handle_slot_booking_actions_concurrent_mode_respects_max_bookings(
+    configured_jobs, test_engine, test_config
+):
+    test_config.booking_concurrency = 4
+    test_config.max_bookings = 3
+    classes = make_single_slot_classes(4)
+    grouped = booking_cycle.group_by_slot(classes, test_config.class_preferences.available_time_slots)
+    client = SlowPureGymClient([], delays={})
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        result = await booking_cycle.handle_slot_booking_actions(
+            session,
+            cast(PureGymClient, client),
+            grouped,
+            active_count=1,
+        )
+        all_bookings = list(session.exec(select(ManagedBooking)).all())
+
+    assert [call[0] for call in client.book_by_ids_calls] == ["b-week-0", "b-week-1"]
+    assert len(all_bookings) == 2
+    assert len(result.prompts) == 2
+    assert {slot.date for slot in result.unresolved_slots} == {"2026-04-06", "2026-04-13"}
+
+
+@pytest.mark.asyncio
+async def test_handle_slot_booking_actions_reuses_budget_released_by_failed_booking(
+    configured_jobs, test_engine, test_config
+):
+    test_config.booking_concurrency = 2
+    test_config.max_bookings = 1
+    classes = make_single_slot_classes(2)
+    grouped = booking_cycle.group_by_slot(classes, test_config.class_preferences.available_time_slots)
+
+    class FirstFailsClient(FakePureGymClient):
+        async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str):
+            self.book_by_ids_calls.append((booking_id, activity_id, payment_type))
+            await asyncio.sleep(0.01)
+            if booking_id == "b-week-0":
+                return BookClassResult(status="error")
+            return BookClassResult(status="success", participation_id=f"p-{booking_id}")
+
+    client = FirstFailsClient([])
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        result = await booking_cycle.handle_slot_booking_actions(
+            session,
+            cast(PureGymClient, client),
+            grouped,
+            active_count=0,
+        )
+
+    assert [prompt.booking.booking_id for prompt in result.prompts if prompt.booking] == ["b-week-1"]
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from puregym_mcp.puregym.models import CancelBookingResult
+from sqlmodel import Session
+
+from puregym_bot.bot.booking_cycle import handle_due_deadlines
+from puregym_bot.bot.booking_deadlines import (
+    DeadlineKind,
+    DeadlineQueue,
+    DeadlineTimer,
+    start_deadline_timer,
+    stop_deadline_timer,
+    track_booking_deadlines,
+)
+from puregym_bot.bot.booking_state import BookingState
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+from tests.fakes import FakePureGymClient
+
+NOW = datetime(2026, 3, 20, 12, 0)
+
+
+def make_booking(booking_id: int, class_datetime: datetime, status: BookingStatus) -> ManagedBooking:
+    return ManagedBooking(
+        id=booking_id,
+        booking_id=f"b-{booking_id}",
+        activity_id=1,
+        payment_type="membership",
+        participation_id=f"pid-{booking_id}",
+        class_title="Body Pump",
+        class_location="Main Hall",
+        class_datetime=class_datetime,
+        status=status,
+    )
+
+
+class RefusingPureGymClient(FakePureGymClient):
+    async def unbook_participation(self, participation_id: str) -> CancelBookingResult:
+        self.unbook_calls.append(participation_id)
+        return CancelBookingResult(status="error")
+
+
+def test_queue_orders_deadlines_and_drops_superseded_entries():
+    pending = make_booking(1, NOW + timedelta(hours=5), BookingStatus.PENDING)
+    confirmed = make_booking(2, NOW + timedelta(hours=20), BookingStatus.CONFIRMED)
+    queue = DeadlineQueue.from_bookings([pending, confirmed], reminder_hours=24, auto_cancel_hours=3)
+
+    assert len(queue) == 3
+    assert queue.next_due() == NOW - timedelta(hours=19)
+
+    pending.status = BookingStatus.CONFIRMED
+    pending.reminder_sent = True
+    queue.track([pending])
+
+    assert len(queue) == 1
+    assert queue.pop_due(NOW - timedelta(hours=5)) == []
+    assert queue.pop_due(NOW) == [(2, DeadlineKind.REMINDER)]
+    assert queue.next_due() is None
+
+
+def test_queue_compacts_when_superseded_entries_pile_up():
+    booking = make_booking(1, NOW + timedelta(days=2), BookingStatus.CONFIRMED)
+    queue = DeadlineQueue(reminder_hours=24, auto_cancel_hours=3)
+
+    for _ in range(100):
+        queue.track([booking])
+
+    assert len(queue) == 1
+    assert len(queue.heap) <= 2 * len(queue) + 32
+
+
+@pytest.mark.asyncio
+async def test_handle_due_deadlines_sends_reminders_and_auto_cancels(configured_jobs, test_engine):
+    with Session(test_engine, expire_on_commit=False) as session:
+        soon = make_booking(1, NOW + timedelta(hours=2), BookingStatus.PENDING)
+        later = make_booking(2, NOW + timedelta(hours=20), BookingStatus.CONFIRMED)
+        future = make_booking(3, NOW + timedelta(days=3), BookingStatus.CONFIRMED)
+        session.add_all([soon, later, future])
+        session.commit()
+        state = BookingState.load(session)
+        queue = DeadlineQueue.from_bookings(state.active(), reminder_hours=24, auto_cancel_hours=3)
+        client = FakePureGymClient([])
+
+        result = await handle_due_deadlines(session, client, queue, NOW, state)
+
+        assert client.unbook_calls == ["pid-1"]
+        assert soon.status == BookingStatus.CANCELLED
+        assert later.reminder_sent is True
+        assert future.reminder_sent is False
+        assert len(result.prompts) == 3
+        assert queue.next_due() == future.class_datetime - timedelta(hours=24)
+
+
+@pytest.mark.asyncio
+async def test_handle_due_deadlines_retries_refused_auto_cancel(configured_jobs, test_engine):
+    with Session(test_engine, expire_on_commit=False) as session:
+        booking = make_booking(1, NOW + timedelta(hours=2), BookingStatus.PENDING)
+        booking.reminder_sent = True
+        session.add(booking)
+        session.commit()
+        state = BookingState.load(session)
+        queue = DeadlineQueue.from_bookings(state.active(), reminder_hours=24, auto_cancel_hours=3)
+
+        result = await handle_due_deadlines(session, RefusingPureGymClient([]), queue, NOW, state)
+
+    assert result.prompts == []
+    assert booking.status == BookingStatus.PENDING
+    assert queue.next_due() == NOW + timedelta(seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_timer_fires_when_a_tracked_booking_becomes_due():
+    bot_data: dict = {}
+    queue = DeadlineQueue(reminder_hours=24, auto_cancel_hours=3)
+    bot_data["booking_deadlines"] = queue
+    fired = asyncio.Event()
+
+    async def fire() -> None:
+        queue.pop_due(datetime.max)
+        fired.set()
+
+    timer = start_deadline_timer(bot_data, queue, fire, retry_seconds=60)
+    try:
+        await asyncio.sleep(0)
+        assert timer.seconds_until_next() is None
+
+        booking = make_booking(1, datetime.now() + timedelta(hours=2), BookingStatus.CONFIRMED)
+        track_booking_deadlines(bot_data, [booking])
+        await asyncio.wait_for(fired.wait(), timeout=1)
+    finally:
+        await stop_deadline_timer(bot_data)
+
+    assert isinstance(timer, DeadlineTimer)
+    assert "booking_deadline_timer" not in bot_data
@@ -0,0 +1,115 @@
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+import time_machine
+from sqlalchemy import event
+from sqlmodel import Session
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import run_booking_cycle
+from puregym_bot.bot.booking_state import BookingState, booking_state_version, mark_bookings_changed
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+
+def add_booking(
+    session, participation_id: str, class_datetime: datetime, status: BookingStatus
+) -> ManagedBooking:
+    booking = ManagedBooking(
+        booking_id=f"b-{participation_id}",
+        activity_id=1,
+        payment_type="membership",
+        participation_id=participation_id,
+        class_title="Body Pump",
+        class_location="Center 1",
+        class_datetime=class_datetime,
+        status=status,
+    )
+    session.add(booking)
+    return booking
+
+
+def test_booking_state_indexes_follow_status_changes(test_engine):
+    with Session(test_engine, expire_on_commit=False) as session:
+        late = add_booking(session, "pid-late", datetime(2026, 3, 24, 18, 0), BookingStatus.PENDING)
+        soon = add_booking(session, "pid-soon", datetime(2026, 3, 23, 18, 0), BookingStatus.CONFIRMED)
+        add_booking(session, "pid-old", datetime(2026, 3, 20, 18, 0), BookingStatus.ATTENDED)
+        session.commit()
+
+        state = BookingState.load(session)
+        assert state.active_count == 2
+        assert state.participation_ids() == {"pid-late", "pid-soon"}
+        assert state.starting_before(datetime(2026, 3, 23, 18, 0)) == [soon]
+        assert state.starting_before(datetime(2026, 3, 25), status=BookingStatus.PENDING) == [late]
+
+        state.set_status(session, late, BookingStatus.CANCELLED)
+
+        assert state.active() == [soon]
+        assert state.starting_before(datetime(2026, 3, 25), status=BookingStatus.PENDING) == []
+        assert late.status == BookingStatus.CANCELLED
+
+
+def test_booking_state_reloads_after_external_change(test_engine, session_factory):
+    bot_data: dict = {}
+    with Session(test_engine, expire_on_commit=False) as session:
+        add_booking(session, "pid-1", datetime(2026, 3, 23, 18, 0), BookingStatus.PENDING)
+        session.commit()
+
+        state = BookingState.load(session, booking_state_version(bot_data))
+        assert state.refresh_if_stale(session, bot_data) is False
+
+        with session_factory() as other:
+            booking = other.get(ManagedBooking, state.active()[0].id)
+            assert booking is not None
+            booking.status = BookingStatus.CONFIRMED
+            other.add(booking)
+            other.commit()
+        mark_bookings_changed(bot_data)
+
+        assert state.refresh_if_stale(session, bot_data) is True
+        assert state.starting_before(datetime(2026, 3, 24), status=BookingStatus.PENDING) == []
+        assert state.active()[0].status == BookingStatus.CONFIRMED
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_loads_active_bookings_once(configured_jobs, activate_bot, test_engine):
+    with Session(test_engine, expire_on_commit=False) as session:
+        add_booking(session, "pid-tracked", datetime(2026, 3, 23, 18, 0), BookingStatus.PENDING)
+        add_booking(session, "pid-gone", datetime(2026, 3, 24, 18, 0), BookingStatus.CONFIRMED)
+        session.commit()
+
+    classes = [
+        make_gym_class(
+            booking_id="b-pid-tracked",
+            activity_id=1,
+            day=date(2026, 3, 23),
+            start=time(18, 0),
+            end=time(19, 0),
+            participation_id="pid-tracked",
+        ),
+        make_gym_class(
+            booking_id="b-open",
+            activity_id=2,
+            day=date(2026, 3, 30),
+            start=time(18, 0),
+            end=time(19, 0),
+            participation_id=None,
+        ),
+    ]
+    statements: list[str] = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    context = FakeContext(FakePureGymClient(classes))
+    with time_machine.travel(datetime(2026, 3, 22, 20, 0, tzinfo=APP_TIMEZONE), tick=False):
+        await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    active_queries = [
+        statement
+        for statement in statements
+        if statement.lstrip().upper().startswith("SELECT")
+        and statement.endswith("managedbooking.status IN (?, ?)")
+    ]
+    assert len(active_queries) == 1
+    assert len(context.bot.calls) == 3
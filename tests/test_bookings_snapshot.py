@@ -0,0 +1,128 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+import time_machine
+from puregym_mcp.puregym.client import PureGymClient
+from sqlmodel import Session
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import invalidate_class_cache, run_booking_cycle
+from puregym_bot.bot.bookings_snapshot import BookingsSnapshotCache, get_bookings_snapshot_cache
+from puregym_bot.bot.dependencies import HandlerContext
+from puregym_bot.bot.handlers import booked_classes, manage_bookings
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BotState
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+MAX_AGE = timedelta(minutes=15)
+STALE_AGE = timedelta(hours=1)
+
+
+class CountingClient(FakePureGymClient):
+    def __init__(self, classes):
+        super().__init__(classes)
+        self.my_bookings_calls = 0
+
+    async def get_my_bookings(self):
+        self.my_bookings_calls += 1
+        return await super().get_my_bookings()
+
+
+def booked_class():
+    return make_gym_class(
+        booking_id="b-1",
+        activity_id=1,
+        day=date(2026, 3, 23),
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id="pid-1",
+    )
+
+
+def make_update():
+    return cast(
+        Update, SimpleNamespace(effective_user=SimpleNamespace(id=1), effective_chat=SimpleNamespace(id=1))
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_fetched_live_then_served_fresh_then_stale_while_revalidating():
+    client = CountingClient([booked_class()])
+    cache = BookingsSnapshotCache()
+
+    with time_machine.travel(NOW, tick=False):
+        live = await cache.read(cast(PureGymClient, client), MAX_AGE, STALE_AGE)
+    with time_machine.travel(NOW + MAX_AGE, tick=False):
+        fresh = await cache.read(cast(PureGymClient, client), MAX_AGE, STALE_AGE)
+    with time_machine.travel(NOW + STALE_AGE, tick=False):
+        stale = await cache.read(cast(PureGymClient, client), MAX_AGE, STALE_AGE)
+        await asyncio.sleep(0)
+        revalidated = cache.snapshot
+
+    assert live.cached is False
+    assert fresh.cached is True and fresh.taken_at == live.taken_at
+    assert stale.taken_at == live.taken_at
+    assert revalidated is not None and revalidated.taken_at == (NOW + STALE_AGE).replace(tzinfo=None)
+    assert client.my_bookings_calls == 2
+
+    invalidate_class_cache({"bookings_snapshot": cache})
+    assert cache.snapshot is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_started_before_invalidation_is_not_published():
+    release = asyncio.Event()
+
+    class SlowClient(CountingClient):
+        async def get_my_bookings(self):
+            await release.wait()
+            return await super().get_my_bookings()
+
+    client = SlowClient([booked_class()])
+    cache = BookingsSnapshotCache()
+
+    with time_machine.travel(NOW, tick=False):
+        fetch = asyncio.create_task(cache.fetch(cast(PureGymClient, client)))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        release.set()
+        result = await fetch
+
+    assert [gym_class.booking_id for gym_class in result.bookings] == ["b-1"]
+    assert cache.snapshot is None
+
+
+@pytest.mark.asyncio
+async def test_commands_answer_from_the_cycle_snapshot_with_its_age(
+    configured_jobs, session_factory, test_engine
+):
+    with session_factory() as session:
+        session.add(BotState(id=1, is_active=True))
+        session.commit()
+    client = CountingClient([booked_class()])
+    context = cast(ContextTypes.DEFAULT_TYPE, FakeContext(client))
+
+    with time_machine.travel(NOW, tick=False):
+        await run_booking_cycle(context)
+    published = get_bookings_snapshot_cache(context.bot_data).snapshot
+    assert published is not None
+    assert client.my_bookings_calls == 1
+
+    context.bot.calls.clear()
+    with (
+        time_machine.travel(NOW + timedelta(minutes=5), tick=False),
+        Session(test_engine, expire_on_commit=False) as session,
+    ):
+        handler_ctx = HandlerContext(session=session, client=cast(PureGymClient, client), bot_active=True)
+        await booked_classes(make_update(), context, handler_ctx)
+        await manage_bookings(make_update(), context, handler_ctx)
+
+    assert client.my_bookings_calls == 1
+    texts = [call["text"] for call in context.bot.calls]
+    assert texts[0].startswith("Your upcoming bookings (as of 5 min ago):\n")
+    assert texts[1] == "1 pending booking to review. Bookings as of 5 min ago."
@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+from datetime import date, datetime, time
+
+import httpx
+import pytest
+import time_machine
+
+from puregym_bot import cassette
+from puregym_bot.bot import dependencies
+from puregym_bot.cassette import (
+    CassetteMiss,
+    CassetteRecorder,
+    CassetteReplayClient,
+    load_cassette,
+)
+from puregym_bot.circuit_breaker import is_outage
+from puregym_bot.config import CassetteMode
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from tests.fakes import FakePureGymClient, make_gym_class
+
+
+class FlakyPureGymClient(FakePureGymClient):
+    closed = False
+
+    async def get_my_bookings(self):
+        raise ConnectionError("https://user@example.com:hunter2@puregym.dk/bookings timed out")
+
+    async def aclose(self):
+        self.closed = True
+
+
+def gym_class():
+    return make_gym_class(
+        booking_id="b-1",
+        activity_id=1,
+        day=date(2026, 3, 23),
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_recorded_traffic_replays_with_credentials_redacted(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    client = FlakyPureGymClient([gym_class()])
+    recorder = CassetteRecorder(client, path, secrets=("user@example.com", "hunter2"))
+
+    classes = await recorder.get_available_classes(class_ids=[1], center_ids=[1])
+    booked = await recorder.book_by_ids("b-1", 1, "membership")
+    with pytest.raises(ConnectionError):
+        await recorder.get_my_bookings()
+    await recorder.aclose()
+
+    raw = gzip.decompress(path.read_bytes()).decode()
+    assert "hunter2" not in raw and "user@example.com" not in raw
+    assert client.closed is True
+    assert [entry["method"] for entry in load_cassette(path)] == [
+        "get_available_classes",
+        "book_by_ids",
+        "get_my_bookings",
+    ]
+
+    replay = CassetteReplayClient(load_cassette(path), time_scale=0)
+    assert await replay.get_available_classes(class_ids=[1], center_ids=[1]) == classes
+    assert await replay.book_by_ids(booking_id="b-1", activity_id=1, payment_type="membership") == booked
+    with pytest.raises(ConnectionError, match=r"\[redacted\]"):
+        await replay.get_my_bookings()
+    with pytest.raises(CassetteMiss):
+        await replay.get_available_classes(class_ids=[2], center_ids=[1])
+
+
+class OutagePureGymClient(FakePureGymClient):
+    async def get_my_bookings(self):
+        request = httpx.Request("GET", "https://puregym.dk/bookings")
+        response = httpx.Response(503, request=request)
+        raise httpx.HTTPStatusError("Service Unavailable", request=request, response=response)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_replay_on_a_later_day_shifts_dates_and_keeps_outages(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    recorder = CassetteRecorder(OutagePureGymClient([gym_class()]), path)
+    with time_machine.travel(datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE), tick=False):
+        classes = await recorder.get_available_classes(from_date="2026-03-20", to_date="2026-03-27")
+        with pytest.raises(httpx.HTTPStatusError):
+            await recorder.get_my_bookings()
+    await recorder.aclose()
+
+    replay = CassetteReplayClient(load_cassette(path), time_scale=0)
+    with time_machine.travel(datetime(2026, 4, 2, 12, 0, tzinfo=APP_TIMEZONE), tick=False):
+        assert await replay.get_available_classes(from_date="2026-04-02", to_date="2026-04-09") == classes
+        with pytest.raises(CassetteMiss):
+            await replay.get_available_classes(from_date="2026-03-20", to_date="2026-03-27")
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await replay.get_my_bookings()
+    assert excinfo.value.response.status_code == 503
+    assert is_outage(excinfo.value)
+
+
+class HangingPureGymClient(FakePureGymClient):
+    async def get_my_bookings(self):
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_recorded_and_replays_as_a_call_that_never_answers(tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    recorder = CassetteRecorder(HangingPureGymClient([gym_class()]), path)
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            await recorder.get_my_bookings()
+    await recorder.aclose()
+
+    [entry] = load_cassette(path)
+    assert entry["cancelled"] is True and "response" not in entry and "error" not in entry
+
+    replay = CassetteReplayClient([entry], time_scale=0)
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            await replay.get_my_bookings()
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_calls_in_order_with_scaled_latency(monkeypatch):
+    delays: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        delays.append(seconds)
+
+    monkeypatch.setattr(cassette.asyncio, "sleep", fake_sleep)
+    args = {"participation_id": "pid-1"}
+    replay = CassetteReplayClient(
+        [
+            {"method": "unbook_participation", "args": args, "seconds": 0.2, "response": {"status": "error"}},
+            {
+                "method": "unbook_participation",
+                "args": args,
+                "seconds": 0.4,
+                "response": {"status": "success"},
+            },
+        ],
+        time_scale=0.5,
+    )
+
+    statuses = [(await replay.unbook_participation("pid-1")).status for _ in range(3)]
+
+    assert statuses == ["error", "success", "success"]
+    assert delays == [0.1, 0.2, 0.2]
+
+
+def test_replay_mode_builds_client_without_network(configured_jobs, test_config, tmp_path):
+    path = tmp_path / "cassette.jsonl.gz"
+    path.write_bytes(gzip.compress(b""))
+    test_config.puregym_cassette_mode = CassetteMode.REPLAY
+    test_config.puregym_cassette_path = path
+
+    assert isinstance(dependencies.build_puregym_client(), CassetteReplayClient)
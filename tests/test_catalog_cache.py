@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+import time_machine
+from puregym_mcp.puregym.client import PureGymClient
+from puregym_mcp.puregym.models import CenterGroup, GymClassTypesGroup
+from sqlmodel import Session
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import handlers
+from puregym_bot.bot.catalog_cache import (
+    CATALOG_CACHE_KEY,
+    CatalogCache,
+    CatalogKind,
+    start_catalog_cache,
+    stop_catalog_cache,
+)
+from puregym_bot.bot.dependencies import HandlerContext
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from tests.fakes import FakeBot
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+TTL = timedelta(hours=168)
+
+
+class CatalogClient:
+    def __init__(self):
+        self.calls: list[str] = []
+        self.class_type_title = "Strength"
+
+    async def get_all_class_types(self):
+        self.calls.append("get_all_class_types")
+        return [
+            GymClassTypesGroup.model_validate(
+                {
+                    "title": self.class_type_title,
+                    "options": [{"label": "Body Pump", "value": 1, "type": "class"}],
+                }
+            )
+        ]
+
+    async def get_all_centers(self):
+        self.calls.append("get_all_centers")
+        return [
+            CenterGroup.model_validate(
+                {
+                    "label": "Copenhagen",
+                    "weight": 1,
+                    "options": [{"label": "Center 1", "value": 1, "type": "c"}],
+                }
+            )
+        ]
+
+
+class HtmlBot(FakeBot):
+    async def send_message(self, *, chat_id: int, text: str, reply_markup=None, parse_mode=None):
+        return await super().send_message(chat_id=chat_id, text=text, reply_markup=reply_markup)
+
+
+@pytest.mark.asyncio
+async def test_catalogs_persist_and_survive_a_restart(tmp_path):
+    client = CatalogClient()
+    with time_machine.travel(NOW, tick=False):
+        first = await CatalogCache(cast(PureGymClient, client), tmp_path, TTL).get(CatalogKind.CLASS_TYPES)
+
+        restarted = CatalogCache(cast(PureGymClient, client), tmp_path, TTL)
+        restarted.load()
+        cached = await restarted.get(CatalogKind.CLASS_TYPES)
+
+    assert client.calls == ["get_all_class_types"]
+    assert cached.version == first.version
+    assert cached.html == first.html
+    assert cached.html.startswith("🏋 <b>Available Class Types</b>\n")
+    assert "<code>1</code>" in cached.html
+    assert (tmp_path / "class_types.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_stale_catalog_is_served_while_refreshing_in_background(tmp_path):
+    client = CatalogClient()
+    cache = CatalogCache(cast(PureGymClient, client), tmp_path, TTL)
+    with time_machine.travel(NOW, tick=False):
+        original = await cache.get(CatalogKind.CLASS_TYPES)
+
+    client.class_type_title = "Cardio"
+    with time_machine.travel(NOW + TTL, tick=False):
+        served = await cache.get(CatalogKind.CLASS_TYPES)
+        await asyncio.gather(*cache._refreshing.values())
+        refreshed = await cache.get(CatalogKind.CLASS_TYPES)
+
+    assert served is original
+    assert refreshed.version != original.version
+    assert "<b>Cardio</b>" in refreshed.html
+    assert client.calls == ["get_all_class_types", "get_all_class_types"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_commands_answer_from_the_cache(configured_jobs, tmp_path):
+    client = CatalogClient()
+    bot_data: dict = {}
+    context = cast(ContextTypes.DEFAULT_TYPE, SimpleNamespace(bot=HtmlBot(), bot_data=bot_data))
+    update = cast(Update, SimpleNamespace(effective_chat=SimpleNamespace(id=1)))
+    ctx = HandlerContext(session=cast(Session, None), client=cast(PureGymClient, client), bot_active=True)
+
+    start_catalog_cache(bot_data, cast(PureGymClient, client), tmp_path, TTL)
+    try:
+        for _ in range(3):
+            await handlers.all_center_ids(update, context, ctx)
+            await handlers.all_class_ids(update, context, ctx)
+    finally:
+        await stop_catalog_cache(bot_data)
+
+    assert sorted(client.calls) == ["get_all_centers", "get_all_class_types"]
+    texts = [call["text"] for call in cast(HtmlBot, context.bot).calls]
+    assert texts[0].startswith("🏢 <b>Available Centers</b>\n")
+    assert texts[1].startswith("🏋 <b>Available Class Types</b>\n")
+    assert CATALOG_CACHE_KEY not in bot_data
@@ -0,0 +1,187 @@
+import random
+from datetime import date, datetime, time, timedelta
+from typing import cast
+
+import httpx
+import pytest
+import time_machine
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import run_booking_cycle
+from puregym_bot.circuit_breaker import (
+    CIRCUIT_BREAKER_KEY,
+    BreakerState,
+    CircuitBreakerClient,
+    CircuitOpenError,
+    format_circuit_status,
+)
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BookingStatus, BotState, ManagedBooking
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LongestJitter:
+    def uniform(self, low: float, high: float) -> float:
+        return high
+
+
+def http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://puregym.test")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=response)
+
+
+class FlakyClient(FakePureGymClient):
+    def __init__(self):
+        super().__init__([])
+        self.errors: list[Exception] = []
+        self.fetch_calls = 0
+
+    async def get_available_classes(self, **kwargs):
+        self.fetch_calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return await super().get_available_classes(**kwargs)
+
+
+def make_breaker(client: FlakyClient, clock: FakeClock) -> CircuitBreakerClient:
+    return CircuitBreakerClient(client, 3, 30.0, 900.0, clock=clock, rng=cast(random.Random, LongestJitter()))
+
+
+async def fail_fetch(breaker: CircuitBreakerClient, error: Exception, client: FlakyClient) -> None:
+    client.errors.append(error)
+    with pytest.raises(type(error)):
+        await breaker.get_available_classes()
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_outages_and_backs_off_exponentially():
+    client = FlakyClient()
+    clock = FakeClock()
+    breaker = make_breaker(client, clock)
+
+    for _ in range(3):
+        await fail_fetch(breaker, httpx.ConnectTimeout("timed out"), client)
+    circuit = breaker.circuit("get_available_classes")
+    assert circuit.state == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.get_available_classes()
+    assert client.fetch_calls == 3
+    assert breaker.available("get_my_bookings")
+
+    clock.now = 30.0
+    await fail_fetch(breaker, http_error(503), client)
+    assert circuit.state == BreakerState.OPEN
+    assert circuit.retry_in(clock.now) == 60.0
+
+    clock.now = 90.0
+    assert await breaker.get_available_classes() == []
+    assert circuit.state == BreakerState.CLOSED
+    assert circuit.openings == 0
+    assert format_circuit_status(breaker) == "PureGym API is healthy."
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_count_as_outages():
+    client = FlakyClient()
+    breaker = make_breaker(client, FakeClock())
+
+    for _ in range(5):
+        await fail_fetch(breaker, http_error(404), client)
+
+    assert breaker.circuit("get_available_classes").state == BreakerState.CLOSED
+    assert breaker.open_circuits() == {}
+
+
+class BookingOutageClient(FakePureGymClient):
+    async def book_by_ids(self, booking_id: str, activity_id: int, payment_type: str):
+        self.book_by_ids_calls.append((booking_id, activity_id, payment_type))
+        raise httpx.ConnectError("refused")
+
+
+def add_booking_due_for_reminder(session_factory, class_datetime: datetime) -> None:
+    with session_factory() as session:
+        session.add(BotState(id=1, is_active=True))
+        session.add(
+            ManagedBooking(
+                booking_id="b-1",
+                activity_id=1,
+                payment_type="membership",
+                participation_id="pid-1",
+                class_title="Body Pump",
+                class_location="Main Hall",
+                class_datetime=class_datetime,
+                status=BookingStatus.CONFIRMED,
+            )
+        )
+        session.commit()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_degrades_the_cycle_to_reminders(configured_jobs, session_factory):
+    add_booking_due_for_reminder(session_factory, (NOW + timedelta(hours=5)).replace(tzinfo=None))
+    client = FlakyClient()
+    clock = FakeClock()
+    breaker = make_breaker(client, clock)
+    context = cast(ContextTypes.DEFAULT_TYPE, FakeContext(breaker))
+    context.bot_data[CIRCUIT_BREAKER_KEY] = breaker
+    for _ in range(3):
+        await fail_fetch(breaker, httpx.ConnectError("refused"), client)
+
+    with time_machine.travel(NOW, tick=False):
+        report = await run_booking_cycle(context)
+
+    assert report.degraded
+    assert client.fetch_calls == 3
+    texts = [call["text"] for call in context.bot.calls]
+    assert len(texts) == 1 and texts[0].startswith("Reminder: your class is coming up soon.")
+    assert format_circuit_status(breaker) == (
+        "PureGym API is degraded:\n- get_available_classes: open after 3 failure(s), retry in 30s"
+    )
+
+
+@pytest.mark.asyncio
+async def test_booking_outage_leaves_the_slot_for_later_and_still_sends_reminders(
+    configured_jobs, session_factory
+):
+    sunday_evening = datetime(2026, 3, 22, 20, 0, tzinfo=APP_TIMEZONE)
+    add_booking_due_for_reminder(session_factory, datetime(2026, 3, 23, 18, 0))
+    booked = make_gym_class(
+        booking_id="b-1",
+        activity_id=1,
+        day=date(2026, 3, 23),
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id="pid-1",
+    )
+    bookable = make_gym_class(
+        booking_id="b-2",
+        activity_id=101,
+        day=date(2026, 3, 24),
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id=None,
+    )
+    client = BookingOutageClient([booked, bookable])
+    breaker = make_breaker(cast(FlakyClient, client), FakeClock())
+    context = cast(ContextTypes.DEFAULT_TYPE, FakeContext(breaker))
+    context.bot_data[CIRCUIT_BREAKER_KEY] = breaker
+
+    with time_machine.travel(sunday_evening, tick=False):
+        reports = [await run_booking_cycle(context) for _ in range(4)]
+
+    assert [report.unresolved_slots for report in reports[:3]] == [1, 1, 1]
+    assert reports[3].degraded
+    assert len(client.book_by_ids_calls) == 3
+    texts = [call["text"] for call in context.bot.calls]
+    assert len(texts) == 1 and texts[0].startswith("Reminder: your class is coming up soon.")
@@ -0,0 +1,317 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import cast
+
+import pytest
+import time_machine
+from puregym_mcp.puregym.client import PureGymClient
+from sqlmodel import Session, select
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import booking_cycle
+from puregym_bot.bot.booking_cycle import (
+    ClassTierCache,
+    FetchPartition,
+    HorizonTier,
+    build_fetch_partitions,
+    build_horizon_tiers,
+    fetch_candidate_classes,
+    invalidate_class_cache,
+)
+from puregym_bot.config import RefreshTier
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0)
+SATURDAY = datetime(2026, 3, 21, 12, 0)
+
+
+class PartitionedClient(FakePureGymClient):
+    def __init__(self, classes_by_center: dict[int, list], failing_centers: set[int] = frozenset()):
+        super().__init__([gym_class for classes in classes_by_center.values() for gym_class in classes])
+        self.classes_by_center = classes_by_center
+        self.failing_centers = failing_centers
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_available_classes(self, **kwargs):
+        self.requests.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            (center_id,) = kwargs["center_ids"]
+            if center_id in self.failing_centers:
+                raise RuntimeError(f"center {center_id} unavailable")
+            return [
+                gym_class
+                for gym_class in self.classes_by_center.get(center_id, [])
+                if kwargs["from_date"] <= gym_class.date <= kwargs["to_date"]
+            ]
+        finally:
+            self.in_flight -= 1
+
+
+def make_class(booking_id: str, day: date, participation_id: str | None = None):
+    return make_gym_class(
+        booking_id=booking_id,
+        activity_id=1,
+        day=day,
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id=participation_id,
+    )
+
+
+def test_build_fetch_partitions_splits_days_and_centers(configured_jobs, test_config):
+    test_config.class_preferences.interested_centers = [1, 2]
+    test_config.fetch_partition_by_center = True
+    test_config.fetch_partition_days = 10
+
+    partitions = build_fetch_partitions(date(2026, 3, 20), date(2026, 4, 17))
+
+    assert partitions == [
+        FetchPartition(from_date="2026-03-20", to_date="2026-03-29", center_ids=(1,)),
+        FetchPartition(from_date="2026-03-20", to_date="2026-03-29", center_ids=(2,)),
+        FetchPartition(from_date="2026-03-30", to_date="2026-04-08", center_ids=(1,)),
+        FetchPartition(from_date="2026-03-30", to_date="2026-04-08", center_ids=(2,)),
+        FetchPartition(from_date="2026-04-09", to_date="2026-04-17", center_ids=(1,)),
+        FetchPartition(from_date="2026-04-09", to_date="2026-04-17", center_ids=(2,)),
+    ]
+
+
+def test_build_fetch_partitions_defaults_to_whole_horizon(configured_jobs, test_config):
+    assert build_fetch_partitions(date(2026, 3, 20), date(2026, 4, 17)) == [
+        FetchPartition(from_date="2026-03-20", to_date="2026-04-17", center_ids=(1,))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_merges_partitions_under_concurrency_cap(configured_jobs, test_config):
+    test_config.class_preferences.interested_centers = [1, 2, 3]
+    test_config.fetch_partition_by_center = True
+    test_config.fetch_partition_days = 7
+    test_config.fetch_concurrency = 2
+    monday = date(2026, 3, 23)
+    client = PartitionedClient(
+        {
+            1: [make_class("b-late", monday + timedelta(weeks=2))],
+            2: [make_class("b-early", monday)],
+            3: [make_class("b-mid", monday + timedelta(weeks=1))],
+        }
+    )
+
+    result = await fetch_candidate_classes(cast(PureGymClient, client), NOW)
+
+    assert result.complete
+    assert [gym_class.booking_id for gym_class in result.classes] == ["b-early", "b-mid", "b-late"]
+    assert len(client.requests) == 15
+    assert client.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_keeps_partial_results(configured_jobs, test_config):
+    test_config.class_preferences.interested_centers = [1, 2]
+    test_config.fetch_partition_by_center = True
+    client = PartitionedClient(
+        {1: [make_class("b-ok", date(2026, 3, 23))], 2: [make_class("b-lost", date(2026, 3, 24))]},
+        failing_centers={2},
+    )
+
+    result = await fetch_candidate_classes(cast(PureGymClient, client), NOW)
+
+    assert [gym_class.booking_id for gym_class in result.classes] == ["b-ok"]
+    assert result.failed_partitions == [
+        FetchPartition(from_date="2026-03-20", to_date="2026-04-17", center_ids=(2,))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_raises_when_every_partition_fails(configured_jobs):
+    client = PartitionedClient({}, failing_centers={1})
+
+    with pytest.raises(RuntimeError, match="center 1 unavailable"):
+        await fetch_candidate_classes(cast(PureGymClient, client), NOW)
+
+
+class HungPartitionClient(PartitionedClient):
+    def __init__(self, classes_by_center: dict[int, list], hung_centers: set[int]):
+        super().__init__(classes_by_center)
+        self.hung_centers = hung_centers
+
+    async def get_available_classes(self, **kwargs):
+        if set(kwargs["center_ids"]) & self.hung_centers:
+            await asyncio.Event().wait()
+        return await super().get_available_classes(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_cuts_off_partitions_past_the_timeout(configured_jobs, test_config):
+    test_config.class_preferences.interested_centers = [1, 2]
+    test_config.fetch_partition_by_center = True
+    client = HungPartitionClient(
+        {1: [make_class("b-ok", date(2026, 3, 23))], 2: [make_class("b-slow", date(2026, 3, 24))]},
+        hung_centers={2},
+    )
+
+    result = await fetch_candidate_classes(cast(PureGymClient, client), NOW, timeout=0.1)
+
+    assert [gym_class.booking_id for gym_class in result.classes] == ["b-ok"]
+    assert result.failed_partitions == [
+        FetchPartition(from_date="2026-03-20", to_date="2026-04-17", center_ids=(2,))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hung_fetch_still_sends_reminders_within_the_cycle_budget(
+    configured_jobs, activate_bot, session_factory, test_config
+):
+    test_config.cycle_time_budget_seconds = 0.2
+    test_config.cycle_deadline_reserve_seconds = 0.1
+    client = HungPartitionClient({1: [make_class("b-ok", date(2026, 3, 23))]}, hung_centers={1})
+    context = FakeContext(client)
+    with session_factory() as session:
+        session.add(
+            ManagedBooking(
+                booking_id="b-mine",
+                activity_id=1,
+                payment_type="membership",
+                participation_id="pid-mine",
+                class_title="Body Pump",
+                class_location="Center 1",
+                class_datetime=NOW + timedelta(hours=5),
+                status=BookingStatus.CONFIRMED,
+            )
+        )
+        session.commit()
+
+    with time_machine.travel(NOW.replace(tzinfo=APP_TIMEZONE), tick=False):
+        report = await booking_cycle.run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    assert report.degraded
+    assert client.book_by_ids_calls == []
+    assert [call["text"].splitlines()[0] for call in context.bot.calls] == [
+        "Reminder: your class is coming up soon."
+    ]
+
+
+@pytest.mark.asyncio
+async def test_partial_fetch_does_not_cancel_bookings_from_failed_partition(
+    configured_jobs, activate_bot, session_factory, test_engine, test_config
+):
+    test_config.class_preferences.interested_centers = [1, 2]
+    test_config.fetch_partition_by_center = True
+    client = PartitionedClient(
+        {
+            1: [make_class("b-ok", date(2026, 3, 23))],
+            2: [make_class("b-mine", date(2026, 3, 24), "pid-mine")],
+        },
+        failing_centers={2},
+    )
+    context = FakeContext(client)
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(
+            ManagedBooking(
+                booking_id="b-mine",
+                activity_id=1,
+                payment_type="membership",
+                participation_id="pid-mine",
+                class_title="Body Pump",
+                class_location="Center 1",
+                class_datetime=datetime(2026, 3, 24, 18, 0),
+                status=BookingStatus.CONFIRMED,
+            )
+        )
+        session.commit()
+
+    with time_machine.travel(NOW.replace(tzinfo=APP_TIMEZONE), tick=False):
+        await booking_cycle.run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    with session_factory() as session:
+        mine = session.exec(select(ManagedBooking).where(ManagedBooking.participation_id == "pid-mine")).one()
+
+    assert mine.status == BookingStatus.CONFIRMED
+    assert client.book_by_ids_calls == [("b-ok", 1, "membership")]
+
+
+def use_example_tiers(test_config) -> None:
+    test_config.refresh_tiers = [
+        RefreshTier(max_days_ahead=2, refresh_seconds=0),
+        RefreshTier(max_days_ahead=7, refresh_seconds=300),
+        RefreshTier(max_days_ahead=28, refresh_seconds=1800),
+    ]
+
+
+def test_build_horizon_tiers_covers_horizon_without_gaps(configured_jobs, test_config):
+    use_example_tiers(test_config)
+
+    assert build_horizon_tiers(NOW) == [
+        HorizonTier(0, date(2026, 3, 20), date(2026, 3, 22), 0),
+        HorizonTier(1, date(2026, 3, 23), date(2026, 3, 27), 300),
+        HorizonTier(2, date(2026, 3, 28), date(2026, 4, 17), 1800),
+    ]
+
+
+def test_build_horizon_tiers_refreshes_uncovered_days_every_cycle(configured_jobs, test_config):
+    test_config.refresh_tiers = [RefreshTier(max_days_ahead=6, refresh_seconds=600)]
+
+    assert build_horizon_tiers(NOW) == [
+        HorizonTier(0, date(2026, 3, 20), date(2026, 3, 26), 600),
+        HorizonTier(1, date(2026, 3, 27), date(2026, 4, 17), 0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_serves_idle_tiers_from_cache(configured_jobs, test_config):
+    use_example_tiers(test_config)
+    near = make_class("b-near", date(2026, 3, 23))
+    mid = make_class("b-mid", date(2026, 3, 24))
+    far = make_class("b-far", date(2026, 4, 13))
+    client = PartitionedClient({1: [near, mid, far]})
+    tier_cache = ClassTierCache()
+
+    first = await fetch_candidate_classes(cast(PureGymClient, client), SATURDAY, tier_cache)
+    assert [gym_class.booking_id for gym_class in first.classes] == ["b-near", "b-mid", "b-far"]
+    assert len(client.requests) == 3
+
+    client.requests.clear()
+    second = await fetch_candidate_classes(
+        cast(PureGymClient, client), SATURDAY + timedelta(minutes=6), tier_cache
+    )
+    assert [gym_class.booking_id for gym_class in second.classes] == ["b-near", "b-mid", "b-far"]
+    assert sorted((request["from_date"], request["to_date"]) for request in client.requests) == [
+        ("2026-03-21", "2026-03-23"),
+        ("2026-03-24", "2026-03-28"),
+    ]
+
+    client.requests.clear()
+    invalidate_class_cache({"class_tier_cache": tier_cache})
+    await fetch_candidate_classes(cast(PureGymClient, client), SATURDAY + timedelta(minutes=7), tier_cache)
+    assert len(client.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_refetches_tier_that_failed(configured_jobs, test_config):
+    use_example_tiers(test_config)
+    client = PartitionedClient({1: [make_class("b-far", date(2026, 4, 14))]})
+    tier_cache = ClassTierCache()
+    original = client.get_available_classes
+
+    async def fail_far_tier(**kwargs):
+        if kwargs["from_date"] == "2026-03-29":
+            raise RuntimeError("far tier unavailable")
+        return await original(**kwargs)
+
+    client.get_available_classes = fail_far_tier
+    result = await fetch_candidate_classes(cast(PureGymClient, client), SATURDAY, tier_cache)
+    assert not result.complete
+    assert 2 not in tier_cache.tiers
+
+    client.get_available_classes = original
+    result = await fetch_candidate_classes(
+        cast(PureGymClient, client), SATURDAY + timedelta(seconds=60), tier_cache
+    )
+    assert result.complete
+    assert [gym_class.booking_id for gym_class in result.classes] == ["b-far"]
@@ -0,0 +1,80 @@
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+from puregym_mcp.puregym.client import PureGymClient
+
+from puregym_bot.bot.booking_cycle import (
+    SlotOccurrence,
+    class_datetime,
+    fetch_candidate_classes,
+    group_by_slot,
+)
+from puregym_bot.bot.class_records import ClassRecord, as_class_record, build_class_records
+from tests.fakes import FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0)
+
+
+def make_class(booking_id: str, day: date, start: time) -> object:
+    return make_gym_class(
+        booking_id=booking_id,
+        activity_id=7,
+        day=day,
+        start=start,
+        end=time(start.hour + 1, start.minute),
+        participation_id=None,
+        waitlist_position=2,
+    )
+
+
+def test_class_record_parses_timing_once():
+    record = ClassRecord(make_class("b-1", date(2026, 3, 24), time(18, 30)))
+
+    assert record.starts_at == datetime(2026, 3, 24, 18, 30)
+    assert record.weekday == 1
+    assert (record.start_minute, record.end_minute) == (18 * 60 + 30, 19 * 60 + 30)
+    assert (record.date, record.start_time) == ("2026-03-24", "18:30:00")
+    assert (record.booking_id, record.activity_id, record.waitlist_position) == ("b-1", 7, 2)
+    assert class_datetime(record) == record.starts_at
+    assert not hasattr(record, "__dict__")
+
+
+def test_build_class_records_keeps_existing_records():
+    record = ClassRecord(make_class("b-1", date(2026, 3, 24), time(18, 0)))
+    raw = make_class("b-2", date(2026, 3, 24), time(19, 0))
+
+    records = build_class_records([record, raw])
+
+    assert records[0] is record
+    assert isinstance(records[1], ClassRecord)
+    assert as_class_record(record) is record
+
+
+def test_group_by_slot_returns_records_for_raw_classes(test_config):
+    grouped = group_by_slot(
+        [
+            make_class("b-1", date(2026, 3, 23), time(18, 0)),
+            make_class("b-2", date(2026, 3, 25), time(18, 0)),
+        ],
+        test_config.class_preferences.available_time_slots,
+    )
+
+    slot = SlotOccurrence(date="2026-03-23", slot_start="17:00:00", slot_end="22:00:00")
+    assert list(grouped) == [slot]
+    assert all(isinstance(item, ClassRecord) for item in grouped[slot])
+
+
+@pytest.mark.asyncio
+async def test_fetch_candidate_classes_returns_sorted_records(configured_jobs):
+    client = FakePureGymClient(
+        [
+            make_class("b-late", date(2026, 3, 24), time(20, 0)),
+            make_class("b-early", date(2026, 3, 23), time(17, 0)),
+        ]
+    )
+
+    result = await fetch_candidate_classes(cast(PureGymClient, client), NOW)
+
+    assert [record.booking_id for record in result.classes] == ["b-early", "b-late"]
+    assert all(isinstance(record, ClassRecord) for record in result.classes)
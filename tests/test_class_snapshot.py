@@ -0,0 +1,121 @@
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+import time_machine
+from puregym_mcp.puregym.models import BookClassResult
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import booking_cycle
+from puregym_bot.bot.class_snapshot import ClassSnapshot, diff_class_snapshots
+from puregym_bot.bot.booking_cycle import SlotOccurrence, run_booking_cycle
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0)
+
+
+@pytest.fixture
+def frozen_now():
+    with time_machine.travel(NOW, tick=False):
+        yield
+
+
+def make_class(booking_id: str, start: time, participation_id: str | None = None, **kwargs):
+    return make_gym_class(
+        booking_id=booking_id,
+        activity_id=1,
+        day=date(2026, 3, 23),
+        start=start,
+        end=time(start.hour + 1, start.minute),
+        participation_id=participation_id,
+        **kwargs,
+    )
+
+
+def test_diff_class_snapshots_detects_added_removed_and_changed():
+    kept = make_class("b-kept", time(18, 0))
+    dropped = make_class("b-dropped", time(19, 0))
+    waitlisted = make_class("b-wait", time(20, 0))
+    previous = ClassSnapshot.from_classes([kept, dropped, waitlisted], taken_at=NOW)
+
+    added = make_class("b-new", time(17, 0))
+    waitlist_moved = make_class("b-wait", time(20, 0), waitlist_position=3)
+    current = ClassSnapshot.from_classes([kept, added, waitlist_moved], taken_at=NOW)
+
+    delta = diff_class_snapshots(previous, current)
+
+    assert [gym_class.booking_id for gym_class in delta.added] == ["b-new"]
+    assert [gym_class.booking_id for gym_class in delta.removed] == ["b-dropped"]
+    assert [(old.booking_id, new.waitlist_position) for old, new in delta.changed] == [("b-wait", 3)]
+    assert delta.touches_bookings() is False
+
+
+def test_diff_class_snapshots_is_empty_for_identical_classes():
+    classes = [make_class("b-1", time(18, 0)), make_class("b-2", time(19, 0), participation_id="pid-2")]
+
+    delta = diff_class_snapshots(
+        ClassSnapshot.from_classes(classes, taken_at=NOW),
+        ClassSnapshot.from_classes(list(classes), taken_at=NOW),
+    )
+
+    assert delta.is_empty
+    assert delta.touches_bookings() is False
+
+
+def test_diff_class_snapshots_flags_participation_changes():
+    previous = ClassSnapshot.from_classes([make_class("b-1", time(18, 0))], taken_at=NOW)
+    current = ClassSnapshot.from_classes(
+        [make_class("b-1", time(18, 0), participation_id="pid-1")], taken_at=NOW
+    )
+
+    assert diff_class_snapshots(previous, current).touches_bookings() is True
+
+
+@pytest.mark.asyncio
+async def test_incremental_cycle_skips_unchanged_work(configured_jobs, activate_bot, frozen_now, monkeypatch):
+    single = make_class("b-single", time(18, 0))
+    client = FakePureGymClient([single])
+    context = FakeContext(client)
+
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+    assert client.book_by_ids_calls == [("b-single", 1, "membership")]
+    assert len(context.bot.calls) == 1
+
+    reconcile_calls = 0
+    original_reconcile = booking_cycle.reconcile_bookings_missing_in_puregym
+
+    def counting_reconcile(*args, **kwargs):
+        nonlocal reconcile_calls
+        reconcile_calls += 1
+        return original_reconcile(*args, **kwargs)
+
+    monkeypatch.setattr(booking_cycle, "reconcile_bookings_missing_in_puregym", counting_reconcile)
+
+    client.classes = [make_class("b-single", time(18, 0), participation_id="p-b-single")]
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+    assert reconcile_calls == 1
+
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+    assert reconcile_calls == 1
+    assert client.book_by_ids_calls == [("b-single", 1, "membership")]
+    assert len(context.bot.calls) == 1
+    assert context.bot_data["incremental_cycle_state"].retry_slots == set()
+
+
+@pytest.mark.asyncio
+async def test_incremental_cycle_retries_failed_slots(configured_jobs, activate_bot, frozen_now):
+    class FailingClient(FakePureGymClient):
+        async def book_by_ids(self, booking_id, activity_id, payment_type):
+            self.book_by_ids_calls.append((booking_id, activity_id, payment_type))
+            return BookClassResult(status="error")
+
+    client = FailingClient([make_class("b-full", time(18, 0))])
+    context = FakeContext(client)
+
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    assert len(client.book_by_ids_calls) == 2
+    assert context.bot_data["incremental_cycle_state"].retry_slots == {
+        SlotOccurrence(date="2026-03-23", slot_start="17:00:00", slot_end="22:00:00")
+    }
@@ -90,3 +90,10 @@ def test_manage_bookings_command_is_registered_and_informational():
 
     assert command.description == "Review and manage upcoming bookings"
     assert command.allow_inactive is True
+
+
+def test_commands_that_run_a_cycle_do_not_block_other_updates():
+    blocking = {spec.name: spec.blocking for spec in COMMANDS}
+
+    assert blocking["run_now"] is False and blocking["profile"] is False
+    assert blocking["booked"] is True
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import handlers
+from puregym_bot.bot.booking_cycle import CycleReport
+from puregym_bot.bot.cycle_executor import CYCLE_EXECUTOR_KEY, CycleExecutor
+from tests.fakes import FakeBot
+
+
+class GatedRunner:
+    """Cycle runner that blocks until the test releases the current run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.gates: list[asyncio.Event] = []
+
+    async def __call__(self, _context) -> CycleReport:
+        self.calls += 1
+        gate = asyncio.Event()
+        self.gates.append(gate)
+        await gate.wait()
+        return CycleReport(started_at=datetime(2026, 3, 23, 17, 0), unresolved_slots=self.calls)
+
+    async def release(self, run: int) -> None:
+        while len(self.gates) < run:
+            await asyncio.sleep(0)
+        self.gates[run - 1].set()
+
+
+def make_context(bot_data: dict | None = None):
+    return cast(ContextTypes.DEFAULT_TYPE, SimpleNamespace(bot=FakeBot(), bot_data=bot_data or {}))
+
+
+@pytest.mark.asyncio
+async def test_overlapping_triggers_share_one_follow_up_cycle():
+    runner = GatedRunner()
+    executor = CycleExecutor(runner)
+    context = make_context()
+
+    first = asyncio.create_task(executor.trigger(context))
+    await asyncio.sleep(0)
+    assert executor.busy
+    second = asyncio.create_task(executor.trigger(context))
+    third = asyncio.create_task(executor.trigger(context))
+    await asyncio.sleep(0)
+
+    await runner.release(1)
+    assert (await first).unresolved_slots == 1
+    await runner.release(2)
+    assert (await second).unresolved_slots == 2
+    assert (await third).unresolved_slots == 2
+
+    assert runner.calls == 2
+    assert not executor.busy
+
+
+@pytest.mark.asyncio
+async def test_failed_cycle_reaches_every_waiter_and_executor_recovers():
+    calls = 0
+
+    async def runner(_context) -> CycleReport:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("PureGym is down")
+        return CycleReport(started_at=datetime(2026, 3, 23, 17, 0))
+
+    executor = CycleExecutor(runner)
+
+    with pytest.raises(RuntimeError):
+        await executor.trigger(make_context())
+    assert (await executor.trigger(make_context())).ran is True
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_cycle():
+    runner = GatedRunner()
+    executor = CycleExecutor(runner)
+
+    impatient = asyncio.create_task(executor.trigger(make_context()))
+    await asyncio.sleep(0)
+    impatient.cancel()
+    waiting = asyncio.create_task(executor.trigger(make_context()))
+    await asyncio.sleep(0)
+
+    await runner.release(1)
+    await runner.release(2)
+    assert (await waiting).unresolved_slots == 2
+    assert runner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_run_now_replies_with_the_report_of_the_cycle_that_served_it():
+    runner = GatedRunner()
+    executor = CycleExecutor(runner)
+    context = make_context({CYCLE_EXECUTOR_KEY: executor})
+    update = cast(Update, SimpleNamespace(effective_chat=SimpleNamespace(id=1)))
+
+    scheduled = asyncio.create_task(executor.trigger(context))
+    await asyncio.sleep(0)
+    command = asyncio.create_task(handlers.run_now(update, context, cast(handlers.HandlerContext, None)))
+    await asyncio.sleep(0)
+    await runner.release(1)
+    await runner.release(2)
+    await scheduled
+    await command
+
+    assert [call["text"] for call in context.bot.calls] == [
+        "A booking cycle is already running, another one will follow it...",
+        "Booking cycle finished. 2 slot(s) could not be booked yet.",
+    ]
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+from sqlmodel import Session
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import cycle_scheduler
+from puregym_bot.bot.booking_cycle import CycleReport
+from puregym_bot.bot.cycle_scheduler import (
+    collect_cycle_deadlines,
+    next_cycle_delay,
+    run_adaptive_booking_cycle,
+)
+from puregym_bot.storage.models import BookingStatus, ManagedBooking
+
+NOW = datetime(2026, 3, 20, 3, 0)
+
+
+def make_booking(class_datetime: datetime, status: BookingStatus, reminder_sent: bool = False):
+    return ManagedBooking(
+        booking_id=f"b-{class_datetime.isoformat()}",
+        activity_id=1,
+        payment_type="membership",
+        participation_id=f"pid-{class_datetime.isoformat()}",
+        class_title="Body Pump",
+        class_location="Main Hall",
+        class_datetime=class_datetime,
+        status=status,
+        reminder_sent=reminder_sent,
+    )
+
+
+def test_next_cycle_delay_uses_base_interval_when_slots_are_actionable(configured_jobs):
+    report = CycleReport(started_at=NOW, unresolved_slots=2)
+
+    assert next_cycle_delay(NOW, report, []) == 60
+
+
+def test_next_cycle_delay_backs_off_when_nothing_is_actionable(configured_jobs):
+    blocked = CycleReport(started_at=NOW, unresolved_slots=0)
+    saturated = CycleReport(started_at=NOW, unresolved_slots=3, max_bookings_reached=True)
+
+    assert next_cycle_delay(NOW, blocked, []) == 900
+    assert next_cycle_delay(NOW, saturated, []) == 900
+
+
+def test_next_cycle_delay_wakes_up_for_the_next_deadline(configured_jobs):
+    report = CycleReport(started_at=NOW, unresolved_slots=0)
+
+    assert next_cycle_delay(NOW, report, [NOW + timedelta(minutes=2), NOW + timedelta(hours=1)]) == 121
+    assert next_cycle_delay(NOW, report, [NOW + timedelta(seconds=1)]) == 5
+    assert next_cycle_delay(NOW, report, [NOW - timedelta(minutes=5)]) == 900
+
+
+def test_next_cycle_delay_keeps_polling_while_inactive(configured_jobs):
+    assert next_cycle_delay(NOW, CycleReport(started_at=NOW, ran=False), []) == 60
+
+
+def test_collect_cycle_deadlines_includes_reminders_auto_cancel_and_releases(
+    configured_jobs, test_config, test_engine
+):
+    test_config.booking_deadline_timer = False
+    class_time = NOW + timedelta(days=2)
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(make_booking(class_time, BookingStatus.PENDING))
+        session.add(
+            make_booking(class_time + timedelta(hours=1), BookingStatus.CONFIRMED, reminder_sent=True)
+        )
+        session.commit()
+
+        deadlines = collect_cycle_deadlines(session, NOW)
+
+    assert class_time - timedelta(hours=24) in deadlines
+    assert class_time - timedelta(hours=3) in deadlines
+    # Next Monday 17:00 slot released 28 days ahead, followed up after the sniper window.
+    assert datetime(2026, 3, 23, 17, 1) in deadlines
+    assert len(deadlines) >= 3
+
+
+def test_collect_cycle_deadlines_leaves_booking_deadlines_to_the_timer(configured_jobs, test_engine):
+    class_time = NOW + timedelta(days=2)
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(make_booking(class_time, BookingStatus.PENDING))
+        session.commit()
+
+        deadlines = collect_cycle_deadlines(session, NOW)
+
+    assert class_time - timedelta(hours=24) not in deadlines
+    assert class_time - timedelta(hours=3) not in deadlines
+    assert datetime(2026, 3, 23, 17, 1) in deadlines
+
+
+class RecordingJobQueue:
+    def __init__(self):
+        self.scheduled: list[float] = []
+
+    def run_once(self, callback, when: float, name: str) -> None:
+        self.scheduled.append(when)
+
+
+@pytest.mark.asyncio
+async def test_next_cycle_is_scheduled_even_when_the_deadline_lookup_fails(configured_jobs, monkeypatch):
+    async def idle_cycle(_context):
+        return CycleReport(started_at=NOW)
+
+    def broken_deadlines(*_args):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(cycle_scheduler, "run_single_flight_cycle", idle_cycle)
+    monkeypatch.setattr(cycle_scheduler, "collect_cycle_deadlines", broken_deadlines)
+    job_queue = RecordingJobQueue()
+    context = SimpleNamespace(bot_data={}, job_queue=job_queue)
+
+    await run_adaptive_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    assert job_queue.scheduled == [60.0]
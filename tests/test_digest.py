@@ -0,0 +1,169 @@
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+import time_machine
+from sqlmodel import Session, select
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import OutboundPrompt, run_booking_cycle
+from puregym_bot.bot.digest import PromptCategory, PromptDigest
+from puregym_bot.bot.prompts import ButtonSpec, MessageSpec
+from puregym_bot.config import DigestPolicy
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BookingStatus, BotState, ManagedBooking
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+
+def info(text: str, category: PromptCategory, detail: str | None = None) -> OutboundPrompt:
+    return OutboundPrompt(message=MessageSpec(text=text), category=category, detail=detail)
+
+
+def test_digest_groups_informational_prompts_per_category():
+    digest = PromptDigest(DigestPolicy.CATEGORY)
+    interactive = OutboundPrompt(
+        message=MessageSpec(text="Keep it?", buttons=((ButtonSpec(label="Accept", callback_data="x"),),))
+    )
+
+    immediate = digest.hold(
+        [
+            info("archived", PromptCategory.ARCHIVED, "Mon 23/03 18:00  Yoga @ Hall"),
+            interactive,
+            info("archived", PromptCategory.ARCHIVED, "Mon 23/03 19:00  Spin @ Hall"),
+            info("auto-cancelled", PromptCategory.AUTO_CANCELLED, "Tue 24/03 08:00  Yoga @ Hall"),
+            OutboundPrompt(message=MessageSpec(text="uncategorised")),
+        ]
+    )
+
+    assert [prompt.message.text for prompt in immediate] == ["Keep it?", "uncategorised"]
+    assert [message.text for message in digest.flush()] == [
+        "2 bookings have passed and are now archived:\n"
+        "- Mon 23/03 18:00  Yoga @ Hall\n"
+        "- Mon 23/03 19:00  Spin @ Hall",
+        "auto-cancelled",
+    ]
+    assert digest.flush() == []
+
+
+def test_digest_cycle_policy_sends_one_message():
+    digest = PromptDigest(DigestPolicy.CYCLE)
+    digest.hold(
+        [
+            info("archived", PromptCategory.ARCHIVED, "a"),
+            info("cancelled", PromptCategory.CANCELLED_MISSING, "b"),
+        ]
+    )
+
+    assert [message.text for message in digest.flush()] == [
+        "Booking cycle updates:\n\narchived\n\ncancelled",
+    ]
+
+
+def test_digest_off_and_min_prompts_keep_individual_messages():
+    prompts = [info("one", PromptCategory.ARCHIVED), info("two", PromptCategory.ARCHIVED)]
+
+    off = PromptDigest(DigestPolicy.OFF)
+    assert off.hold(prompts) == prompts
+    assert off.flush() == []
+
+    high_threshold = PromptDigest(DigestPolicy.CATEGORY, min_prompts=3)
+    assert high_threshold.hold(prompts) == []
+    assert [message.text for message in high_threshold.flush()] == ["one", "two"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        (
+            DigestPolicy.CATEGORY,
+            [
+                "2 bookings have passed and are now archived:\n"
+                "- Mon 23/03 10:00  Yoga @ Main Hall\n"
+                "- Mon 23/03 12:00  Spin @ Main Hall"
+            ],
+        ),
+        (
+            DigestPolicy.OFF,
+            ["A booking has passed and is now archived."] * 2,
+        ),
+    ],
+)
+async def test_run_booking_cycle_digests_archived_bookings(
+    configured_jobs, test_config, test_engine, policy, expected
+):
+    test_config.notification_digest = policy
+    now = datetime(2026, 3, 23, 17, 0, tzinfo=APP_TIMEZONE)
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(BotState(id=1, is_active=True))
+        for index, (title, hour) in enumerate([("Yoga", 10), ("Spin", 12)]):
+            session.add(
+                ManagedBooking(
+                    booking_id=f"b-{index}",
+                    activity_id=index,
+                    payment_type="membership",
+                    participation_id=f"pid-{index}",
+                    class_title=title,
+                    class_location="Main Hall",
+                    class_datetime=now.replace(hour=hour),
+                    status=BookingStatus.CONFIRMED,
+                )
+            )
+        session.commit()
+    context = FakeContext(FakePureGymClient([]))
+
+    with time_machine.travel(now, tick=False):
+        await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    assert [call["text"] for call in context.bot.calls] == expected
+
+
+class FailingUnbookClient(FakePureGymClient):
+    async def unbook_participation(self, participation_id: str):
+        raise RuntimeError("unexpected cancel response")
+
+
+@pytest.mark.asyncio
+async def test_held_notices_are_sent_when_a_later_step_fails(configured_jobs, test_config, test_engine):
+    test_config.booking_deadline_timer = False
+    now = datetime(2026, 3, 23, 17, 0, tzinfo=APP_TIMEZONE)
+    with Session(test_engine, expire_on_commit=False) as session:
+        session.add(BotState(id=1, is_active=True))
+        for index, (status, hour) in enumerate(
+            [(BookingStatus.CONFIRMED, 10), (BookingStatus.CONFIRMED, 12), (BookingStatus.PENDING, 19)]
+        ):
+            session.add(
+                ManagedBooking(
+                    booking_id=f"b-{index}",
+                    activity_id=index,
+                    payment_type="membership",
+                    participation_id=f"pid-{index}",
+                    class_title="Yoga",
+                    class_location="Main Hall",
+                    class_datetime=now.replace(hour=hour, tzinfo=None),
+                    status=status,
+                    reminder_sent=True,
+                )
+            )
+        session.commit()
+    pending = make_gym_class(
+        booking_id="b-2",
+        activity_id=2,
+        day=date(2026, 3, 23),
+        start=time(19, 0),
+        end=time(20, 0),
+        participation_id="pid-2",
+    )
+    context = FakeContext(FailingUnbookClient([pending]))
+
+    with time_machine.travel(now, tick=False), pytest.raises(RuntimeError, match="unexpected cancel"):
+        await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    with Session(test_engine) as session:
+        statuses = [
+            booking.status for booking in session.exec(select(ManagedBooking).order_by(ManagedBooking.id))
+        ]
+    assert statuses == [BookingStatus.ATTENDED, BookingStatus.ATTENDED, BookingStatus.PENDING]
+    assert [call["text"].splitlines()[0] for call in context.bot.calls] == [
+        "2 bookings have passed and are now archived:"
+    ]
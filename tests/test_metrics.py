@@ -0,0 +1,143 @@
+import asyncio
+from typing import cast
+
+import pytest
+from sqlalchemy import create_engine, text
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import run_booking_cycle
+from puregym_bot.metrics import (
+    CYCLE_STEP_DURATION,
+    CYCLES,
+    DB_QUERIES,
+    PUREGYM_REQUEST_DURATION,
+    PUREGYM_REQUEST_ERRORS,
+    Counter,
+    Histogram,
+    InstrumentedPureGymClient,
+    MetricsRegistry,
+    instrument_engine,
+    observe,
+    start_metrics_server,
+    stop_metrics_server,
+)
+from puregym_bot.storage.models import BotState
+from tests.fakes import FakeContext, FakePureGymClient
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("outcome",))
+    histogram = registry.histogram("job_seconds", "Job duration.")
+    histogram.buckets = (0.1, 1.0)
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome='bad "one"')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run.",
+        "# TYPE jobs_total counter",
+        'jobs_total{outcome="bad \\"one\\""} 2.0',
+        'jobs_total{outcome="ok"} 1.0',
+        "# HELP job_seconds Job duration.",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 1',
+        'job_seconds_bucket{le="1.0"} 2',
+        'job_seconds_bucket{le="+Inf"} 3',
+        "job_seconds_sum 3.55",
+        "job_seconds_count 3",
+    ]
+
+
+def test_observe_counts_errors_and_still_records_duration():
+    histogram = Histogram("step_seconds", "Step duration.", ("step",))
+    errors = Counter("step_errors_total", "Step errors.", ("step",))
+
+    with pytest.raises(RuntimeError):
+        with observe(histogram, errors, step="fetch"):
+            raise RuntimeError("boom")
+
+    assert histogram.count(step="fetch") == 1
+    assert errors.value(step="fetch") == 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_client_times_coroutine_methods():
+    class Client:
+        timeout = 10
+
+        async def get_my_bookings(self):
+            return ["booking"]
+
+        async def unbook_participation(self, participation_id):
+            raise ConnectionError(participation_id)
+
+    client = InstrumentedPureGymClient(Client())
+    calls_before = PUREGYM_REQUEST_DURATION.count(method="get_my_bookings")
+    errors_before = PUREGYM_REQUEST_ERRORS.value(method="unbook_participation")
+
+    assert await client.get_my_bookings() == ["booking"]
+    with pytest.raises(ConnectionError):
+        await client.unbook_participation("pid-1")
+
+    assert client.timeout == 10
+    assert PUREGYM_REQUEST_DURATION.count(method="get_my_bookings") == calls_before + 1
+    assert PUREGYM_REQUEST_ERRORS.value(method="unbook_participation") == errors_before + 1
+
+
+def test_instrumented_engine_counts_statements_by_kind():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)
+    selects_before = DB_QUERIES.value(statement="select")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+
+    assert DB_QUERIES.value(statement="select") == selects_before + 2
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_records_outcome_and_step_timings(configured_jobs, session_factory):
+    with session_factory() as session:
+        session.add(BotState(id=1, is_active=True))
+        session.commit()
+    completed_before = CYCLES.value(outcome="completed")
+    fetches_before = CYCLE_STEP_DURATION.count(step="fetch")
+    deadlines_before = CYCLE_STEP_DURATION.count(step="deadlines")
+
+    await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, FakeContext(FakePureGymClient([]))))
+
+    assert CYCLES.value(outcome="completed") == completed_before + 1
+    assert CYCLE_STEP_DURATION.count(step="fetch") == fetches_before + 1
+    assert CYCLE_STEP_DURATION.count(step="deadlines") == deadlines_before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_metrics_and_rejects_other_paths():
+    bot_data: dict = {}
+    server = await start_metrics_server(bot_data, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async def get(path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        return response
+
+    try:
+        metrics = await get("/metrics")
+        missing = await get("/other")
+    finally:
+        await stop_metrics_server(bot_data)
+
+    assert metrics.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"# TYPE puregym_bot_cycles_total counter" in metrics
+    assert missing.startswith(b"HTTP/1.1 404 Not Found\r\n")
+    assert bot_data == {}
@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.month_simulation import simulate
+
+
+@pytest.mark.asyncio
+async def test_idle_cycles_do_not_refetch_the_bookings_snapshot():
+    report = await simulate(
+        days=2, centers=1, adaptive=True, reply_minutes=30, accept_rate=0.7, full_rate=0.2, seed=0
+    )
+
+    assert report.cycles == report.api_calls["get_available_classes"]
+    # Only the first cycle and booking changes fetch the bookings; idle cycles reuse the snapshot.
+    assert report.api_calls["get_my_bookings"] <= report.bookings_made + 1
+    assert report.api_calls["get_my_bookings"] * 10 < report.cycles
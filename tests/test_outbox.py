@@ -0,0 +1,202 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import cast
+
+import pytest
+import time_machine
+from sqlmodel import Session, select
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import OutboundPrompt, publish_prompts, run_booking_cycle
+from puregym_bot.bot.outbox import OUTBOX_SENDER_KEY, OutboxSender
+from puregym_bot.bot.prompts import ButtonSpec, MessageSpec
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from puregym_bot.storage.models import BookingChoice, ManagedBooking, OutboxMessage, OutboxStatus
+from tests.fakes import FakeBot, FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0, tzinfo=APP_TIMEZONE)
+
+
+class ScriptedBot(FakeBot):
+    def __init__(self, failures: list[Exception] | None = None):
+        super().__init__()
+        self.failures = failures or []
+
+    async def send_message(self, *, chat_id: int, text: str, reply_markup=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        return await super().send_message(chat_id=chat_id, text=text, reply_markup=reply_markup)
+
+
+def outbox_rows(test_engine) -> list[OutboxMessage]:
+    with Session(test_engine) as session:
+        return list(session.exec(select(OutboxMessage).order_by(OutboxMessage.id)).all())
+
+
+def queue_messages(test_engine, *texts: str) -> None:
+    with Session(test_engine) as session:
+        for text in texts:
+            session.add(OutboxMessage(chat_id=1, text=text))
+        session.commit()
+
+
+@pytest.mark.asyncio
+async def test_publish_prompts_queues_messages_and_wakes_sender_on_commit(configured_jobs, test_engine):
+    sender = OutboxSender(cast(Bot, FakeBot()))
+    context = FakeContext(FakePureGymClient([]))
+    context.bot_data[OUTBOX_SENDER_KEY] = sender
+    button = ButtonSpec(label="Accept", callback_data="booking:accept:pid-1")
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        booking = ManagedBooking(
+            booking_id="b-1",
+            activity_id=1,
+            payment_type="membership",
+            participation_id="pid-1",
+            class_title="Body Pump",
+            class_location="Center 1",
+            class_datetime=datetime(2026, 3, 23, 18, 0),
+        )
+        session.add(booking)
+        session.commit()
+        prompts = [OutboundPrompt(message=MessageSpec(text="Booked", buttons=((button,),)), booking=booking)]
+        await publish_prompts(cast(ContextTypes.DEFAULT_TYPE, context), session, prompts)
+
+    assert context.bot.calls == []
+    assert sender._wake.is_set()
+    [row] = outbox_rows(test_engine)
+    assert (row.text, row.managed_booking_id, row.status) == ("Booked", booking.id, OutboxStatus.PENDING)
+
+
+@pytest.mark.asyncio
+async def test_sender_delivers_in_order_and_writes_message_ids_back(configured_jobs, test_engine):
+    with Session(test_engine, expire_on_commit=False) as session:
+        choice = BookingChoice(
+            slot_date="2026-03-23", slot_start="17:00:00", slot_end="22:00:00", options_json="[]"
+        )
+        session.add(choice)
+        session.commit()
+        session.add(OutboxMessage(chat_id=1, text="first"))
+        session.add(
+            OutboxMessage(
+                chat_id=1,
+                text="pick one",
+                buttons_json='[[{"label": "1. 18:00", "callback_data": "choice:1:0"}]]',
+                booking_choice_id=choice.id,
+            )
+        )
+        session.commit()
+    bot = ScriptedBot()
+
+    await OutboxSender(cast(Bot, bot)).drain()
+
+    assert [call["text"] for call in bot.calls] == ["first", "pick one"]
+    assert bot.calls[1]["reply_markup"].inline_keyboard[0][0].callback_data == "choice:1:0"
+    assert [row.status for row in outbox_rows(test_engine)] == [OutboxStatus.SENT, OutboxStatus.SENT]
+    with Session(test_engine) as session:
+        stored_choice = session.get(BookingChoice, choice.id)
+        assert stored_choice is not None
+        assert stored_choice.message_id == bot.calls[1]["message_id"]
+
+
+@pytest.mark.asyncio
+async def test_sender_waits_for_retry_after_and_keeps_order(configured_jobs, test_engine):
+    queue_messages(test_engine, "first", "second")
+    bot = ScriptedBot([RetryAfter(30)])
+    sender = OutboxSender(cast(Bot, bot))
+
+    with time_machine.travel(NOW, tick=False):
+        delay = await sender.drain()
+
+    assert delay == 30
+    assert bot.calls == []
+    first, second = outbox_rows(test_engine)
+    assert first.attempts == 0
+    assert first.next_attempt_at == NOW.replace(tzinfo=None) + timedelta(seconds=30)
+    assert second.status == OutboxStatus.PENDING
+
+    with time_machine.travel(NOW + timedelta(seconds=31), tick=False):
+        await sender.drain()
+
+    assert [call["text"] for call in bot.calls] == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_sender_backs_off_on_network_errors_and_drops_bad_requests(
+    configured_jobs, test_engine, test_config
+):
+    test_config.outbox_max_attempts = 2
+    queue_messages(test_engine, "flaky", "broken", "fine")
+    bot = ScriptedBot([NetworkError("boom"), NetworkError("boom"), BadRequest("bad markup")])
+    sender = OutboxSender(cast(Bot, bot))
+
+    with time_machine.travel(NOW, tick=False):
+        assert await sender.drain() == 2
+    with time_machine.travel(NOW + timedelta(seconds=3), tick=False):
+        await sender.drain()
+
+    flaky, broken, fine = outbox_rows(test_engine)
+    assert (flaky.status, flaky.attempts) == (OutboxStatus.FAILED, 2)
+    assert (broken.status, broken.last_error) == (OutboxStatus.FAILED, "bad markup")
+    assert fine.status == OutboxStatus.SENT
+    assert [call["text"] for call in bot.calls] == ["fine"]
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_does_not_wait_for_telegram(configured_jobs, activate_bot, test_engine):
+    class BlockingBot(FakeBot):
+        async def send_message(self, **kwargs):
+            await asyncio.Event().wait()
+
+    context = FakeContext(
+        FakePureGymClient(
+            [
+                make_gym_class(
+                    booking_id="b-1",
+                    activity_id=1,
+                    day=date(2026, 3, 23),
+                    start=time(18, 0),
+                    end=time(19, 0),
+                    participation_id=None,
+                )
+            ]
+        )
+    )
+    sender = OutboxSender(cast(Bot, BlockingBot()))
+    context.bot_data[OUTBOX_SENDER_KEY] = sender
+    sender.start()
+    try:
+        with time_machine.travel(NOW, tick=False):
+            await asyncio.wait_for(run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context)), timeout=1)
+    finally:
+        await sender.stop()
+
+    [row] = outbox_rows(test_engine)
+    assert row.text.startswith("Booked:")
+    assert row.managed_booking_id is not None
+
+
+def test_sender_prunes_finished_messages_past_retention(configured_jobs, test_config, test_engine):
+    test_config.outbox_retention_days = 7
+    now_utc = datetime(2026, 3, 20, 11, 0)
+    with Session(test_engine) as session:
+        for text, status, age_days in [
+            ("old sent", OutboxStatus.SENT, 8),
+            ("old failed", OutboxStatus.FAILED, 8),
+            ("old pending", OutboxStatus.PENDING, 8),
+            ("recent sent", OutboxStatus.SENT, 1),
+        ]:
+            session.add(
+                OutboxMessage(
+                    chat_id=1, text=text, status=status, created_at=now_utc - timedelta(days=age_days)
+                )
+            )
+        session.commit()
+
+    with time_machine.travel(NOW, tick=False):
+        deleted = OutboxSender(cast(Bot, FakeBot())).prune()
+
+    assert deleted == 2
+    assert [row.text for row in outbox_rows(test_engine)] == ["old pending", "recent sent"]
@@ -0,0 +1,94 @@
+from datetime import datetime
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import handlers
+from puregym_bot.bot.booking_cycle import CycleReport
+from puregym_bot.bot.cycle_executor import CYCLE_EXECUTOR_KEY, CycleExecutor
+from puregym_bot.bot.profiling import ProfileRequest, parse_profile_args, profile_cycle
+from tests.fakes import FakeBot
+
+
+class DocumentBot(FakeBot):
+    def __init__(self):
+        super().__init__()
+        self.documents: list[dict] = []
+
+    async def send_document(self, *, chat_id: int, document, caption: str | None = None):
+        self.documents.append({"chat_id": chat_id, "document": document, "caption": caption})
+
+
+# Kept alive so the cycle's allocations still show up when the profile is taken.
+RETAINED: list[dict[int, str]] = []
+
+
+def build_calendar_lookup(size: int) -> dict[int, str]:
+    return {index: f"class-{index}" for index in range(size)}
+
+
+async def busy_cycle(_context) -> CycleReport:
+    RETAINED.append(build_calendar_lookup(5000))
+    return CycleReport(started_at=datetime(2026, 3, 23, 17, 0))
+
+
+def make_context(executor: CycleExecutor, args: list[str]):
+    return cast(
+        ContextTypes.DEFAULT_TYPE,
+        SimpleNamespace(bot=DocumentBot(), bot_data={CYCLE_EXECUTOR_KEY: executor}, args=args),
+    )
+
+
+def test_parse_profile_args():
+    assert parse_profile_args([]) == ProfileRequest()
+    assert parse_profile_args(["10", "memory"]) == ProfileRequest(top=10, trace_memory=True)
+    assert parse_profile_args(["100000"]).top == 200
+    with pytest.raises(ValueError):
+        parse_profile_args(["fast"])
+
+
+@pytest.mark.asyncio
+async def test_profile_cycle_reports_hot_spots_and_allocation_sites():
+    executor = CycleExecutor(busy_cycle)
+
+    profile = await profile_cycle(
+        executor, make_context(executor, []), ProfileRequest(top=20, trace_memory=True)
+    )
+
+    assert profile.report.ran is True
+    assert profile.hot_spots.startswith("Top 20 by cumulative time:\n")
+    assert "build_calendar_lookup" in profile.hot_spots
+    assert profile.allocations is not None
+    assert "test_profiling.py" in profile.allocations
+    assert not executor.busy
+
+
+@pytest.mark.asyncio
+async def test_profile_command_sends_long_reports_as_a_document():
+    executor = CycleExecutor(busy_cycle)
+    context = make_context(executor, ["200", "memory"])
+    update = cast(Update, SimpleNamespace(effective_chat=SimpleNamespace(id=1)))
+
+    await handlers.profile(update, context, cast(handlers.HandlerContext, None))
+
+    bot = cast(DocumentBot, context.bot)
+    assert [call["text"] for call in bot.calls] == ["Profiling one booking cycle..."]
+    assert len(bot.documents) == 1
+    assert bot.documents[0]["document"].filename == "cycle_profile.txt"
+    assert bot.documents[0]["caption"].startswith("Booking cycle finished. Profiled in ")
+
+
+@pytest.mark.asyncio
+async def test_profile_command_rejects_unknown_arguments():
+    executor = CycleExecutor(busy_cycle)
+    context = make_context(executor, ["slow"])
+    update = cast(Update, SimpleNamespace(effective_chat=SimpleNamespace(id=1)))
+
+    await handlers.profile(update, context, cast(handlers.HandlerContext, None))
+
+    assert [call["text"] for call in cast(DocumentBot, context.bot).calls] == [
+        "Unknown /profile argument: slow. Usage: /profile [entries] [memory]"
+    ]
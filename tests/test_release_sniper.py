@@ -0,0 +1,118 @@
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+import time_machine
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot import release_sniper
+from puregym_bot.bot.booking_cycle import IncrementalCycleState, SlotOccurrence
+from puregym_bot.bot.class_records import build_class_records
+from puregym_bot.bot.class_snapshot import ClassSnapshot
+from puregym_bot.bot.release_sniper import ReleaseTarget, known_class_starts, next_release, upcoming_releases
+from puregym_bot.datetime_utils import APP_TIMEZONE
+from tests.fakes import FakeContext, FakePureGymClient, make_gym_class
+
+MONDAY_SLOT = SlotOccurrence(date="2026-04-20", slot_start="17:00:00", slot_end="22:00:00")
+
+
+def test_next_release_is_slot_start_minus_horizon(test_config):
+    # Friday 2026-03-20 12:00 + 28 days lands on Friday 2026-04-17.
+    target = next_release(
+        datetime(2026, 3, 20, 12, 0),
+        test_config.class_preferences.available_time_slots,
+        test_config.max_days_in_advance,
+    )
+
+    assert target == ReleaseTarget(release_at=datetime(2026, 3, 23, 17, 0), slot_occurrence=MONDAY_SLOT)
+
+
+def test_upcoming_releases_skip_already_released_occurrences(test_config):
+    targets = upcoming_releases(
+        datetime(2026, 3, 23, 17, 0),
+        test_config.class_preferences.available_time_slots,
+        test_config.max_days_in_advance,
+    )
+
+    assert targets[0].slot_occurrence.date == "2026-04-21"
+    assert targets[0].release_at == datetime(2026, 3, 24, 17, 0)
+    assert all(target.release_at > datetime(2026, 3, 23, 17, 0) for target in targets)
+
+
+def test_release_targets_follow_known_class_start_times(test_config):
+    # Classes from the week before the released occurrence, as the cycle's snapshot holds them.
+    classes = build_class_records(
+        [
+            make_gym_class(
+                booking_id=f"b-{start.hour}",
+                activity_id=1,
+                day=date(2026, 4, 13),
+                start=start,
+                end=time(start.hour + 1, start.minute),
+                participation_id=None,
+            )
+            for start in (time(18, 0), time(19, 30))
+        ]
+    )
+    snapshot = ClassSnapshot.from_classes(classes, taken_at=datetime(2026, 3, 20, 12, 0))
+    bot_data = {"incremental_cycle_state": IncrementalCycleState(snapshot=snapshot)}
+
+    targets = upcoming_releases(
+        datetime(2026, 3, 20, 12, 0),
+        test_config.class_preferences.available_time_slots,
+        test_config.max_days_in_advance,
+        class_starts=known_class_starts(bot_data),
+    )
+
+    assert targets[:2] == [
+        ReleaseTarget(release_at=datetime(2026, 3, 23, 18, 0), slot_occurrence=MONDAY_SLOT),
+        ReleaseTarget(release_at=datetime(2026, 3, 23, 19, 30), slot_occurrence=MONDAY_SLOT),
+    ]
+    # Tuesdays have no known classes, so they fall back to the slot start.
+    assert targets[2].release_at == datetime(2026, 3, 24, 17, 0)
+
+
+@pytest.mark.asyncio
+async def test_run_release_snipe_retries_until_slot_is_booked(configured_jobs, activate_bot, test_config):
+    test_config.release_sniper_retry_interval_seconds = 0
+    released_class = make_gym_class(
+        booking_id="b-release",
+        activity_id=7,
+        day=date(2026, 4, 20),
+        start=time(18, 0),
+        end=time(19, 0),
+        participation_id=None,
+    )
+
+    class ReleasingClient(FakePureGymClient):
+        fetches = 0
+
+        async def get_available_classes(self, **kwargs):
+            self.fetches += 1
+            return [] if self.fetches < 3 else self.classes
+
+    client = ReleasingClient([released_class], bookings=[])
+    context = FakeContext(client)
+    target = ReleaseTarget(release_at=datetime(2026, 3, 23, 17, 0), slot_occurrence=MONDAY_SLOT)
+
+    with time_machine.travel(datetime(2026, 3, 23, 17, 0, tzinfo=APP_TIMEZONE), tick=False):
+        await release_sniper.run_release_snipe(cast(ContextTypes.DEFAULT_TYPE, context), target)
+
+    assert client.fetches == 3
+    assert client.book_by_ids_calls == [("b-release", 7, "membership")]
+    assert len(context.bot.calls) == 1
+    assert context.bot.calls[0]["text"].startswith("Booked: Mon 20/04 18:00")
+
+
+@pytest.mark.asyncio
+async def test_run_release_snipe_gives_up_after_window(configured_jobs, activate_bot, test_config):
+    test_config.release_sniper_retry_interval_seconds = 0
+    test_config.release_sniper_window_seconds = 0
+    client = FakePureGymClient([], bookings=[])
+    context = FakeContext(client)
+    target = ReleaseTarget(release_at=datetime(2026, 3, 23, 17, 0), slot_occurrence=MONDAY_SLOT)
+
+    with time_machine.travel(datetime(2026, 3, 23, 17, 0, 1, tzinfo=APP_TIMEZONE), tick=False):
+        await release_sniper.run_release_snipe(cast(ContextTypes.DEFAULT_TYPE, context), target)
+
+    assert client.book_by_ids_calls == []
@@ -0,0 +1,90 @@
+from datetime import date, datetime, time
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from puregym_bot.bot.booking_cycle import SlotOccurrence, plan_slot_actions, slot_is_blocked
+from puregym_bot.bot.slot_blocking import SlotBlockingIndex
+from puregym_bot.storage.models import BookingChoice, BookingStatus, ChoiceStatus, ManagedBooking
+from tests.fakes import make_gym_class
+
+
+def slot(day: str, start: str = "17:00:00", end: str = "22:00:00") -> SlotOccurrence:
+    return SlotOccurrence(date=day, slot_start=start, slot_end=end)
+
+
+def add_booking(session, booking_id: str, class_datetime: datetime, status: BookingStatus) -> None:
+    session.add(
+        ManagedBooking(
+            booking_id=booking_id,
+            activity_id=1,
+            payment_type="membership",
+            participation_id=f"pid-{booking_id}",
+            class_title="Body Pump",
+            class_location="Center 1",
+            class_datetime=class_datetime,
+            status=status,
+        )
+    )
+
+
+def test_slot_blocking_index_matches_per_slot_queries(test_engine):
+    slots = [
+        slot("2026-03-23"),
+        slot("2026-03-23", "07:00:00", "09:00:00"),
+        slot("2026-03-24"),
+        slot("2026-03-30"),
+        slot("2026-03-31"),
+        slot("2026-04-06"),
+    ]
+    with Session(test_engine, expire_on_commit=False) as session:
+        add_booking(session, "pending", datetime(2026, 3, 23, 18, 0), BookingStatus.PENDING)
+        add_booking(session, "cancelled", datetime(2026, 3, 30, 21, 59), BookingStatus.CANCELLED)
+        add_booking(session, "expired", datetime(2026, 3, 31, 18, 0), BookingStatus.EXPIRED)
+        add_booking(session, "at-end", datetime(2026, 3, 24, 22, 0), BookingStatus.CONFIRMED)
+        session.add(
+            BookingChoice(
+                slot_date="2026-04-06", slot_start="17:00:00", slot_end="22:00:00", options_json="[]"
+            )
+        )
+        session.add(
+            BookingChoice(
+                slot_date="2026-03-31",
+                slot_start="17:00:00",
+                slot_end="22:00:00",
+                options_json="[]",
+                status=ChoiceStatus.HANDLED,
+            )
+        )
+        session.commit()
+
+        index = SlotBlockingIndex.load(session, slots)
+
+        assert [index.is_blocked(item) for item in slots] == [
+            slot_is_blocked(session, item) for item in slots
+        ]
+        assert [index.is_blocked(item) for item in slots] == [True, False, False, True, False, True]
+
+
+def test_plan_slot_actions_checks_blocking_with_constant_queries(configured_jobs, test_engine):
+    grouped = {
+        slot(day.isoformat()): [
+            make_gym_class(
+                booking_id=f"b-{day.isoformat()}",
+                activity_id=1,
+                day=day,
+                start=time(18, 0),
+                end=time(19, 0),
+                participation_id=None,
+            )
+        ]
+        for day in (date(2026, 3, 23), date(2026, 3, 24), date(2026, 3, 30), date(2026, 3, 31))
+    }
+    statements: list[str] = []
+    event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with Session(test_engine, expire_on_commit=False) as session:
+        planned = plan_slot_actions(session, grouped, set())
+
+    assert len(planned) == len(grouped)
+    assert len(statements) == 2
@@ -0,0 +1,76 @@
+from datetime import date, time
+from itertools import product
+
+from puregym_bot.bot.class_records import ClassRecord
+from puregym_bot.config import GymClassPreferences, TimeSlot, Weekday
+from puregym_bot.slot_index import SlotIndex, compile_slot_index
+from tests.fakes import make_gym_class
+
+TIME_SLOTS = [
+    TimeSlot(day_of_week=Weekday.MONDAY, start_time=time(17, 0), end_time=time(18, 0)),
+    TimeSlot(day_of_week=Weekday.MONDAY, start_time=time(18, 0), end_time=time(20, 30)),
+    TimeSlot(day_of_week=Weekday.SUNDAY, start_time=time(22, 0), end_time=time(23, 59)),
+]
+
+
+def test_slot_index_matches_linear_scan():
+    index = SlotIndex.compile(TIME_SLOTS)
+    boundaries = [
+        time(hour, minute) for hour in (16, 17, 18, 19, 20, 21, 22, 23) for minute in (0, 29, 30, 59)
+    ]
+
+    for weekday, start, end in product(range(7), boundaries, boundaries):
+        assert index.match(weekday, start, end) == index.match_linear(weekday, start, end), (
+            weekday,
+            start,
+            end,
+        )
+
+
+def test_slot_index_respects_adjacent_slots():
+    index = SlotIndex.compile(TIME_SLOTS)
+
+    assert index.match(Weekday.MONDAY, time(17, 0), time(18, 0)) is TIME_SLOTS[0]
+    assert index.match(Weekday.MONDAY, time(18, 0), time(19, 0)) is TIME_SLOTS[1]
+    assert index.match(Weekday.MONDAY, time(17, 30), time(18, 30)) is None
+    assert index.match(Weekday.TUESDAY, time(17, 30), time(17, 45)) is None
+
+
+def test_slot_index_falls_back_for_sub_minute_times():
+    index = SlotIndex.compile(TIME_SLOTS)
+
+    assert index.match(Weekday.MONDAY, time(17, 59, 30), time(18, 0)) is TIME_SLOTS[0]
+    assert index.match(Weekday.MONDAY, time(20, 30), time(20, 30, 1)) is None
+
+
+def test_preferences_expose_compiled_slot_index():
+    preferences = GymClassPreferences(
+        interested_classes=[1], interested_centers=[1], available_time_slots=TIME_SLOTS
+    )
+
+    assert preferences.slot_index is compile_slot_index(TIME_SLOTS)
+    assert len(preferences.slot_index.minute_to_slot) == 7 * 24 * 60
+
+
+def test_slot_index_keeps_list_order_for_overlapping_slots():
+    overlapping = [
+        TimeSlot(day_of_week=Weekday.FRIDAY, start_time=time(17, 0), end_time=time(21, 0)),
+        TimeSlot(day_of_week=Weekday.FRIDAY, start_time=time(18, 0), end_time=time(19, 0)),
+    ]
+    index = SlotIndex.compile(overlapping)
+
+    assert index.exact is False
+    assert index.match(Weekday.FRIDAY, time(18, 0), time(19, 0)) is overlapping[0]
+
+
+def test_record_lookup_matches_linear_scan_including_sub_minute_times():
+    index = SlotIndex.compile(TIME_SLOTS)
+    times = [time(17, 0), time(17, 59, 30), time(18, 0), time(20, 30), time(20, 30, 1), time(23, 59)]
+
+    for day, start, end in product((date(2026, 3, 23), date(2026, 3, 29)), times, times):
+        record = ClassRecord(
+            make_gym_class(
+                booking_id="b-1", activity_id=1, day=day, start=start, end=end, participation_id=None
+            )
+        )
+        assert index.match_record(record) == index.match_linear(record.weekday, start, end), (day, start, end)
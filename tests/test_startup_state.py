@@ -4,6 +4,7 @@ import pytest
 from sqlmodel import Session, SQLModel, create_engine
 
 from puregym_bot.bot import dependencies
+from puregym_bot.circuit_breaker import CircuitBreakerClient
 from puregym_bot.storage import db as storage_db
 from puregym_bot.storage.models import BotState
 from puregym_bot.storage.repository import get_bot_state
@@ -35,7 +36,8 @@ async def test_on_startup_sends_message_when_bot_is_active(
 
     await dependencies.on_startup(app)
 
-    assert isinstance(app.bot_data["puregym_client"], FakeClient)
+    assert isinstance(app.bot_data["puregym_client"], CircuitBreakerClient)
+    assert isinstance(app.bot_data["puregym_client"].client, FakeClient)
     assert len(app.bot.calls) == 1
     assert app.bot.calls[0]["chat_id"] == test_config.telegram_id
     assert "booking cycle" in app.bot.calls[0]["text"]
@@ -62,7 +64,7 @@ async def test_on_startup_skips_message_when_bot_is_inactive(
 
     await dependencies.on_startup(app)
 
-    assert isinstance(app.bot_data["puregym_client"], FakeClient)
+    assert isinstance(app.bot_data["puregym_client"].client, FakeClient)
     assert app.bot.calls == []
 
 
@@ -105,3 +107,18 @@ def test_init_db_creates_enabled_bot_state_when_missing(monkeypatch):
 
     assert state is not None
     assert state.is_active is True
+
+
+def test_init_db_adds_participation_index_to_existing_database(monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_managedbooking_participation_id")
+
+    monkeypatch.setattr(storage_db, "engine", engine)
+
+    storage_db.init_db()
+
+    with engine.connect() as connection:
+        indexes = connection.exec_driver_sql("PRAGMA index_list('managedbooking')").fetchall()
+    assert ("ix_managedbooking_participation_id", 1) in {(row[1], row[2]) for row in indexes}
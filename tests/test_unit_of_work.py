@@ -0,0 +1,176 @@
+import asyncio
+from datetime import date, datetime, time
+from typing import cast
+
+import pytest
+import time_machine
+from puregym_mcp.puregym.models import BookClassResult
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+from telegram import Bot
+from telegram.ext import ContextTypes
+
+from puregym_bot.bot.booking_cycle import get_booking_lock, run_booking_cycle
+from puregym_bot.bot.outbox import OUTBOX_SENDER_KEY, OutboxSender
+from puregym_bot.storage.db import UnitOfWork, unit_of_work
+from puregym_bot.storage.models import BookingStatus, ManagedBooking, OutboxMessage
+from tests.fakes import FakeBot, FakeContext, FakePureGymClient, make_gym_class
+
+NOW = datetime(2026, 3, 20, 12, 0)
+SLOT_DAYS = [date(2026, 3, 23), date(2026, 3, 24), date(2026, 3, 30), date(2026, 3, 31)]
+
+
+@pytest.fixture
+def test_engine(tmp_path):
+    # A file database gives every session its own connection, so uncommitted work stays invisible.
+    engine = create_engine(f"sqlite:///{tmp_path / 'cycle.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def commit_counter(test_engine):
+    commits = []
+    event.listen(test_engine, "commit", lambda _conn: commits.append(1))
+    return commits
+
+
+def make_classes(participation_prefix: str | None) -> list:
+    return [
+        make_gym_class(
+            booking_id=f"b-{index}",
+            activity_id=index,
+            day=day,
+            start=time(18, 0),
+            end=time(19, 0),
+            participation_id=f"{participation_prefix}-{index}" if participation_prefix else None,
+        )
+        for index, day in enumerate(SLOT_DAYS)
+    ]
+
+
+def stored_bookings(test_engine) -> list[ManagedBooking]:
+    with Session(test_engine) as session:
+        return list(session.exec(select(ManagedBooking)).all())
+
+
+async def run_cycle(client) -> FakeContext:
+    context = FakeContext(client)
+    with time_machine.travel(NOW, tick=False):
+        await run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context))
+    return context
+
+
+def test_unit_of_work_defers_commits_to_checkpoints(test_engine, commit_counter):
+    with Session(test_engine) as session, unit_of_work(session) as uow:
+        booking = ManagedBooking(
+            booking_id="b-1",
+            activity_id=1,
+            payment_type="membership",
+            class_title="Body Pump",
+            class_location="Center 1",
+            class_datetime=datetime(2026, 3, 23, 18, 0),
+        )
+        uow.add(booking)
+        uow.commit()
+        assert booking.id is not None
+        assert commit_counter == []
+        assert stored_bookings(test_engine) == []
+
+        uow.checkpoint()
+        uow.checkpoint()
+        assert len(commit_counter) == 1
+
+    assert len(stored_bookings(test_engine)) == 1
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_commits_stay_flat_with_more_bookings(
+    configured_jobs, activate_bot, test_engine, commit_counter
+):
+    await run_cycle(FakePureGymClient(make_classes(None), bookings=[]))
+    booking_commits = len(commit_counter)
+
+    commit_counter.clear()
+    await run_cycle(FakePureGymClient(make_classes("pid-manual"), bookings=[]))
+
+    statuses = sorted(booking.status.value for booking in stored_bookings(test_engine))
+    assert statuses == ["cancelled"] * len(SLOT_DAYS) + ["pending"] * len(SLOT_DAYS)
+    assert booking_commits <= 3
+    assert len(commit_counter) <= 3
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_without_unit_of_work_commits_per_booking(
+    configured_jobs, activate_bot, test_config, commit_counter
+):
+    test_config.cycle_unit_of_work = False
+
+    await run_cycle(FakePureGymClient(make_classes(None), bookings=[]))
+
+    assert len(commit_counter) > len(SLOT_DAYS)
+
+
+@pytest.mark.asyncio
+async def test_booking_cycle_keeps_recorded_bookings_when_a_step_fails(
+    configured_jobs, activate_bot, test_engine
+):
+    class PartlyFailingClient(FakePureGymClient):
+        async def book_by_ids(self, booking_id, activity_id, payment_type) -> BookClassResult:
+            if booking_id == "b-3":
+                raise RuntimeError("PureGym timeout")
+            return await super().book_by_ids(booking_id, activity_id, payment_type)
+
+    with pytest.raises(RuntimeError):
+        await run_cycle(PartlyFailingClient(make_classes(None), bookings=[]))
+
+    bookings = stored_bookings(test_engine)
+    assert sorted(booking.booking_id for booking in bookings) == ["b-0", "b-1", "b-2"]
+    assert all(booking.status == BookingStatus.PENDING for booking in bookings)
+
+
+def test_unit_of_work_commits_immediately_when_not_deferred(test_engine, commit_counter):
+    with Session(test_engine) as session:
+        uow = UnitOfWork(session, deferred=False)
+        uow.commit()
+        uow.commit()
+
+    assert uow.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_queued_prompts_are_committed_before_the_cycle_waits_for_the_booking_lock(
+    configured_jobs, activate_bot, test_engine
+):
+    # The first class is booked outside the bot, so the sync step queues an import prompt.
+    classes = make_classes(None)
+    classes[0] = make_classes("pid-manual")[0]
+    context = FakeContext(FakePureGymClient(classes, bookings=[]))
+    context.bot_data[OUTBOX_SENDER_KEY] = OutboxSender(cast(Bot, FakeBot()))
+    lock = get_booking_lock(cast(ContextTypes.DEFAULT_TYPE, context))
+
+    with time_machine.travel(NOW, tick=False):
+        async with lock:
+            cycle = asyncio.create_task(run_booking_cycle(cast(ContextTypes.DEFAULT_TYPE, context)))
+            for _ in range(20):
+                await asyncio.sleep(0)
+            # A lock holder such as the release sniper records its booking while the cycle waits.
+            with Session(test_engine) as session:
+                session.add(
+                    ManagedBooking(
+                        booking_id="b-sniped",
+                        activity_id=99,
+                        payment_type="membership",
+                        class_title="Body Pump",
+                        class_location="Center 1",
+                        class_datetime=datetime(2026, 4, 6, 18, 0),
+                    )
+                )
+                session.commit()
+            assert not cycle.done()
+        await cycle
+
+    booking_ids = {booking.booking_id for booking in stored_bookings(test_engine)}
+    assert {"b-sniped", "b-0", "b-1"} <= booking_ids
+    with Session(test_engine) as session:
+        assert session.exec(select(OutboxMessage)).first() is not None